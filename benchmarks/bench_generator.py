@@ -0,0 +1,50 @@
+"""
+Benchmark: số lưới lời giải đầy đủ tạo được mỗi giây (grids/s) của SudokuGenerator
+- mode='solver': điền khối chéo rồi giải bằng FC + MRV, và
+- mode='transform': biến đổi lưới hạt giống (đổi nhãn, hoán vị hàng / cột / dải, chuyển vị),
+trên các kích thước 9x9, 16x16, 25x25 (seed cố định). Chỉ đo bước tạo lời giải, không đục lỗ.
+
+Chạy từ thư mục gốc dự án:
+    python -m benchmarks.bench_generator [số_lưới_solver] [số_lưới_transform]
+"""
+import sys
+import time
+import random
+
+from src.model.board_geometry import get_geometry
+from src.model.sudoku_generator import SudokuGenerator
+
+SIZES = [9, 16, 25]
+
+
+def _is_solution(grid):
+    """Mỗi Hàng / Cột / Khối chứa đủ 1..N."""
+    n = len(grid)
+    full = set(range(1, n + 1))
+    return all({grid[idx // n][idx % n] for idx in unit} == full for unit in get_geometry(n).units)
+
+
+def _rate(generator, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        grid = generator.generate_solution()
+    elapsed = time.perf_counter() - start
+    # Lưới cuối cùng phải là lời giải hợp lệ
+    assert _is_solution(grid)
+    return count / elapsed if elapsed else 0, elapsed
+
+
+def main():
+    solver_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    transform_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    print(f"{'Kích thước':<12}{'Chế độ':<12}{'Số lưới':>10}{'Thời gian (s)':>16}{'Lưới/s':>12}")
+    for size in SIZES:
+        random.seed(size)
+        for mode, count in (("solver", solver_count), ("transform", transform_count)):
+            rate, elapsed = _rate(SudokuGenerator(size, mode=mode), count)
+            print(f"{f'{size}x{size}':<12}{mode:<12}{count:>10,}{elapsed:>16.3f}{rate:>12,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: thông lượng nút (nodes/s) của FC + MRV khi chọn ô bằng
+- quét toàn bộ bàn cờ ở mỗi nút (trước), và
+- hàng đợi theo kích thước miền - BucketedDomains (sau),
+trên các đề 16x16 và 25x25 sinh ngẫu nhiên (seed cố định).
+
+Chạy từ thư mục gốc dự án:
+    python -m benchmarks.bench_mrv_queue [số_đề_mỗi_cỡ] [số_nút_tối_đa]
+"""
+import sys
+import copy
+import time
+import random
+
+from src.model.sudoku_board import SudokuBoard
+from src.model.sudoku_generator import SudokuGenerator
+from src.model.candidate_engine import BitmaskDomains, BucketedDomains
+from src.model.algorithms import run_search
+from src.model.algorithms_mrv import search_forward_checking_mrv
+from src.model.sinks import CountingSink
+from src.model.search_budget import SearchBudget
+
+CASES = [(16, 'hard'), (25, 'medium')]
+
+
+def _run(puzzle, use_buckets, max_nodes):
+    """Chạy FC + MRV tới khi giải xong hoặc số nút chạm ngưỡng (để đề quá khó không chạy vô hạn)."""
+    board_wrapper = SudokuBoard(copy.deepcopy(puzzle))
+    stats = {"backtracks": 0}
+    start = time.perf_counter()
+    domains = BucketedDomains(board_wrapper) if use_buckets else BitmaskDomains(board_wrapper)
+    if domains.initialize():
+        run_search(search_forward_checking_mrv(domains, stats, CountingSink(), budget=SearchBudget(max_nodes=max_nodes)))
+    return stats.get("nodes_visited", 0), time.perf_counter() - start
+
+
+def main():
+    puzzles_per_size = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    max_nodes = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    print(f"{'Kích thước':<12}{'Chế độ':<10}{'Nút':>10}{'Thời gian (s)':>16}{'Nút/s':>12}")
+    for size, difficulty in CASES:
+        random.seed(size)
+        puzzles = [SudokuGenerator(size).generate_puzzle(difficulty)[0] for _ in range(puzzles_per_size)]
+
+        for label, use_buckets in (("scan", False), ("bucket", True)):
+            total_nodes = 0
+            total_time = 0.0
+            for puzzle in puzzles:
+                nodes, elapsed = _run(puzzle, use_buckets, max_nodes)
+                total_nodes += nodes
+                total_time += elapsed
+            rate = total_nodes / total_time if total_time else 0
+            print(f"{f'{size}x{size}':<12}{label:<10}{total_nodes:>10,}{total_time:>16.3f}{rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
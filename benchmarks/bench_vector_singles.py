@@ -0,0 +1,47 @@
+"""
+Benchmark: giải hàng loạt đề 9x9 theo từng đề (FC + MRV, DLX) so với lan truyền vector hóa
+(NumPy naked / hidden singles cho cả lô, đề còn dở mới chuyển cho FC + MRV / DLX).
+Đề được sinh bằng SudokuGenerator (mode='transform', seed cố định) ở các độ khó khác nhau.
+In số đề/giây và tỉ lệ đề xong ngay ở bước vector.
+
+Chạy từ thư mục gốc dự án:
+    python -m benchmarks.bench_vector_singles [số_đề_mỗi_độ_khó]
+"""
+import sys
+import time
+import random
+
+from src.model.sudoku_generator import SudokuGenerator
+from src.model.batch_solver import solve_chunk, summarize
+
+ALGO_KEYS = ['fc_mrv', 'np_fc_mrv', 'dlx', 'np_dlx']
+DIFFICULTIES = ['easy', 'hard', 'extreme']
+
+
+def _make_puzzles(difficulty, count):
+    generator = SudokuGenerator(9, mode='transform')
+    quizzes, solutions = [], []
+    for _ in range(count):
+        puzzle, solution = generator.generate_puzzle(difficulty)
+        quizzes.append("".join(str(v) for row in puzzle for v in row))
+        solutions.append("".join(str(v) for row in solution for v in row))
+    return quizzes, solutions
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    print(f"{'Độ khó':<10}{'Thuật toán':<12}{'Số đề':>8}{'Đúng':>8}{'Đề/giây':>12}{'Xong ở bước vector':>22}")
+    for difficulty in DIFFICULTIES:
+        random.seed(difficulty)
+        quizzes, solutions = _make_puzzles(difficulty, count)
+        for key in ALGO_KEYS:
+            start = time.perf_counter()
+            metrics = summarize(solve_chunk(key, quizzes, solutions))
+            rate = metrics["count"] / (time.perf_counter() - start)
+            vector = f"{metrics['vector_rate'] * 100:.1f}%" if key.startswith('np_') else "-"
+            print(f"{difficulty:<10}{key:<12}{metrics['count']:>8,}{metrics['correct']:>8,}{rate:>12,.1f}{vector:>22}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,16 +11,9 @@ except ImportError:
 
 from src.view.main_window import MainView
 from src.view.analysis_popup import AnalysisPopup 
+from src.view.batch_analysis_popup import BatchAnalysisPopup
 from src.controller.app_controller import AppController
-from src.model.sudoku_board import SudokuBoard
-from src.model import algorithms
-from src.model import visualizer_bt
-from src.model import visualizer_fc
-from src.model import visualizer_mrv
-from src.model import profiler_bt
-from src.model import profiler_fc
-from src.model import profiler_mrv 
-from src.model import solver_dlx 
+from src.utils.lazy_modules import LazyModules
 
 def main():
 
@@ -28,18 +21,16 @@ def main():
     ctk.set_appearance_mode("dark")  
     ctk.set_default_color_theme("blue") 
     
-    # Đóng gói các module Model để chuyển cho Controller
-    model = {
-        'SudokuBoard': SudokuBoard,
-        'algorithms': algorithms,
-        'visualizer_bt': visualizer_bt,
-        'visualizer_fc': visualizer_fc,
-        'visualizer_mrv': visualizer_mrv, 
-        'profiler_bt': profiler_bt,
-        'profiler_fc': profiler_fc,
-        'profiler_mrv': profiler_mrv,
-        'solver_dlx': solver_dlx,
-    }
+    # Đóng gói các module Model để chuyển cho Controller (import khi dùng lần đầu để cửa sổ hiện sớm hơn)
+    model = LazyModules({
+        'SudokuBoard': 'src.model.sudoku_board:SudokuBoard',
+        'algorithms': 'src.model.algorithms',
+        'algorithms_mrv': 'src.model.algorithms_mrv',
+        'sinks': 'src.model.sinks',
+        'visualizer': 'src.model.visualizer',
+        'solver_dlx': 'src.model.solver_dlx',
+        'solver_dlx_array': 'src.model.solver_dlx_array',
+    })
     
     root = ctk.CTk()
     
@@ -55,7 +46,7 @@ def main():
         base_dir = os.path.dirname(os.path.abspath(__file__))
 
     # Khởi tạo Controller
-    controller = AppController(model, AnalysisPopup, None, base_dir) 
+    controller = AppController(model, AnalysisPopup, BatchAnalysisPopup, base_dir) 
 
     # Khởi tạo View chính
     view = MainView(root, controller)
@@ -63,6 +54,12 @@ def main():
     
     # Kết nối View và Controller
     controller.set_view(view)
+
+    # Đóng cửa sổ: lưu kho đề sinh sẵn và dừng tiến trình nền trước khi thoát
+    def on_close():
+        controller.shutdown()
+        root.destroy()
+    root.protocol("WM_DELETE_WINDOW", on_close)
     
     root.mainloop()
 
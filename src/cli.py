@@ -0,0 +1,291 @@
+"""
+Giao diện dòng lệnh (không cần customtkinter / màn hình) - dùng trên máy chủ hoặc trong script.
+
+    python -m src.cli solve    [FILE|-] [--algo fc_mrv] [--ac] [--timeout S] [--max-nodes N] [--format json|csv]
+    python -m src.cli batch    FILE [--algo np_fc_mrv,dlx] [--limit N] [--workers K] [--format json|csv]
+    python -m src.cli bench    [FILE|-] [--algo fc_mrv,dlx] [--ac] [--repeat R] [--timeout S] [--max-nodes N] [--format json|csv]
+    python -m src.cli generate [--size 9] [--difficulty hard] [--count 5] [--mode solver|transform] [--symmetry none]
+
+Đầu vào của solve / bench (file hoặc stdin khi FILE là '-' hoặc bỏ trống):
+- mỗi dòng một đề N*N ký tự ('0' / '.' là ô trống, 'A'.. = 10.. với đề 16x16, 25x25), có thể kèm lời giải
+  sau dấu phẩy; dòng tiêu đề CSV (quizzes,solutions / puzzle,solution) được nhận ra và bỏ qua;
+- hoặc một lưới N dòng x N ô (định dạng file .txt của ứng dụng).
+batch đọc CSV / kho .sdkb qua PuzzleDataset / PuzzleStore và giải trên nhiều tiến trình.
+--timeout / --max-nodes giới hạn từng đề; đề chạm giới hạn có status "timeout" / "nodes" thay vì
+"solved" / "unsolvable". --ac lọc AC-3 / AllDifferent trước khi giải bằng bt / fc / dlx (fc_mrv_ac luôn lọc).
+Mỗi lệnh chỉ import các module bộ giải nó cần; kết quả in ra stdout dạng JSON hoặc CSV.
+"""
+import argparse
+import csv
+import importlib
+import json
+import sys
+import time
+
+from src.model.sudoku_board import SudokuBoard
+from src.model.search_budget import SearchBudget
+from src.model.puzzle_text import iter_puzzles
+from src.utils.sudoku_converter import SudokuConverter
+
+# algo_key -> (module, hàm giải (board_wrapper, stats, budget=...) -> bool | None | lớp bộ giải có .solve(stats, budget))
+SOLVERS = {
+    'bt': ('src.model.algorithms', 'solve_backtracking'),
+    'fc': ('src.model.algorithms', 'solve_forward_checking'),
+    'fc_mrv': ('src.model.algorithms_mrv', 'solve_forward_checking_mrv'),
+    'fc_mrv_ac': ('src.model.algorithms_mrv', 'solve_forward_checking_mrv_ac'),
+    'dlx': ('src.model.solver_dlx_array', 'SudokuDLXArray'),
+}
+
+# Các thuật toán nhận --ac (cùng tập với parallel_compare.AC_PREPROCESS_KEYS)
+AC_PREPROCESS_KEYS = ('bt', 'fc', 'dlx')
+
+
+def load_solver(algo_key, ac_preprocess=False):
+    """
+    Import module của thuật toán khi cần; trả về hàm (board_wrapper, stats, budget=None) -> bool | None.
+    ac_preprocess=True: lọc AC-3 / AllDifferent trước (chỉ với AC_PREPROCESS_KEYS, các thuật toán khác bỏ qua).
+    """
+    if algo_key not in SOLVERS:
+        raise ValueError(f"Thuật toán '{algo_key}' không tồn tại (chọn: {', '.join(SOLVERS)}).")
+    module_name, attr = SOLVERS[algo_key]
+    target = getattr(importlib.import_module(module_name), attr)
+    ac_preprocess = ac_preprocess and algo_key in AC_PREPROCESS_KEYS
+    if isinstance(target, type):
+        if not ac_preprocess:
+            return lambda board_wrapper, stats, budget=None: target(board_wrapper).solve(stats, budget)
+        from src.model.arc_consistency import preprocess
+
+        def solve(board_wrapper, stats, budget=None):
+            # Lọc AC phát hiện mâu thuẫn -> Vô nghiệm, không cần dựng bộ giải
+            if preprocess(board_wrapper, stats, fill_forced=True) is None:
+                return False
+            return target(board_wrapper).solve(stats, budget)
+        return solve
+    if ac_preprocess:
+        return lambda board_wrapper, stats, budget=None: target(board_wrapper, stats, budget=budget, ac_preprocess=True)
+    return target
+
+
+# ---------------- Đọc / ghi ----------------
+
+def read_puzzles(source):
+    """
+    Đọc danh sách (đề, lời giải | None) dạng chuỗi từ file hoặc stdin ('-' / None).
+    Bố cục (mỗi dòng một đề / một lưới N x N / CSV có tiêu đề) do puzzle_text.iter_puzzles nhận ra.
+    """
+    if source in (None, '-'):
+        return _decode(iter_puzzles(sys.stdin.buffer))
+    with open(source, 'rb') as f:
+        return _decode(iter_puzzles(f))
+
+
+def _decode(records):
+    return [(puzzle.decode('ascii', 'replace'), solution.decode('ascii', 'replace') if solution else None)
+            for puzzle, solution in records]
+
+
+def parse_grid(puzzle):
+    n = int(round(len(puzzle) ** 0.5))
+    if n * n != len(puzzle) or n < 1:
+        raise ValueError(f"Đề không có N*N ký tự: '{puzzle[:20]}...'")
+    cells = [0 if ch in '.-_' else SudokuConverter.char_to_int(ch) for ch in puzzle]
+    return [cells[r * n:(r + 1) * n] for r in range(n)]
+
+
+def grid_to_string(grid):
+    return "".join(SudokuConverter.int_to_char(v) or '0' for row in grid for v in row)
+
+
+def write_rows(rows, fmt, out=None):
+    """In danh sách dict ra stdout dạng JSON (mảng) hoặc CSV (cột theo dict đầu tiên)."""
+    out = out or sys.stdout
+    if fmt == 'csv':
+        if not rows:
+            return
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]), lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        json.dump(rows, out, ensure_ascii=False, indent=2)
+        out.write('\n')
+
+
+# ---------------- Lệnh ----------------
+
+def solve_one(solve, puzzle, solution=None, timeout=None, max_nodes=None):
+    try:
+        board_wrapper = SudokuBoard(parse_grid(puzzle))
+    except ValueError as e:
+        return {"puzzle": puzzle, "solved": False, "status": "error", "error": str(e)}
+    stats = {"backtracks": 0}
+    budget = SearchBudget(max_nodes=max_nodes, timeout=timeout) if timeout or max_nodes else None
+    start = time.perf_counter()
+    is_solved = solve(board_wrapper, stats, budget=budget)
+    elapsed = time.perf_counter() - start
+    answer = grid_to_string(board_wrapper.get_board()) if is_solved else ""
+    if is_solved is None:
+        status = stats.get("budget_exceeded", "stopped")
+    else:
+        status = "solved" if is_solved else "unsolvable"
+    row = {
+        "puzzle": puzzle,
+        "solved": bool(is_solved),
+        "status": status,
+        "solution": answer,
+        "time_ms": round(elapsed * 1000, 3),
+        "backtracks": stats.get("backtracks", 0),
+    }
+    if solution:
+        row["correct"] = answer == solution.replace('.', '0')
+    return row
+
+
+def cmd_solve(args):
+    solve = load_solver(args.algo, args.ac)
+    rows = [solve_one(solve, puzzle, solution, args.timeout, args.max_nodes) for puzzle, solution in read_puzzles(args.file)]
+    write_rows(rows, args.format)
+    return 0 if rows and all(row["solved"] for row in rows) else 1
+
+
+def cmd_bench(args):
+    puzzles = read_puzzles(args.file)
+    rows = []
+    for algo_key in args.algo.split(','):
+        solve = load_solver(algo_key, args.ac)
+        times, backtracks, solved, stopped = [], 0, 0, 0
+        for _ in range(args.repeat):
+            for puzzle, solution in puzzles:
+                result = solve_one(solve, puzzle, solution, args.timeout, args.max_nodes)
+                if "error" in result:
+                    continue
+                times.append(result["time_ms"])
+                backtracks += result["backtracks"]
+                solved += result["solved"]
+                stopped += result["status"] not in ("solved", "unsolvable")
+        times.sort()
+        rows.append({
+            "algo": algo_key,
+            "runs": len(times),
+            "solved": solved,
+            "budget_exceeded": stopped,
+            "avg_ms": round(sum(times) / len(times), 3) if times else 0.0,
+            "median_ms": times[len(times) // 2] if times else 0.0,
+            "max_ms": times[-1] if times else 0.0,
+            "backtracks": backtracks,
+        })
+    write_rows(rows, args.format)
+    return 0
+
+
+def cmd_batch(args):
+    from src.model.batch_solver import BatchSolver
+    from src.model.puzzle_store import PuzzleStore, STORE_EXT
+    from src.model.puzzle_dataset import PuzzleDataset, stream_csv
+
+    if args.file.endswith(STORE_EXT):
+        dataset = PuzzleStore(args.file)
+    else:
+        dataset = PuzzleDataset()
+        for quizzes, solutions, _, _ in stream_csv(args.file):
+            dataset.append(quizzes, solutions)
+            if args.limit and len(dataset) >= args.limit:
+                break
+    total = min(args.limit or len(dataset), len(dataset))
+    solver = BatchSolver(args.algo.split(','), workers=args.workers, size=dataset.size)
+
+    def progress(key, metrics):
+        if not args.quiet:
+            line = f"{key}: {metrics['count']:,}/{total:,}"
+            print(f"\r{line:<40}", end="", file=sys.stderr, flush=True)
+
+    results = solver.run(dataset.iter_chunks(args.chunk_size, limit=total), total=total, progress=progress)
+    if not args.quiet: print(file=sys.stderr)
+    columns = ("count", "solved", "correct", "invalid", "accuracy", "avg_ms", "max_time_sec",
+               "puzzles_per_sec", "backtracks", "vector_solved", "wall_sec")
+    write_rows([{"algo": key, **{c: metrics[c] for c in columns}} for key, metrics in results.items()], args.format)
+    return 0
+
+
+def cmd_generate(args):
+    from src.model.sudoku_generator import SudokuGenerator
+    generator = SudokuGenerator(args.size, symmetry=args.symmetry, mode=args.mode)
+    rows = []
+    for _ in range(args.count):
+        puzzle, solution = generator.generate_puzzle(args.difficulty)
+        gen_stats = generator.last_stats
+        rows.append({
+            "size": args.size,
+            "difficulty": gen_stats["difficulty"],
+            "requested": args.difficulty,
+            "puzzle": grid_to_string(puzzle),
+            "solution": grid_to_string(solution),
+            "clues": sum(1 for row in puzzle for v in row if v),
+            "elapsed_sec": round(gen_stats["elapsed_sec"], 4),
+        })
+    write_rows(rows, args.format)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Giải / sinh Sudoku không cần giao diện.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_format(p):
+        p.add_argument("--format", choices=("json", "csv"), default="json", help="Định dạng kết quả (mặc định json).")
+
+    def add_ac(p):
+        p.add_argument("--ac", action="store_true", help="Lọc AC-3 / AllDifferent trước khi giải (bt / fc / dlx).")
+
+    def add_budget(p):
+        p.add_argument("--timeout", type=float, default=None, help="Giới hạn thời gian mỗi đề (giây).")
+        p.add_argument("--max-nodes", type=int, default=None, help="Giới hạn số nút duyệt mỗi đề.")
+
+    p = sub.add_parser("solve", help="Giải từng đề trong file / stdin.")
+    p.add_argument("file", nargs="?", default="-", help="File đề (mặc định '-' = stdin).")
+    p.add_argument("--algo", default="fc_mrv", choices=tuple(SOLVERS))
+    add_ac(p)
+    add_budget(p)
+    add_format(p)
+    p.set_defaults(func=cmd_solve)
+
+    p = sub.add_parser("batch", help="Giải hàng loạt file CSV / .sdkb trên nhiều tiến trình.")
+    p.add_argument("file")
+    p.add_argument("--algo", default="np_fc_mrv", help="Các thuật toán, cách nhau bởi dấu phẩy.")
+    p.add_argument("--limit", type=int, default=None, help="Chỉ giải N đề đầu tiên.")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--chunk-size", type=int, default=200, help="Số đề mỗi lô giao cho một tiến trình.")
+    p.add_argument("--quiet", action="store_true", help="Không in tiến độ ra stderr.")
+    add_format(p)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("bench", help="Đo thời gian giải của các thuật toán trên cùng bộ đề.")
+    p.add_argument("file", nargs="?", default="-")
+    p.add_argument("--algo", default="fc_mrv,dlx", help="Các thuật toán, cách nhau bởi dấu phẩy.")
+    p.add_argument("--repeat", type=int, default=1)
+    add_ac(p)
+    add_budget(p)
+    add_format(p)
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("generate", help="Sinh đề có lời giải duy nhất.")
+    p.add_argument("--size", type=int, default=9, choices=(4, 9, 16, 25))
+    p.add_argument("--difficulty", default="medium", choices=("easy", "medium", "hard", "extreme"))
+    p.add_argument("--count", type=int, default=1)
+    p.add_argument("--mode", default="solver", choices=("solver", "transform"))
+    p.add_argument("--symmetry", default="none")
+    add_format(p)
+    p.set_defaults(func=cmd_generate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"Lỗi: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 from tkinter import filedialog, messagebox
 import traceback
-import pandas as pd
 import random
 import os
 import copy
@@ -8,15 +7,24 @@ from typing import TYPE_CHECKING, Type
 import threading
 import time
 import math
+import queue
 
-from src.model.sudoku_generator import SudokuGenerator
 from src.utils.sudoku_converter import SudokuConverter
 from src.model.hint_generator import HintGenerator 
-from src.model import solver_dlx 
+from src.model.search_budget import SearchBudget, budget_label, REASON_CANCELLED
 
+# Các module nặng (bộ sinh đề / chấm độ khó kéo theo mọi bộ giải, kho đề và Danh mục kéo theo multiprocessing,
+# các module dùng NumPy) được import trong hàm sử dụng để cửa sổ chính hiện ra trước khi chúng được nạp.
+# Kho đề, cache độ khó, lịch sử Danh mục và bộ quản lý việc nền được tạo ở lần dùng đầu tiên (property).
 if TYPE_CHECKING:
     from src.view.main_window import MainView
     from src.view.analysis_popup import AnalysisPopup
+    from src.model.puzzle_dataset import PuzzleDataset
+    from src.model.bucket_index import BucketIndex
+    from src.model.puzzle_pool import PuzzlePool
+    from src.model.difficulty_grader import GradeCache
+    from src.model.portfolio import PortfolioHistory
+    from src.model.solve_jobs import SolveJobManager
 
 class AppController:
 
@@ -28,9 +36,22 @@ class AppController:
         
         self.analysis_popup_class = analysis_popup_class
         self.analysis_popup_window = None 
+        self.batch_analysis_popup_class = batch_analysis_popup_class
+        self.batch_popup_window = None
+        # Giải hàng loạt chạy ở luồng nền; kết quả gửi về qua hàng đợi, luồng giao diện đọc bằng root.after
+        self.batch_queue = queue.Queue()
+        self.batch_stop_requested = False
+        self.is_batch_running = False
         
-        self.kaggle_df: pd.DataFrame = None 
+        # Bộ dữ liệu đề từ CSV (nạp dần ở luồng nền, dùng được ngay sau khối đầu tiên)
+        # hoặc kho nhị phân .sdkb (PuzzleStore, đọc qua mmap) - cùng giao diện đọc
+        self.dataset: 'PuzzleDataset' = None
         self.csv_loaded = False
+        self.loading_dataset = None
+        self.load_queue = queue.Queue()
+        # Chỉ mục nhóm độ khó của bộ dữ liệu (lấy đề O(1), không lặp lại) + file nguồn để lưu file .idx.npz
+        self.bucket_index: 'BucketIndex' = None
+        self.dataset_path = None
         
         self.visualizer_generator = None 
         self.is_visualizer_running = False
@@ -43,6 +64,36 @@ class AppController:
         self.is_play_mode = False 
         self.focused_cell = None 
         self.current_size = 9 
+        # Engine cho khóa 'dlx': 'array' (SudokuDLXArray - liên kết trong mảng số nguyên) hoặc 'object' (SudokuDLX - DLXNode)
+        self.dlx_engine = 'array'
+        # Lọc AC-3 / AllDifferent trước khi giải bằng BT / FC / DLX (arc_consistency.preprocess) - công tắc
+        # trên cửa sổ chính, áp dụng cho Giải nhanh, So sánh và Danh mục
+        self.ac_preprocess = False
+        # Giới hạn thời gian (giây) cho một lần giải nhanh và cho mỗi thuật toán khi so sánh
+        # (Backtracking trên đề 16x16 / 25x25 thưa có thể chạy hàng giờ)
+        self.solve_timeout_sec = 60.0
+        self.compare_timeout_sec = 10.0
+        # Giải nhanh / so sánh chạy ở luồng nền; tiến độ và kết quả đọc về bằng root.after (_poll_solve_jobs)
+        self._solve_jobs: 'SolveJobManager' = None
+        self.solve_job_id = None
+        self.solve_job_tag = "[GIẢI]"
+        self._solve_polling = False
+        # Sinh đề khi kho rỗng cũng chạy bằng solve_jobs (không sinh trực tiếp trên luồng giao diện)
+        self.generate_job_id = None
+        # So sánh chạy song song ở các tiến trình riêng (ParallelCompare), kết quả đọc về bằng root.after (_poll_compare)
+        self.compare_run = None
+        # Chế độ Danh mục: cuộc đua đang chạy (PortfolioRace) + lịch sử thuật toán thắng trong data/
+        self.portfolio_race = None
+        self._portfolio_history: 'PortfolioHistory' = None
+        # Cách sinh lời giải đầy đủ cho Generator: 'solver' (FC + MRV) hoặc 'transform' (biến đổi lưới hạt giống)
+        self.generator_mode = 'solver'
+        # Kho đề sinh sẵn ở tiến trình nền, lưu trong data/ để giữ qua các lần mở ứng dụng
+        self._puzzle_pool: 'PuzzlePool' = None
+        self._pool_errors_shown = 0
+        # Độ khó theo kỹ thuật giải: cache kết quả chấm + bộ dữ liệu đang được chấm ở luồng nền
+        # (file cache chỉ được đọc khi luồng chấm cần tới)
+        self._grade_cache: 'GradeCache' = None
+        self.grading_dataset = None
 
         self.colors = {
             "header": "\033[95m", "blue": "\033[94m", "cyan": "\033[96m",
@@ -50,17 +101,59 @@ class AppController:
             "endc": "\033[0m", "bold": "\033[1m", "underline": "\033[4m"
         }
 
+    @property
+    def solve_jobs(self) -> 'SolveJobManager':
+        if self._solve_jobs is None:
+            from src.model.solve_jobs import SolveJobManager
+            self._solve_jobs = SolveJobManager()
+        return self._solve_jobs
+
+    @property
+    def puzzle_pool(self) -> 'PuzzlePool':
+        if self._puzzle_pool is None:
+            from src.model.puzzle_pool import PuzzlePool
+            self._puzzle_pool = PuzzlePool(os.path.join(self.data_dir, "puzzle_pool.json"), mode=self.generator_mode)
+        return self._puzzle_pool
+
+    @property
+    def grade_cache(self) -> 'GradeCache':
+        if self._grade_cache is None:
+            from src.model.difficulty_grader import GradeCache
+            self._grade_cache = GradeCache(os.path.join(self.data_dir, "grade_cache.bin"),
+                                           on_error=lambda message: self._log(f"[ĐỘ KHÓ] {message}", "fail"))
+        return self._grade_cache
+
+    @property
+    def portfolio_history(self) -> 'PortfolioHistory':
+        if self._portfolio_history is None:
+            from src.model.portfolio import PortfolioHistory
+            self._portfolio_history = PortfolioHistory(os.path.join(self.data_dir, "portfolio_history.csv"),
+                                                       on_error=lambda message: self._log(f"[GIẢI] {message}", "fail"))
+        return self._portfolio_history
+
     def _log(self, message, color="endc"):
         if color in self.colors:
             print(f"{self.colors[color]}{message}{self.colors['endc']}")
         else:
             print(message)
 
+    def shutdown(self):
+        """Gọi khi đóng ứng dụng: lưu kho đề và dừng các tiến trình nền."""
+        self.grading_dataset = None
+        self.loading_dataset = None
+        self.batch_stop_requested = True
+        # Chỉ dừng những gì đã được tạo (không nạp module / đọc file kho chỉ để đóng)
+        if self._solve_jobs is not None: self._solve_jobs.cancel()
+        if self.compare_run is not None: self.compare_run.shutdown()
+        if self.portfolio_race is not None: self.portfolio_race.shutdown()
+        if self._puzzle_pool is not None: self._puzzle_pool.shutdown()
+
     def set_view(self, view: 'MainView'):
         self.view = view
         self.view.set_buttons_state_on_load()
     
     def handle_load_file(self):
+        from src.model.puzzle_store import STORE_EXT, store_path_for, is_store_fresh
         if self.is_visualizer_running:
             self.view.show_message("Lỗi", "Đang chạy Demo, không thể nạp file.", is_error=True)
             return
@@ -70,34 +163,26 @@ class AppController:
             initial_dir = self.data_dir
 
         filepath = filedialog.askopenfilename(
-            title="Chọn file CSV hoặc TXT",
+            title="Chọn file CSV, TXT hoặc kho đề .sdkb",
             initialdir=initial_dir,
-            filetypes=[("Data Files", "*.csv *.txt"), ("All files", "*.*")]
+            filetypes=[("Data Files", f"*.csv *.txt *{STORE_EXT}"), ("All files", "*.*")]
         )
         if not filepath: return
 
         try:
             filename = os.path.basename(filepath)
-            if filepath.endswith(".csv"):
-                self._log("[HỆ THỐNG] Đang nạp file CSV...", "cyan")
-                if self.view: self.view.root.update_idletasks()
-                
-                df = pd.read_csv(filepath)
-                if 'quizzes' not in df.columns or 'solutions' not in df.columns:
-                    raise ValueError("File thiếu cột 'quizzes' hoặc 'solutions'.")
-                
-                if 'clues' not in df.columns:
-                    self._log("[HỆ THỐNG] Đang đếm số gợi ý...", "cyan")
-                    df['clues'] = df['quizzes'].astype(str).apply(lambda x: sum(c != '0' for c in x))
-                
-                self.kaggle_df = df
-                self.csv_loaded = True
-                
-                self._log(f"[HỆ THỐNG] Đã nạp {len(self.kaggle_df):,} đề.", "green")
-                if self.view:
-                    self.view.update_puzzle_info(f"Đã nạp: {filename}")
-                    self.view.set_buttons_state_csv_loaded() 
-                    self.view.clear_fast_solve_stats() 
+            if filepath.endswith(STORE_EXT):
+                self._open_store(filepath)
+
+            elif filepath.endswith(".csv"):
+                store_path = store_path_for(filepath)
+                if is_store_fresh(store_path, filepath):
+                    # Đã chuyển đổi từ lần trước và CSV chưa đổi -> Mở kho nhị phân, không cần đọc lại CSV
+                    self._log(f"[HỆ THỐNG] Dùng kho đề đã chuyển đổi: {os.path.basename(store_path)}", "cyan")
+                    self._open_store(store_path, source_path=filepath)
+                else:
+                    self._log("[HỆ THỐNG] Đang nạp file CSV...", "cyan")
+                    self._start_csv_loading(filepath)
             
             elif filepath.endswith(".txt"):
                 self._log("[HỆ THỐNG] Đang nạp file .txt...", "cyan")
@@ -117,7 +202,8 @@ class AppController:
                 self._log(f"[HỆ THỐNG] Nạp file {filename} thành công.", "green")
 
         except Exception as e:
-            self.kaggle_df = None
+            self.dataset = None
+            self.loading_dataset = None
             self.csv_loaded = False
             self.current_puzzle_data = None
             if self.view:
@@ -125,6 +211,136 @@ class AppController:
                 self.view.show_message("Lỗi Nạp File", f"Không thể đọc file:\n{e}", is_error=True)
             self._log(f"[LỖI] Nạp file thất bại: {e}", "fail")
             
+    def _open_store(self, store_path, source_path=None):
+        """Mở kho .sdkb (chỉ đọc header + ánh xạ bộ nhớ nên gần như tức thì) và dùng làm bộ dữ liệu đề."""
+        from src.model.puzzle_store import PuzzleStore
+        store = PuzzleStore(store_path)
+        self.loading_dataset = None
+        self.grading_dataset = None
+        self.dataset = store
+        self.csv_loaded = len(store) > 0
+        self._attach_index(store, source_path or store_path)
+        self._log(f"[HỆ THỐNG] Đã mở kho {store.source}: {len(store):,} đề {store.size}x{store.size}.", "green")
+        if self.view:
+            self.view.clear_fast_solve_stats()
+            self.view.update_puzzle_info(f"Đã nạp: {store.source}")
+            if self.csv_loaded: self.view.set_buttons_state_csv_loaded()
+            else: self.view.set_buttons_state_on_load()
+        if self.csv_loaded: self._start_grading(store)
+
+    def _start_csv_loading(self, filepath):
+        """
+        Nạp CSV theo khối ở luồng nền; luồng giao diện nhận tiến độ qua load_queue (root.after).
+        Nạp xong thì ghi kho .sdkb cạnh file CSV (lần sau mở ngay) và chuyển sang đọc từ kho đó.
+        """
+        from src.model.puzzle_dataset import PuzzleDataset, stream_csv
+        from src.model.puzzle_store import PuzzleStore, store_path_for, save_store
+        dataset = PuzzleDataset()
+        dataset.source = os.path.basename(filepath)
+        self.loading_dataset = dataset
+        self.grading_dataset = None
+        self.bucket_index = None
+
+        def worker():
+            try:
+                for quizzes, solutions, done, total in stream_csv(filepath):
+                    if self.loading_dataset is not dataset:
+                        return   # Đã chọn file khác / đóng ứng dụng
+                    dataset.append(quizzes, solutions)
+                    self.load_queue.put(("chunk", dataset, done, total))
+                dataset.is_complete = True
+                store, store_error = None, None
+                try:
+                    save_store(dataset, store_path_for(filepath))
+                    store = PuzzleStore(store_path_for(filepath))
+                except (OSError, ValueError) as e:
+                    store_error = str(e)   # Không ghi được kho -> Vẫn dùng bản trong bộ nhớ, báo lỗi trên luồng giao diện
+                self.load_queue.put(("done", dataset, store, filepath, store_error))
+            except Exception as e:
+                self.load_queue.put(("error", dataset, str(e)))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self._poll_load_queue()
+
+    def _poll_load_queue(self):
+        while True:
+            try:
+                event = self.load_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind, dataset = event[0], event[1]
+            if dataset is not self.loading_dataset:
+                continue
+            if kind == "chunk":
+                _, _, done, total = event
+                first_chunk = self.dataset is not dataset
+                self.dataset = dataset
+                self.csv_loaded = True
+                if self.view:
+                    self.view.update_puzzle_info(f"Đang nạp {dataset.source}: {done * 100 // max(total, 1)}% ({len(dataset):,} đề)")
+                    if first_chunk:
+                        # Khối đầu tiên đã có -> Cho phép lấy đề ngay
+                        self.view.set_buttons_state_csv_loaded()
+                        self.view.clear_fast_solve_stats()
+            elif kind == "done":
+                self.loading_dataset = None
+                if event[4] is not None:
+                    self._log(f"[HỆ THỐNG] Không ghi được kho .sdkb, dùng bộ dữ liệu trong bộ nhớ: {event[4]}", "warning")
+                if event[2] is not None:
+                    dataset = event[2]   # Đọc tiếp từ kho nhị phân vừa ghi (giải phóng bản trong bộ nhớ)
+                self.dataset = dataset
+                self.csv_loaded = len(dataset) > 0
+                self._attach_index(dataset, event[3])
+                self._log(f"[HỆ THỐNG] Đã nạp {len(dataset):,} đề.", "green")
+                if self.view:
+                    self.view.update_puzzle_info(f"Đã nạp: {dataset.source}")
+                    if self.csv_loaded: self.view.set_buttons_state_csv_loaded()
+                if self.csv_loaded: self._start_grading(dataset)
+                return
+            else:
+                self.loading_dataset = None
+                if self.dataset is dataset: self.dataset = None
+                self.csv_loaded = self.dataset is not None
+                self._log(f"[LỖI] Nạp file thất bại: {event[2]}", "fail")
+                if self.view:
+                    if not self.csv_loaded: self.view.set_buttons_state_on_load()
+                    self.view.show_message("Lỗi Nạp File", f"Không thể đọc file:\n{event[2]}", is_error=True)
+                return
+
+        if self.view: self.view.root.after(100, self._poll_load_queue)
+
+    def _attach_index(self, dataset, source_path):
+        """Nạp chỉ mục nhóm độ khó từ file .idx.npz cạnh file nguồn (nếu file nguồn chưa đổi), ngược lại dựng mới."""
+        from src.model.bucket_index import BucketIndex, index_path_for, file_fingerprint
+        self.dataset_path = source_path
+        index_path = index_path_for(source_path)
+        try:
+            fingerprint = file_fingerprint(source_path)
+        except OSError:
+            fingerprint = None
+        index = None
+        if fingerprint is not None:
+            try:
+                index = BucketIndex.load(index_path, fingerprint, len(dataset))
+            except (OSError, ValueError, KeyError) as e:
+                self._log(f"[HỆ THỐNG] Không đọc được chỉ mục độ khó, dựng lại: {e}", "warning")
+        if index is not None:
+            self._log(f"[HỆ THỐNG] Dùng lại chỉ mục độ khó: {os.path.basename(index_path)}", "cyan")
+            self.bucket_index = index
+            return
+        self.bucket_index = BucketIndex.build(dataset)
+        if fingerprint is not None: self._save_index(self.bucket_index)
+
+    def _save_index(self, index):
+        """Lưu chỉ mục ra file .idx.npz cạnh file nguồn; lỗi ghi chỉ được ghi log (lần sau sẽ dựng lại)."""
+        from src.model.bucket_index import index_path_for, file_fingerprint
+        if self.bucket_index is not index or not self.dataset_path:
+            return
+        try:
+            index.save(index_path_for(self.dataset_path), file_fingerprint(self.dataset_path))
+        except OSError as e:
+            self._log(f"[HỆ THỐNG] Lỗi lưu chỉ mục độ khó: {e}", "fail")
+
     def handle_size_change(self, size_str: str):
         try:
             new_size = int(size_str.split('x')[0])
@@ -138,61 +354,215 @@ class AppController:
                 self.view.update_puzzle_info(f"Đã chọn kích thước: {new_size}x{new_size}")
                 self.view.set_buttons_state_puzzle_on_grid(self.csv_loaded)
             self._log(f"[HỆ THỐNG] Đổi kích thước sang {new_size}x{new_size}", "blue")
+            # Sinh sẵn đề cho kích thước mới ở nền
+            self.puzzle_pool.warm(new_size)
+            self._report_pool_errors()
         except Exception as e:
             print(f"Lỗi đổi size: {e}")
 
     def handle_get_csv_puzzle(self, difficulty: str):
-        if self.current_size == 9 and self.kaggle_df is not None:
+        dataset = self.dataset
+        if dataset is not None and len(dataset) and dataset.size == self.current_size:
             try:
-                df_filtered = None
-                if difficulty == 'extreme':
-                    df_filtered = self.kaggle_df[self.kaggle_df['clues'] < 25]
-                    if df_filtered.empty: difficulty = 'hard'
-                if difficulty == 'hard':
-                    df_filtered = self.kaggle_df[(self.kaggle_df['clues'] >= 25) & (self.kaggle_df['clues'] <= 29)]
-                    if df_filtered.empty: difficulty = 'medium'
-                if difficulty == 'medium':
-                    df_filtered = self.kaggle_df[(self.kaggle_df['clues'] >= 30) & (self.kaggle_df['clues'] <= 35)]
-                    if df_filtered.empty: difficulty = 'easy'
-                if difficulty == 'easy':
-                    df_filtered = self.kaggle_df[self.kaggle_df['clues'] > 35]
-
-                if df_filtered is None or df_filtered.empty:
-                    df_filtered = self.kaggle_df 
-                
-                random_row = df_filtered.sample(n=1).iloc[0]
-                self.current_known_solution = self._string_to_grid(str(random_row['solutions']), 9)
-                grid_data = self._string_to_grid(str(random_row['quizzes']), 9)
+                source = "CSV"
+                index = self.bucket_index
+                if index is not None and index.rows == len(dataset):
+                    # Rút từ chỉ mục nhóm độ khó (O(1), không lặp đề trong phiên)
+                    row, key = index.sample(difficulty)
+                    if key is not None:
+                        kind, difficulty = key.split(":")
+                        if kind == "grade": source = "CSV, chấm theo kỹ thuật"
+                        self._log(f"[HỆ THỐNG] Nhóm {key}: còn {index.remaining(key):,}/{index.count(key):,} đề chưa ra.", "cyan")
+                    if row is None:
+                        row = random.randrange(len(dataset))
+                else:
+                    # Đang nạp dở (chưa có chỉ mục) -> Lọc trực tiếp, ưu tiên độ khó theo kỹ thuật giải
+                    indices = dataset.indices_by_grade(difficulty)
+                    if len(indices):
+                        source = "CSV, chấm theo kỹ thuật"
+                    else:
+                        indices, difficulty = self._filter_by_clues(difficulty)
+
+                    if not len(indices):
+                        indices = range(len(dataset))
+                    row = int(indices[random.randrange(len(indices))])
+
+                self.current_known_solution = dataset.solution_grid(row)
+                grid_data = dataset.quiz_grid(row)
                 self.current_puzzle_data = copy.deepcopy(grid_data)
 
                 if self.view: 
                     self.view.load_puzzle_to_grid(grid_data, is_play_mode=self.is_play_mode)
                     self.view.set_buttons_state_puzzle_on_grid(self.csv_loaded)
-                    self.view.update_puzzle_info(f"Đã nạp: {difficulty.upper()} (CSV)")
+                    self.view.update_puzzle_info(f"Đã nạp: {difficulty.upper()} ({source})")
                 
-                self._log(f"[HỆ THỐNG] Đã nạp đề CSV: {difficulty.upper()}", "green")
+                self._log(f"[HỆ THỐNG] Đã nạp đề CSV: {difficulty.upper()} ({source})", "green")
                 return
             except Exception as e:
                 self.view.show_message("Lỗi Lấy Đề", f"Lỗi CSV: {e}", is_error=True)
                 return
         else:
-            self._log(f"[GENERATOR] Đang sinh đề {self.current_size}x{self.current_size} độ khó {difficulty}...", "cyan")
-            if self.view: self.view.root.update_idletasks()
+            if self.generate_job_id is not None:
+                self._log("[GENERATOR] Đang sinh đề, vui lòng chờ...", "warning")
+                return
             try:
-                gen = SudokuGenerator(size=self.current_size)
-                puzzle, solution = gen.generate_puzzle(difficulty)
-                
-                self.current_puzzle_data = puzzle
-                self.current_known_solution = solution
-                
-                if self.view:
-                    self.view.load_puzzle_to_grid(puzzle, is_play_mode=self.is_play_mode)
-                    self.view.set_buttons_state_puzzle_on_grid(True) 
-                    self.view.update_puzzle_info(f"Đã sinh: {difficulty.upper()} (Gen)")
-                
-                self._log(f"[GENERATOR] Sinh đề thành công.", "green")
+                item = self.puzzle_pool.take(self.current_size, difficulty)
             except Exception as e:
                 self.view.show_message("Lỗi Sinh Đề", f"Không thể sinh đề: {e}", is_error=True)
+                return
+            self._report_pool_errors()
+            if item is not None:
+                puzzle, solution = item
+                pool_stats = self.puzzle_pool.stats()
+                self._log(f"[GENERATOR] Lấy đề từ kho: còn {self.puzzle_pool.depth(self.current_size, difficulty)} đề, "
+                          f"tốc độ sinh nền {pool_stats['fill_rate']:.2f} đề/s.", "green")
+                self._show_generated_puzzle(puzzle, solution, difficulty, "Kho")
+                if self.current_size <= 9: self._grade_in_background(puzzle)
+            else:
+                # Kho rỗng (vừa mở ứng dụng / lấy quá nhanh) -> Sinh ở luồng nền, giao diện chờ ở trạng thái "đang sinh"
+                self._generate_in_background(self.current_size, difficulty)
+
+    def _report_pool_errors(self):
+        """Ghi log lỗi của kho đề nền nếu có lỗi mới kể từ lần báo trước (kèm các cặp đã ngừng sinh bù)."""
+        pool_stats = self.puzzle_pool.stats()
+        if pool_stats["errors"] == self._pool_errors_shown:
+            return
+        self._pool_errors_shown = pool_stats["errors"]
+        self._log(f"[GENERATOR] Kho đề nền lỗi ({pool_stats['errors']} lần): {pool_stats['last_error']}", "fail")
+        if pool_stats["stopped"]:
+            self._log(f"[GENERATOR] Ngừng sinh sẵn cho {', '.join(pool_stats['stopped'])} sau nhiều lần lỗi liên tiếp.", "warning")
+
+    def _show_generated_puzzle(self, puzzle, solution, difficulty, source):
+        self.current_puzzle_data = puzzle
+        self.current_known_solution = solution
+        if self.view:
+            self.view.load_puzzle_to_grid(puzzle, is_play_mode=self.is_play_mode)
+            self.view.set_buttons_state_puzzle_on_grid(True)
+            self.view.update_puzzle_info(f"Đã sinh: {difficulty.upper()} ({source})")
+
+    def _generate_in_background(self, size, difficulty):
+        """Sinh đề (và chấm độ khó với đề <= 9x9) trên luồng nền; kết quả hiện lên lưới khi xong."""
+        self._log(f"[GENERATOR] Đang sinh đề {size}x{size} độ khó {difficulty}...", "cyan")
+        if self.view:
+            self.view.set_buttons_state_generating(True, self.csv_loaded)
+            self.view.update_puzzle_info(f"Đang sinh đề {size}x{size}: {difficulty.upper()}...")
+        mode = self.generator_mode
+
+        def task(job):
+            from src.model.sudoku_generator import SudokuGenerator
+            from src.model.difficulty_grader import grade_puzzle
+            gen = SudokuGenerator(size=size, mode=mode)
+            puzzle, solution = gen.generate_puzzle(difficulty)
+            grade = grade_puzzle(puzzle) if size <= 9 else None
+            return puzzle, solution, gen.last_stats, grade
+
+        self.generate_job_id = self.solve_jobs.submit(
+            task,
+            on_done=lambda result: self._finish_generate(difficulty, result),
+            on_error=self._generate_failed,
+        )
+        self._start_solve_polling()
+
+    def _finish_generate(self, difficulty, result):
+        self.generate_job_id = None
+        puzzle, solution, gen_stats, grade = result
+        if self.view: self.view.set_buttons_state_generating(False, self.csv_loaded)
+        self._log(f"[GENERATOR] Sinh đề thành công (lời giải duy nhất): xóa {gen_stats['removed']}/{gen_stats['target']} ô, "
+                  f"{gen_stats['solver_checks']} lần kiểm tra bằng bộ giải, {gen_stats['elapsed_sec']:.2f}s.", "green")
+        # Hết thời gian đục lỗ trước khi đủ số ô -> Ghi nhãn theo mức thực đạt được
+        reached = gen_stats.get("difficulty", difficulty)
+        if reached != difficulty:
+            self._log(f"[GENERATOR] Chỉ đạt mức {reached.upper()} (yêu cầu {difficulty.upper()}).", "warning")
+        self._show_generated_puzzle(puzzle, solution, reached, "Gen")
+        self._log_grade(grade)
+
+    def _generate_failed(self, message):
+        self.generate_job_id = None
+        error = message.strip().splitlines()[-1]
+        if self.view:
+            self.view.set_buttons_state_generating(False, self.csv_loaded)
+            self.view.update_puzzle_info("")
+            self.view.show_message("Lỗi Sinh Đề", f"Không thể sinh đề: {error}", is_error=True)
+        self._log(f"[GENERATOR] Lỗi: {error}", "fail")
+
+    def _grade_in_background(self, puzzle):
+        """Chấm độ khó theo kỹ thuật giải cho đề lấy từ kho (luồng nền); chỉ ghi log nếu đề vẫn đang trên lưới."""
+        from src.model.difficulty_grader import grade_puzzle
+        grid = copy.deepcopy(puzzle)
+        self.solve_jobs.submit(
+            lambda job: grade_puzzle(grid),
+            on_done=lambda grade: self._log_grade(grade) if self.current_puzzle_data is puzzle else None,
+            on_error=lambda message: self._log(f"[GENERATOR] Lỗi chấm độ khó: {message.strip().splitlines()[-1]}", "fail"),
+        )
+        self._start_solve_polling()
+
+    def _log_grade(self, grade):
+        if grade: self._log(f"[GENERATOR] Độ khó theo kỹ thuật: {grade['grade'].upper()} (khó nhất: {grade['hardest']}, điểm {grade['score']}).", "cyan")
+
+    def _filter_by_clues(self, difficulty):
+        """
+        Lọc đề CSV theo số gợi ý (khi chưa có độ khó theo kỹ thuật, ngưỡng co giãn theo kích thước lưới);
+        hạ dần độ khó nếu rỗng. Trả về (chỉ số đề, độ khó thực dùng).
+        """
+        from src.model.bucket_index import clue_buckets
+        buckets = clue_buckets(self.dataset.cells)
+        names = [name for name, _, _ in buckets]
+        start = names.index(difficulty) if difficulty in names else len(names) - 1
+        indices = []
+        for difficulty, low, high in buckets[start:]:
+            indices = self.dataset.indices_by_clues(low, high)
+            if len(indices): break
+        return indices, difficulty
+
+    def _start_grading(self, dataset, slice_size=100_000):
+        """
+        Chấm độ khó theo kỹ thuật ở luồng nền (nhiều tiến trình, chừa một lõi cho giao diện).
+        Chỉ chấm các đề chưa có độ khó - kho .sdkb lưu sẵn kết quả các lần trước.
+        """
+        import numpy as np
+        from src.model.difficulty_grader import GRADES, grade_many
+        from src.model.puzzle_store import PuzzleStore
+        self.grading_dataset = dataset
+        index = self.bucket_index
+        cache = self.grade_cache   # Tạo trên luồng giao diện, luồng chấm chỉ dùng lại
+        total = len(dataset)
+        workers = max(1, (os.cpu_count() or 2) - 1)
+
+        def worker():
+            try:
+                # Chấm theo từng phần để không phải tạo chuỗi cho cả bộ dữ liệu cùng lúc
+                for start in range(0, total, slice_size):
+                    codes = dataset.grades[start:start + slice_size]
+                    missing = np.flatnonzero(codes < 0)
+                    if not len(missing):
+                        continue
+                    if len(missing) == len(codes):
+                        quizzes = dataset.quiz_strings(start, start + len(codes))
+                    else:
+                        quizzes = [dataset.quiz_string(start + int(pos)) for pos in missing]
+                    results = grade_many(quizzes, workers=workers, cache=cache,
+                                         progress=lambda done, _: self.grading_dataset is dataset)
+                    if self.grading_dataset is not dataset:
+                        return   # Đã nạp bộ dữ liệu khác / đóng ứng dụng -> Dừng
+                    labels = [GRADES[code] if code >= 0 else None for code in codes]
+                    for pos, result in zip(missing, results):
+                        labels[pos] = result[0] if result else None
+                    dataset.set_grades(start, labels)
+                    if isinstance(dataset, PuzzleStore): dataset.save_grades()
+                    if index is not None: index.rebuild_grades(dataset.grades)
+                    self._log(f"[ĐỘ KHÓ] Đã chấm {min(start + slice_size, total):,}/{total:,} đề.", "cyan")
+            except Exception as e:
+                self._log(f"[ĐỘ KHÓ] Lỗi chấm độ khó: {e}", "fail")
+                return
+            self._log(f"[ĐỘ KHÓ] Hoàn tất. Phân bố: {dataset.grade_counts()}", "green")
+            if index is not None: self._save_index(index)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def handle_ac_preprocess_toggle(self, enabled: bool):
+        self.ac_preprocess = bool(enabled)
+        state = "BẬT" if self.ac_preprocess else "TẮT"
+        self._log(f"[HỆ THỐNG] Lọc AC-3 / AllDifferent trước khi giải (BT / FC / DLX): {state}", "blue")
 
     def handle_mode_change(self, mode_str: str):
         self.is_play_mode = (mode_str == "👤 Người Chơi")
@@ -354,6 +724,19 @@ class AppController:
             self.view.show_message("Chú ý", "Bạn đang ở chế độ Người chơi. Hãy dùng nút 'Kiểm tra'.", is_error=True)
             return
 
+        # Đang giải ở luồng nền -> Nút Giải đóng vai trò nút Dừng
+        if self.solve_job_id is not None:
+            self.solve_jobs.cancel(self.solve_job_id)
+            self._log(f"{self.solve_job_tag} Đang hủy...", "warning")
+            return
+        if self.compare_run is not None:
+            self.handle_compare_closed()
+            return
+        if self.portfolio_race is not None:
+            self.portfolio_race.cancel()
+            self._log("[GIẢI] Đang hủy cuộc đua...", "warning")
+            return
+
         grid_data_to_solve = None
         try:
             if self.current_puzzle_data:
@@ -368,7 +751,12 @@ class AppController:
         
         (algo_key, is_demo_mode) = self.view.get_selected_algorithm()
         
-        if is_demo_mode:
+        if algo_key == 'portfolio':
+            if is_demo_mode:
+                self.view.show_message("Chú ý", "Chế độ Danh mục không có Demo. Hãy tắt Demo hoặc chọn một thuật toán.", is_error=True)
+            else:
+                self.run_portfolio_solve(grid_data_to_solve)
+        elif is_demo_mode:
             if self.is_visualizer_running:
                 self.is_visualizer_running = False
                 self._log("[DEMO] Đã dừng Demo.", "warning")
@@ -378,25 +766,37 @@ class AppController:
             self.run_fast_solve(grid_data_to_solve, algo_key)
 
     def run_fast_solve(self, grid_data, algo_key: str):
-        algo_map = {
-            'bt': ('profiler_bt', 'Backtracking'),
-            'fc': ('profiler_fc', 'Forward Checking'),
-            'fc_mrv': ('profiler_mrv', 'FC + MRV'),
-            'dlx': ('solver_dlx', 'Dancing Links (DLX)') 
+        algo_names = {
+            'bt': 'Backtracking',
+            'fc': 'Forward Checking',
+            'fc_mrv': 'FC + MRV',
+            'dlx': 'Dancing Links (DLX)'
         }
         
-        module_key, algo_name = algo_map.get(algo_key, (None, None))
-        if not module_key:
+        algo_name = algo_names.get(algo_key)
+        if not algo_name:
             self.view.show_message("Lỗi", f"Thuật toán '{algo_key}' không xác định.", is_error=True)
             return
 
         self._log(f"[GIẢI] Đang giải nhanh bằng {algo_name}...", "cyan")
         if self.view: self.view.set_buttons_state_visualizing(True, self.csv_loaded)
-        
-        board_wrapper, stats, is_solved = self._run_single_algo(
-            grid_data, module_key, algo_key 
+
+        # Giải nhanh không cần đếm nút / cắt tỉa -> Không truyền sink
+        def task(job):
+            return self._run_single_algo(grid_data, algo_key, budget=job.budget(timeout=self.solve_timeout_sec))
+
+        self.solve_job_id = self.solve_jobs.submit(
+            task,
+            on_done=lambda result: self._finish_fast_solve(grid_data, algo_name, result),
+            on_progress=self._show_solve_progress,
+            on_error=lambda message: self._solve_job_failed("[GIẢI]", message),
         )
-        
+        self.solve_job_tag = "[GIẢI]"
+        self._start_solve_polling()
+
+    def _finish_fast_solve(self, grid_data, algo_name: str, result):
+        self.solve_job_id = None
+        board_wrapper, stats, is_solved = result
         if self.view: self.view.set_buttons_state_visualizing(False, self.csv_loaded)
         
         if is_solved:
@@ -410,14 +810,77 @@ class AppController:
                     self._log("[GIẢI] Giải xong! Đã xác minh 100%!", "green")
                 else:
                     self._log("[GIẢI] Lời giải hợp lệ (nhưng khác đáp án mẫu).", "warning")
+        elif stats.get("budget_exceeded") == REASON_CANCELLED:
+            if self.view: self.view.clear_fast_solve_stats()
+            self._log(f"[GIẢI] Đã hủy ({algo_name}).", "warning")
+        elif is_solved is None:
+            # Chạm giới hạn: chưa biết đề có lời giải hay không
+            reason = budget_label(stats)
+            if self.view:
+                self.view.show_message("Dừng Giải", f"{reason} ({self.solve_timeout_sec:g} s) - chưa tìm được lời giải.", is_error=True)
+                self.view.clear_fast_solve_stats()
+            self._log(f"[GIẢI] {algo_name}: {reason} sau {stats.get('execution_time_sec', 0):.2f}s.", "warning")
         else:
             if self.view: 
                 self.view.show_message("Thất Bại", "Không tìm thấy lời giải.", is_error=True)
                 self.view.clear_fast_solve_stats()
             self._log(f"[GIẢI] Giải thất bại ({algo_name})", "fail")
 
+    def run_portfolio_solve(self, grid_data):
+        """Chế độ Danh mục: chạy đua các thuật toán ở các tiến trình riêng, lấy kết quả về đích đầu tiên."""
+        from src.model.portfolio import PortfolioRace, PORTFOLIO_ENGINES
+        names = dict(self.COMPARE_ALGORITHMS)
+        self._log(f"[GIẢI] Danh mục: chạy đua {', '.join(names[k] for k in PORTFOLIO_ENGINES)}...", "cyan")
+        race = PortfolioRace(grid_data, PORTFOLIO_ENGINES, timeout=self.solve_timeout_sec, dlx_engine=self.dlx_engine,
+                             ac_preprocess=self.ac_preprocess)
+        try:
+            race.start()
+        except Exception as e:
+            race.shutdown()
+            self._log(f"[LỖI] {e}", "fail")
+            if self.view: self.view.show_message("Lỗi", f"{e}", is_error=True)
+            return
+        self.portfolio_race = race
+        if self.view: self.view.set_buttons_state_visualizing(True, self.csv_loaded)
+        self._poll_portfolio(race, grid_data)
+
+    def _poll_portfolio(self, race, grid_data):
+        if not race.poll():
+            if self.view: self.view.root.after(50, lambda: self._poll_portfolio(race, grid_data))
+            return
+        self.portfolio_race = None
+        stats = race.stats
+        names = dict(self.COMPARE_ALGORITHMS)
+        errors = race.errors()
+        for key, error in errors.items():
+            self._log(f"[GIẢI] Danh mục: {names.get(key, key)} lỗi - {error}", "fail")
+        if race.winner is None:
+            if errors and "budget_exceeded" not in stats:
+                # Mọi thuật toán đều lỗi
+                self._solve_job_failed("[GIẢI]", "; ".join(f"{names.get(k, k)}: {e}" for k, e in errors.items()))
+                return
+            self._finish_fast_solve(grid_data, "Danh mục", (None, stats, None))
+            return
+
+        winner_name = names.get(race.winner, race.winner)
+        self.portfolio_history.record(grid_data, race.winner, race.is_solved, stats["execution_time_sec"])
+        wins = self.portfolio_history.wins(len(grid_data))
+        summary = ", ".join(f"{names.get(k, k)} {count}" for k, count in wins.most_common())
+        self._log(f"[GIẢI] Danh mục: {winner_name} về đích đầu tiên ({stats['execution_time_sec']:.4f}s giải, "
+                  f"{race.wall_sec:.2f}s tính cả khởi động tiến trình). Lịch sử {len(grid_data)}x{len(grid_data)}: {summary}.", "cyan")
+
+        stats["portfolio_winner"] = race.winner
+        stats["portfolio_winner_name"] = winner_name
+        board_wrapper = self.model_classes['SudokuBoard'](race.solution) if race.is_solved else None
+        self._finish_fast_solve(grid_data, f"Danh mục - {winner_name}", (board_wrapper, stats, race.is_solved))
+
+    # Các thuật toán của cửa sổ So sánh: algo_key -> tên hiển thị
+    COMPARE_ALGORITHMS = (('bt', 'Backtracking'), ('fc', 'Forward Checking'), ('fc_mrv', 'FC + MRV'),
+                          ('dlx', 'Dancing Links (DLX)'), ('fc_mrv_ac', 'FC + MRV + AC'))
+
     def handle_compare(self):
-        if self.is_visualizer_running: return
+        if self.is_visualizer_running or self.solve_job_id is not None or self.compare_run is not None: return
+        if self.portfolio_race is not None: return
         if self.analysis_popup_window and self.analysis_popup_window.winfo_exists():
             self.analysis_popup_window.focus() 
             return
@@ -434,79 +897,220 @@ class AppController:
             if self.view: self.view.show_message("Lỗi Đầu Vào", f"Lỗi: {e}", is_error=True)
             return
             
-        self._log("[PHÂN TÍCH] Đang chạy so sánh 4 thuật toán...", "cyan")
-        if self.view: self.view.root.update_idletasks()
-        
+        self._log("[PHÂN TÍCH] Đang chạy song song 5 thuật toán (mỗi thuật toán một tiến trình)...", "cyan")
+        from src.model.parallel_compare import ParallelCompare
+        algo_keys = [key for key, _ in self.COMPARE_ALGORITHMS]
+        # Mỗi thuật toán có giới hạn thời gian riêng; thuật toán bị dừng vẫn giữ số liệu đến lúc dừng
+        compare = ParallelCompare(grid_data_to_solve, algo_keys, timeout=self.compare_timeout_sec, dlx_engine=self.dlx_engine,
+                                  ac_preprocess=self.ac_preprocess)
         try:
-            _, bt_stats, _ = self._run_single_algo(grid_data_to_solve, 'profiler_bt', 'bt')
-            _, fc_stats, _ = self._run_single_algo(grid_data_to_solve, 'profiler_fc', 'fc')
-            _, mrv_stats, _ = self._run_single_algo(grid_data_to_solve, 'profiler_mrv', 'fc_mrv')
-            _, dlx_stats, _ = self._run_single_algo(grid_data_to_solve, 'solver_dlx', 'dlx')
-            
-            self.analysis_popup_window = self.analysis_popup_class(
-                self.view, self, bt_stats, fc_stats, mrv_stats, dlx_stats
-            )
+            compare.start()
+            # Cửa sổ mở ngay, mỗi thẻ được điền khi thuật toán tương ứng xong
+            self.analysis_popup_window = self.analysis_popup_class(self.view, self, algo_keys=algo_keys)
         except Exception as e:
+            compare.shutdown()
             self._log(f"[LỖI] {e}", "fail")
             if self.view: self.view.show_message("Lỗi So Sánh", f"{e}", is_error=True)
+            return
 
-    def handle_batch_compare_setup(self): pass 
-    def handle_run_batch_analysis(self, n_value: int, popup_instance: 'object'): pass
+        self.compare_run = compare
+        if self.view: self.view.set_buttons_state_visualizing(True, self.csv_loaded)
+        self._poll_compare(compare, self.analysis_popup_window)
 
-    def _run_single_algo(self, grid_data, module_key: str, algo_key: str):
-        SudokuBoard_class = self.model_classes['SudokuBoard']
-        
-        if algo_key == 'dlx':
-            board_wrapper = SudokuBoard_class(copy.deepcopy(grid_data))
-            stats = {"backtracks": 0}
-            
-            dlx_instance = self.model_classes['solver_dlx'].SudokuDLX(board_wrapper)
-            
-            if 'visualizer' in module_key:
-                generator = dlx_instance.solve_visual(board_wrapper, stats)
-                return (board_wrapper, stats, generator)
+    def _poll_compare(self, compare, popup):
+        """Nhận kết quả của các tiến trình so sánh và điền vào cửa sổ phân tích (chạy bằng root.after)."""
+        names = dict(self.COMPARE_ALGORITHMS)
+        popup_alive = popup is not None and popup.winfo_exists()
+        for key, stats, error in compare.poll():
+            if error is not None:
+                self._log(f"[PHÂN TÍCH] {names[key]}: Lỗi {error.strip().splitlines()[-1]}", "fail")
+            elif stats.get("budget_exceeded") == REASON_CANCELLED:
+                pass
+            elif budget_label(stats):
+                self._log(f"[PHÂN TÍCH] {names[key]}: {budget_label(stats)} sau {stats.get('execution_time_sec', 0):.2f}s "
+                          f"({stats.get('nodes_visited', 0):,} nút).", "warning")
             else:
-                board_wrapper.start_timer()
-                is_solved = dlx_instance.solve(stats)
-                board_wrapper.stop_timer()
-                
-                final_stats = board_wrapper.get_stats()
-                final_stats.update(stats)
-                return (board_wrapper, final_stats, is_solved)
+                self._log(f"[PHÂN TÍCH] {names[key]}: xong sau {stats['execution_time_sec']:.4f}s.", "green")
+            if popup_alive: popup.set_result(key, stats, error)
 
-        module = self.model_classes.get(module_key, self.model_classes['algorithms'])
-        solve_func = None
-        
-        if algo_key == 'bt':
-            if 'profiler' in module_key: solve_func = module.solve_backtracking_profile
-            elif 'visualizer' in module_key: solve_func = module.solve_backtracking_visual
-            else: solve_func = module.solve_backtracking
-        elif algo_key == 'fc':
-            if 'profiler' in module_key: solve_func = module.solve_forward_checking_profile
-            elif 'visualizer' in module_key: solve_func = module.solve_forward_checking_visual
-            else: solve_func = module.solve_forward_checking
-        elif algo_key == 'fc_mrv':
-            if 'profiler' in module_key: solve_func = module.solve_forward_checking_mrv_profile
-            elif 'visualizer' in module_key: solve_func = self.model_classes['visualizer_mrv'].solve_forward_checking_mrv_visual
-            else: solve_func = self.model_classes['profiler_mrv'].solve_forward_checking_mrv_profile
-        
+        if not compare.done:
+            if self.view: self.view.root.after(100, lambda: self._poll_compare(compare, popup))
+            return
+        self.compare_run = None
+        if self.view: self.view.set_buttons_state_visualizing(False, self.csv_loaded)
+        if compare.cancelled:
+            self._log("[PHÂN TÍCH] Đã hủy so sánh.", "warning")
+        else:
+            self._log(f"[PHÂN TÍCH] Hoàn tất sau {compare.wall_sec:.2f}s (thời gian thực, chạy song song).", "cyan")
+
+    def handle_compare_closed(self):
+        """Cửa sổ phân tích bị đóng khi còn thuật toán đang chạy -> dừng so sánh."""
+        if self.compare_run is not None and not self.compare_run.done:
+            self.compare_run.cancel()
+            self._log("[PHÂN TÍCH] Đang hủy so sánh...", "warning")
+
+    def _show_solve_progress(self, sample: dict):
+        if self.view: self.view.show_solve_progress(sample)
+
+    def _solve_job_failed(self, tag: str, message: str):
+        self.solve_job_id = None
+        if self.view:
+            self.view.set_buttons_state_visualizing(False, self.csv_loaded)
+            self.view.clear_fast_solve_stats()
+            self.view.show_message("Lỗi", message.strip().splitlines()[-1], is_error=True)
+        self._log(f"{tag} Lỗi: {message.strip().splitlines()[-1]}", "fail")
+
+    def _start_solve_polling(self):
+        if not self._solve_polling:
+            self._solve_polling = True
+            self._poll_solve_jobs()
+
+    def _poll_solve_jobs(self):
+        """Chuyển tiến độ / kết quả từ luồng giải sang luồng giao diện (chạy bằng root.after)."""
+        self.solve_jobs.dispatch()
+        if self.solve_jobs.has_pending() and self.view:
+            self.view.root.after(100, self._poll_solve_jobs)
+        else:
+            self._solve_polling = False
+
+    def handle_batch_compare_setup(self):
+        if self.dataset is None:
+            if self.view: self.view.show_message("Lỗi", "Hãy nạp file CSV trước khi giải hàng loạt.", is_error=True)
+            return
+        if self.batch_popup_window and self.batch_popup_window.winfo_exists():
+            self.batch_popup_window.focus()
+            return
+        if self.batch_analysis_popup_class is None: return
+        self.batch_popup_window = self.batch_analysis_popup_class(self.view, self, len(self.dataset))
+
+    def handle_run_batch_analysis(self, n_value: int, popup_instance: 'object'):
+        from src.model.batch_solver import BatchSolver
+        if self.is_batch_running or self.dataset is None: return
+        algo_keys = popup_instance.get_selected_algorithms()
+        if not algo_keys:
+            popup_instance.show_finished("Chưa chọn thuật toán nào.", is_error=True)
+            return
+
+        try:
+            solver = BatchSolver(algo_keys, size=self.dataset.size)
+        except ValueError as e:
+            popup_instance.show_finished(str(e), is_error=True)
+            return
+        # Lô đủ nhỏ để tiến độ cập nhật đều, đủ lớn để chi phí truyền giữa tiến trình không đáng kể
+        chunk_size = max(20, min(500, n_value // (solver.workers * 8) or 1))
+        dataset = self.dataset
+        self.batch_stop_requested = False
+        self.is_batch_running = True
+        popup_instance.set_running(True)
+        self._log(f"[BATCH] Giải {n_value:,} đề bằng {', '.join(algo_keys)} trên {solver.workers} tiến trình...", "cyan")
+
+        def worker():
+            try:
+                results = solver.run(
+                    dataset.iter_chunks(chunk_size, limit=n_value), total=n_value,
+                    progress=lambda key, metrics: self.batch_queue.put(("progress", key, metrics)),
+                    should_stop=lambda: self.batch_stop_requested,
+                )
+                self.batch_queue.put(("done", results))
+            except Exception as e:
+                self.batch_queue.put(("error", str(e)))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self._poll_batch_queue(popup_instance, n_value * len(algo_keys), {})
+
+    def handle_stop_batch_analysis(self):
+        self.batch_stop_requested = True
+
+    def _poll_batch_queue(self, popup, total_jobs: int, counts: dict):
+        """Đọc các sự kiện từ luồng giải hàng loạt và cập nhật popup (chạy trên luồng giao diện)."""
+        popup_alive = popup is not None and popup.winfo_exists()
+        while True:
+            try:
+                event = self.batch_queue.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "progress":
+                _, key, metrics = event
+                counts[key] = metrics["count"]
+                if popup_alive:
+                    popup.update_progress(key, metrics, sum(counts.values()) / total_jobs if total_jobs else 1.0)
+                continue
+
+            self.is_batch_running = False
+            if event[0] == "error":
+                self._log(f"[BATCH] Lỗi: {event[1]}", "fail")
+                if popup_alive: popup.show_finished(f"Lỗi: {event[1]}", is_error=True)
+                return
+            results = event[1]
+            for key, metrics in results.items():
+                if popup_alive: popup.update_progress(key, metrics, 1.0)
+                self._log(f"[BATCH] {key}: giải {metrics['solved']:,}/{metrics['count']:,}, đúng {metrics['accuracy'] * 100:.2f}%, "
+                          f"TB {metrics['avg_ms']:.3f} ms/đề.", "green")
+            wall = next(iter(results.values()))["wall_sec"] if results else 0.0
+            stopped = any(metrics["stopped"] for metrics in results.values())
+            message = f"{'Đã dừng' if stopped else 'Hoàn tất'} sau {wall:.2f}s."
+            if popup_alive: popup.show_finished(message)
+            return
+
+        if self.view: self.view.root.after(100, lambda: self._poll_batch_queue(popup, total_jobs, counts))
+
+    def _make_dlx_solver(self, board_wrapper):
+        """Tạo bộ giải DLX theo self.dlx_engine (mặc định dùng bản mảng nếu model có cung cấp)."""
+        if self.dlx_engine == 'array' and 'solver_dlx_array' in self.model_classes:
+            return self.model_classes['solver_dlx_array'].SudokuDLXArray(board_wrapper)
+        return self.model_classes['solver_dlx'].SudokuDLX(board_wrapper)
+
+    # algo_key -> (module Model, hàm giải (board_wrapper, stats, sink) -> bool)
+    SOLVE_FUNCTIONS = {
+        'bt': ('algorithms', 'solve_backtracking'),
+        'fc': ('algorithms', 'solve_forward_checking'),
+        'fc_mrv': ('algorithms_mrv', 'solve_forward_checking_mrv'),
+        'fc_mrv_ac': ('algorithms_mrv', 'solve_forward_checking_mrv_ac'),
+    }
+
+    def _run_single_algo(self, grid_data, algo_key: str, sink=None, budget=None):
+        """
+        Chạy một thuật toán trên bản sao của grid_data. Cùng một engine cho mọi chế độ, sink quyết định cách chạy:
+        - None: giải nhanh (chỉ đếm số bước quay lui); CountingSink: đo thêm số nút / cắt tỉa (so sánh);
+        - EventSink: trả về generator trạng thái cho Demo thay vì kết quả.
+        budget: SearchBudget (số nút / thời gian / token hủy); chạm giới hạn thì kết quả là None
+        và stats["budget_exceeded"] ghi lý do.
+        Trả về (board_wrapper, stats, đã giải được (True / False / None) | generator).
+        """
+        SudokuBoard_class = self.model_classes['SudokuBoard']
         board_wrapper = SudokuBoard_class(copy.deepcopy(grid_data))
-        stats = {"backtracks": 0} 
-        board_wrapper.start_timer()
-        
-        is_solved_or_generator = solve_func(board_wrapper, stats)
-        
-        if 'visualizer' in module_key:
-            return (board_wrapper, stats, is_solved_or_generator)
-        
+        stats = {"backtracks": 0}
+        is_visual = sink is not None and sink.emit
+
+        if algo_key == 'dlx':
+            if is_visual:
+                dlx_instance = self._make_dlx_solver(board_wrapper)
+                return (board_wrapper, stats, dlx_instance.solve_visual(board_wrapper, stats))
+            from src.model.arc_consistency import preprocess
+            board_wrapper.start_timer()
+            # Lọc AC phát hiện mâu thuẫn -> Vô nghiệm, không cần dựng ma trận DLX
+            is_solved = False
+            if not self.ac_preprocess or preprocess(board_wrapper, stats, fill_forced=True) is not None:
+                is_solved = self._make_dlx_solver(board_wrapper).solve(stats, budget)
+        elif is_visual:
+            generator = self.model_classes['visualizer'].solve_visual(algo_key, board_wrapper, stats, sink)
+            return (board_wrapper, stats, generator)
+        else:
+            module_key, func_name = self.SOLVE_FUNCTIONS[algo_key]
+            solve_func = getattr(self.model_classes[module_key], func_name)
+            extra = {"ac_preprocess": True} if self.ac_preprocess and algo_key in ('bt', 'fc') else {}
+            board_wrapper.start_timer()
+            is_solved = solve_func(board_wrapper, stats, sink=sink, budget=budget, **extra)
+
         board_wrapper.stop_timer()
         final_stats = board_wrapper.get_stats()
         final_stats.update(stats)
-        return (board_wrapper, final_stats, is_solved_or_generator)
+        return (board_wrapper, final_stats, is_solved)
 
     def handle_clear(self):
         if self.is_visualizer_running: self.is_visualizer_running = False 
         if self.analysis_popup_window: self.analysis_popup_window.destroy() 
+        self.handle_compare_closed()
         
         if self.view:
             if self.current_puzzle_data:
@@ -524,24 +1128,20 @@ class AppController:
             self.view.set_buttons_state_visualizing(True, self.csv_loaded)
         
         target_key = "bt"
-        mod_name = "visualizer_bt"
         algo_full_name = "Backtracking"
 
         if algo_key == 'visualizer_dlx':
             target_key = 'dlx'
-            mod_name = 'visualizer_dlx'
             algo_full_name = "Dancing Links (DLX)"
         elif algo_key == 'visualizer_mrv':
             target_key = 'fc_mrv'
-            mod_name = 'visualizer_mrv'
             algo_full_name = "FC + MRV"
         elif algo_key == 'visualizer_fc':
             target_key = 'fc'
-            mod_name = 'visualizer_fc'
             algo_full_name = "Forward Checking"
             
         board_wrapper, _, generator = self._run_single_algo(
-            grid_data, mod_name, target_key
+            grid_data, target_key, self.model_classes['sinks'].EventSink()
         )
         
         self.visualizer_generator = generator
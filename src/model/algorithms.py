@@ -1,158 +1,258 @@
 from .sudoku_board import SudokuBoard
-import copy 
-
-def solve_backtracking(board_wrapper: SudokuBoard, stats: dict):
-    # Tìm ô trống đầu tiên trên bàn cờ để bắt đầu điền thử
-    empty_cell = board_wrapper.find_empty_cell()
-    
-    # Nếu không còn ô trống nào, tức là bàn cờ đã được giải xong hoàn toàn
-    if not empty_cell:
-        return True  
-    
-    row, col = empty_cell
-    
-    # Thử lần lượt các giá trị từ 1 đến N vào ô trống vừa tìm được
-    for num in range(1, board_wrapper.n + 1):
-        # Kiểm tra xem số này có vi phạm quy tắc hàng, cột hay khối không
-        if board_wrapper.is_valid(num, row, col):
-            # Nếu hợp lệ, tạm thời điền số này vào ô
-            board_wrapper.set_cell(row, col, num)
-            
-            # Gọi đệ quy để tiếp tục giải các ô tiếp theo
-            if solve_backtracking(board_wrapper, stats):
-                return True  
-            
-            # Nếu nhánh đệ quy phía sau thất bại (gặp ngõ cụt), tăng biến đếm quay lui
-            stats["backtracks"] = stats.get("backtracks", 0) + 1
-            
-            # Trả lại giá trị 0 (xóa số) để thử số khác ở vòng lặp tiếp theo
-            board_wrapper.set_cell(row, col, 0)
-            
-    # Nếu đã thử hết các số mà không có số nào thỏa mãn, trả về False để kích hoạt quay lui ở bước trước
-    return False
-
-def solve_forward_checking(board_wrapper: SudokuBoard, stats: dict):
+from .candidate_engine import BitmaskDomains
+from .arc_consistency import preprocess
+from .sinks import sink_flags
+from .search_budget import NO_LIMIT
+
+# Các hàm tìm kiếm dưới đây được viết dạng VÒNG LẶP với ngăn xếp tường minh (explicit stack)
+# thay vì đệ quy: không bị giới hạn độ sâu đệ quy của Python (25x25 có thể sâu ~600 tầng)
+# và không tốn chi phí gọi hàm cho mỗi ô.
+#
+# Mỗi thuật toán có đúng một engine, nhận một sink tùy chọn (xem sinks.py):
+# - sink=None / CountingSink: generator chạy một mạch đến khi xong (không yield lần nào);
+#   các bộ đếm là biến cục bộ, chỉ ghi vào stats khi kết thúc (CountingSink ghi thêm
+#   nodes_visited / prunes_made).
+# - EventSink / QueueSink: yield một sự kiện ở mỗi bước, nhờ vậy có thể tạm dừng / chạy tiếp
+#   (Visualizer chỉ cần lặp qua các sự kiện, không cần chuỗi `yield from` đệ quy).
+#
+# Sự kiện (tuple):
+#   ("try", cell, num)            - vừa điền thử num vào ô
+#   ("prune", cell, ok, log)      - vừa cắt tỉa hàng xóm (chỉ FC / FC + MRV)
+#   ("backtrack", cell, num)      - vừa quay lui, xóa num khỏi ô
+#   ("solved",)                   - đã giải xong
+# Với Backtracking `cell` là (row, col); với FC / FC + MRV `cell` là chỉ số phẳng idx = r * n + c.
+
+def run_search(search, sink=None):
+    """
+    Chạy generator tìm kiếm đến khi kết thúc và trả về kết quả (True / False).
+    Nếu sink phát sự kiện (QueueSink), mỗi sự kiện được chuyển cho sink.event().
+    """
+    on_event = sink.event if sink is not None and sink.emit else None
     try:
-        # Trước khi giải, khởi tạo tập hợp các giá trị khả dĩ (domain) cho từng ô
-        # và loại bỏ ngay những giá trị không hợp lệ dựa trên các số đã có sẵn
-        domains = _initialize_domains(board_wrapper)
-    except ValueError:
-        # Nếu ngay từ đầu đề bài đã mâu thuẫn, trả về False
-        return False 
-        
-    # Bắt đầu quá trình giải đệ quy với tập domains đã được chuẩn bị
-    return _solve_fc_recursive(board_wrapper, stats, domains)
-
-def _initialize_domains(board_wrapper):
+        if on_event is None:
+            while True:
+                next(search)
+        else:
+            while True:
+                on_event(next(search))
+    except StopIteration as stop:
+        return stop.value
+
+def publish_counters(stats: dict, counting, nodes, prunes, backtracks):
+    """Ghi các bộ đếm cục bộ của engine vào stats (prunes=None: thuật toán không cắt tỉa)."""
+    stats["backtracks"] = backtracks
+    if counting:
+        stats["nodes_visited"] = nodes
+        if prunes is not None:
+            stats["prunes_made"] = prunes
+
+def solve_backtracking(board_wrapper: SudokuBoard, stats: dict, sink=None, budget=None, ac_preprocess=False):
+    """
+    Backtracking:
+    1. Tìm ô trống. Nếu hết ô trống -> Giải xong.
+    2. Thử lần lượt các số từ 1 đến N.
+    3. Nếu điền được -> Đi xuống ô tiếp theo.
+    4. Nếu nhánh phía sau thất bại -> Quay lui (Xóa số) và thử số khác.
+    ac_preprocess=True: lọc AC-3 / AllDifferent trước (arc_consistency.preprocess) và điền sẵn các ô
+    chỉ còn 1 giá trị vào bàn cờ; stats có thêm các chỉ số ac_*.
+    """
+    if ac_preprocess and preprocess(board_wrapper, stats, fill_forced=True) is None:
+        return False
+    return run_search(search_backtracking(board_wrapper, stats, sink, budget), sink)
+
+def search_backtracking(board_wrapper: SudokuBoard, stats: dict, sink=None, budget=None):
+    """
+    Backtracking dạng vòng lặp.
+    Mỗi khung (frame) trên ngăn xếp là [row, col, số tiếp theo cần thử].
+    sink: xem sinks.py (CountingSink đếm thêm stats["nodes_visited"]).
+    budget: SearchBudget (xem search_budget.py) - chạm giới hạn thì trả về None.
+    """
+    counting, emit = sink_flags(sink)
     n = board_wrapper.n
     board = board_wrapper.get_board()
-    
-    # Tạo miền giá trị ban đầu là tất cả các số từ 1 đến N cho mọi ô
-    full_domain = set(range(1, n + 1))
-    domains = [[full_domain.copy() for _ in range(n)] for _ in range(n)]
-    
-    # Duyệt qua bàn cờ, nếu ô nào đã có số (đề bài), chốt domain của nó chỉ còn số đó
-    # Đồng thời loại bỏ số đó khỏi domain của các ô hàng xóm (hàng, cột, khối)
-    for r in range(n):
-        for c in range(n):
-            num = board[r][c]
-            if num != 0:
-                domains[r][c] = {num}
-                # Thực hiện lan truyền ràng buộc ngay lập tức
-                if not _prune_domains_on_setup(domains, r, c, num, board_wrapper):
-                    raise ValueError("Invalid initial puzzle")
-    return domains
-
-def _prune_domains_on_setup(domains, r, c, num, board_wrapper):
-    n = board_wrapper.n
-    box_size = board_wrapper.box_size
-    
-    # Loại bỏ số 'num' khỏi domain của tất cả các ô trong cùng hàng
-    for col in range(n):
-        if col != c and num in domains[r][col]:
-            domains[r][col].remove(num)
-            # Nếu sau khi loại bỏ mà ô đó không còn giá trị nào để điền -> Mâu thuẫn
-            if not domains[r][col]: return False
-
-    # Loại bỏ số 'num' khỏi domain của tất cả các ô trong cùng cột
-    for row in range(n):
-        if row != r and num in domains[row][c]:
-            domains[row][c].remove(num)
-            if not domains[row][c]: return False
-
-    # Loại bỏ số 'num' khỏi domain của tất cả các ô trong cùng khối (Box)
-    box_r = (r // box_size) * box_size
-    box_c = (c // box_size) * box_size
-    for br in range(box_r, box_r + box_size):
-        for bc in range(box_c, box_c + box_size):
-            if (br, bc) != (r, c) and num in domains[br][bc]:
-                domains[br][bc].remove(num)
-                if not domains[br][bc]: return False
-    return True
-
-def _solve_fc_recursive(board_wrapper: SudokuBoard, stats: dict, domains: list):
-    # Tìm ô trống tiếp theo để điền
-    empty_cell = board_wrapper.find_empty_cell()
-    if not empty_cell:
-        return True
-    row, col = empty_cell
-    
-    # Thay vì thử 1..N, chỉ thử các giá trị còn lại trong domain của ô này
-    # vì các giá trị khác đã bị loại bỏ do vi phạm ràng buộc trước đó
-    domain_to_try = list(domains[row][col]) 
-    
-    for num in domain_to_try:
-        board_wrapper.set_cell(row, col, num)
-        
-        # Sau khi điền thử, thực hiện cắt tỉa (Forward Checking) các ô hàng xóm
-        # Hàm trả về danh sách các thay đổi để có thể khôi phục nếu cần quay lui
-        is_consistent, pruned_log = _prune_neighbors_domains(domains, row, col, num, board_wrapper)
-        
-        # Nếu việc cắt tỉa không gây ra mâu thuẫn (không làm rỗng domain nào)
-        if is_consistent:
-            # Tiếp tục đệ quy sâu hơn
-            if _solve_fc_recursive(board_wrapper, stats, domains):
-                return True
-
-        # Nếu đi vào ngõ cụt, thực hiện quay lui
-        stats["backtracks"] = stats.get("backtracks", 0) + 1
-        
-        # Khôi phục lại các giá trị đã bị cắt tỉa khỏi domain hàng xóm
-        _restore_neighbors_domains(domains, pruned_log)
-        
-        # Xóa số vừa điền
-        board_wrapper.set_cell(row, col, 0)
-    
-    return False
-
-def _prune_neighbors_domains(domains, r, c, num, board_wrapper):
-    pruned_log = [] 
-    n = board_wrapper.n
-    box_size = board_wrapper.box_size
-    
-    # Xác định tất cả các ô hàng xóm chịu ảnh hưởng (hàng, cột, khối)
-    neighbors = set()
-    for col in range(n): neighbors.add((r, col))
-    for row in range(n): neighbors.add((row, c))
-    box_r = (r // box_size) * box_size
-    box_c = (c // box_size) * box_size
-    for br in range(box_r, box_r + box_size):
-        for bc in range(box_c, box_c + box_size):
-            neighbors.add((br, bc))
-    neighbors.remove((r, c))
-
-    # Duyệt qua từng hàng xóm và loại bỏ số vừa điền khỏi domain của chúng
-    for (nr, nc) in neighbors:
-        if num in domains[nr][nc]:
-            domains[nr][nc].remove(num)
-            pruned_log.append((nr, nc, num)) # Ghi nhật ký để khôi phục sau này
-            
-            # Nếu domain của hàng xóm trở nên rỗng -> Phát hiện ngõ cụt sớm
-            if not domains[nr][nc]: 
-                return (False, pruned_log) 
-    return (True, pruned_log) 
-
-def _restore_neighbors_domains(domains, pruned_log):
-    # Dựa vào nhật ký, thêm lại các giá trị vào domain của các ô tương ứng
-    for (r, c, num) in pruned_log:
-        domains[r][c].add(num)
\ No newline at end of file
+    is_valid = board_wrapper.is_valid
+    total = n * n
+    frames = []
+    enter_node = True
+    nodes = stats.get("nodes_visited", 0)
+    backtracks = stats.get("backtracks", 0)
+    check_at = budget.begin(nodes) if budget is not None else NO_LIMIT
+
+    try:
+        while True:
+            if enter_node:
+                enter_node = False
+                nodes += 1
+                if nodes >= check_at:
+                    check_at = budget.check(nodes, len(frames), backtracks)
+                    if check_at is None:
+                        budget.exceeded(stats)
+                        return None
+
+                # Tìm ô trống tiếp theo (các ô đứng trước ô hiện tại đều đã được điền)
+                idx = frames[-1][0] * n + frames[-1][1] + 1 if frames else 0
+                while idx < total and board[idx // n][idx % n] != 0:
+                    idx += 1
+
+                # Không còn ô trống -> Giải xong
+                if idx == total:
+                    if emit:
+                        publish_counters(stats, counting, nodes, None, backtracks)
+                        yield ("solved",)
+                    return True
+                frames.append([idx // n, idx % n, 1])
+
+            frame = frames[-1]
+            row, col, num = frame
+
+            # Nếu ô đang có số -> nhánh con vừa thất bại -> Quay lui
+            if board[row][col] != 0:
+                backtracks += 1
+                failed_num = board[row][col]
+                board_wrapper.set_cell(row, col, 0)
+                if emit:
+                    publish_counters(stats, counting, nodes, None, backtracks)
+                    yield ("backtrack", (row, col), failed_num)
+
+            # Thử số hợp lệ tiếp theo
+            while num <= n and not is_valid(num, row, col):
+                num += 1
+
+            if num > n:
+                # Đã thử hết các số -> Nhánh này thất bại, quay về khung cha
+                frames.pop()
+                if not frames:
+                    return False
+                continue
+
+            board_wrapper.set_cell(row, col, num)
+            frame[2] = num + 1
+            if emit:
+                publish_counters(stats, counting, nodes, None, backtracks)
+                yield ("try", (row, col), num)
+            enter_node = True
+    finally:
+        publish_counters(stats, counting, nodes, None, backtracks)
+
+def solve_forward_checking(board_wrapper: SudokuBoard, stats: dict, sink=None, budget=None, ac_preprocess=False):
+    """
+    Forward Checking:
+    1. Tìm ô trống.
+    2. Thử các giá trị trong domain của ô đó.
+    3. Điền số -> Cắt tỉa domain hàng xóm.
+    4. Nếu cắt tỉa ổn -> Đi xuống ô tiếp theo.
+    5. Nếu thất bại -> Khôi phục domain (Undo cắt tỉa) và Quay lui.
+    ac_preprocess=True: tìm kiếm bắt đầu từ miền giá trị đã lọc AC-3 / AllDifferent (arc_consistency.preprocess);
+    stats có thêm các chỉ số ac_*.
+    """
+    counting, _ = sink_flags(sink)
+    if ac_preprocess:
+        domains = preprocess(board_wrapper, stats)
+        if domains is None:
+            return False
+    else:
+        # Trước khi giải, khởi tạo miền giá trị (domain) dạng bitmask cho từng ô
+        # và loại bỏ ngay những giá trị không hợp lệ dựa trên các số đã có sẵn
+        domains = BitmaskDomains(board_wrapper)
+        if not domains.initialize(stats if counting else None):
+            # Nếu ngay từ đầu đề bài đã mâu thuẫn, trả về False
+            return False
+
+    # Bắt đầu quá trình tìm kiếm với tập domains đã được chuẩn bị
+    is_solved = run_search(search_forward_checking(domains, stats, sink, budget=budget), sink)
+    if is_solved:
+        domains.write_back(board_wrapper)
+    return is_solved
+
+def search_forward_checking(domains: BitmaskDomains, stats: dict, sink=None, propagator=None, budget=None):
+    """
+    Forward Checking dạng vòng lặp: chọn ô trống đầu tiên theo thứ tự hàng-cột.
+    Mỗi khung trên ngăn xếp là [idx, danh sách giá trị cần thử, vị trí, số đang thử, nhật ký cắt tỉa,
+    nhật ký lan truyền].
+    sink: xem sinks.py (CountingSink đếm thêm stats["nodes_visited"] và stats["prunes_made"]).
+    propagator: bộ lan truyền chạy sau mỗi lần cắt tỉa thành công, có propagate() / undo(trail) và bộ đếm
+    prunes (ConstraintPropagator, ArcConsistency) - phần tăng của prunes được cộng vào prunes_made; None = chỉ Forward Checking.
+    budget: SearchBudget (xem search_budget.py) - chạm giới hạn thì trả về None.
+    """
+    counting, emit = sink_flags(sink)
+    values = domains.values
+    total = len(values)
+    frames = []
+    enter_node = True
+    nodes = stats.get("nodes_visited", 0)
+    prunes = stats.get("prunes_made", 0)
+    backtracks = stats.get("backtracks", 0)
+    check_at = budget.begin(nodes) if budget is not None else NO_LIMIT
+
+    try:
+        while True:
+            if enter_node:
+                enter_node = False
+                nodes += 1
+                if nodes >= check_at:
+                    check_at = budget.check(nodes, len(frames), backtracks)
+                    if check_at is None:
+                        budget.exceeded(stats)
+                        return None
+
+                # Tìm ô trống tiếp theo (các ô đứng trước ô hiện tại đều đã được điền)
+                idx = frames[-1][0] + 1 if frames else 0
+                while idx < total and values[idx] != 0:
+                    idx += 1
+                if idx == total:
+                    if emit:
+                        publish_counters(stats, counting, nodes, prunes, backtracks)
+                        yield ("solved",)
+                    return True
+
+                # Chỉ thử các giá trị còn lại trong domain của ô này
+                frames.append([idx, domains.candidates(idx), 0, 0, None, None])
+
+            frame = frames[-1]
+            idx, domain_to_try, pos, num, pruned_log, trail = frame
+
+            # Giá trị đang thử dẫn tới ngõ cụt -> Quay lui: khôi phục domain hàng xóm và xóa số
+            if num:
+                backtracks += 1
+                if trail:
+                    propagator.undo(trail)
+                    frame[5] = None
+                domains.restore(num, pruned_log)
+                domains.unassign(idx, num)
+                frame[3] = 0
+                if emit:
+                    publish_counters(stats, counting, nodes, prunes, backtracks)
+                    yield ("backtrack", idx, num)
+
+            if pos == len(domain_to_try):
+                frames.pop()
+                if not frames:
+                    return False
+                continue
+
+            num = domain_to_try[pos]
+            domains.assign(idx, num)
+            if emit:
+                publish_counters(stats, counting, nodes, prunes, backtracks)
+                yield ("try", idx, num)
+
+            # Cắt tỉa (Forward Checking) các ô hàng xóm, giữ nhật ký để khôi phục khi quay lui
+            is_consistent, pruned_log = domains.prune_peers(idx, num)
+            prunes += len(pruned_log)
+            frame[2] = pos + 1
+            frame[3] = num
+            frame[4] = pruned_log
+            if emit:
+                publish_counters(stats, counting, nodes, prunes, backtracks)
+                yield ("prune", idx, is_consistent, pruned_log)
+
+            if is_consistent and propagator is not None:
+                propagator_prunes = propagator.prunes
+                is_consistent, frame[5] = propagator.propagate()
+                prunes += propagator.prunes - propagator_prunes
+
+            # Không gây mâu thuẫn -> Đi sâu xuống nút con
+            if is_consistent:
+                enter_node = True
+    finally:
+        publish_counters(stats, counting, nodes, prunes, backtracks)
@@ -1,194 +1,226 @@
+import time
 from .sudoku_board import SudokuBoard
+from .candidate_engine import BitmaskDomains, BucketedDomains
+from .algorithms import run_search, publish_counters
+from .propagation import make_propagator
+from .arc_consistency import ArcConsistency, total_domain_size
+from .sinks import CountingSink, sink_flags
+from .search_budget import NO_LIMIT, SearchBudget
 
-def solve_forward_checking_mrv(board_wrapper: SudokuBoard, stats: dict):
+def solve_forward_checking_mrv(board_wrapper: SudokuBoard, stats: dict, use_buckets=True, propagate=False, sink=None, budget=None):
     """
     Hàm khởi chạy thuật toán Forward Checking kết hợp MRV (Minimum Remaining Values).
-    
+
     Quy trình tổng quát:
-    1. Khởi tạo miền giá trị (Domain) cho tất cả các ô trống.
+    1. Khởi tạo miền giá trị (Domain) dạng bitmask cho tất cả các ô trống.
     2. Thực hiện cắt tỉa ban đầu dựa trên các số đề bài đã cho.
-    3. Gọi hàm đệ quy để giải quyết bài toán.
+    3. Chạy vòng lặp tìm kiếm (ngăn xếp tường minh) để giải quyết bài toán.
+
+    use_buckets=True: chọn ô MRV bằng hàng đợi theo kích thước miền (BucketedDomains);
+    False: quét toàn bộ bàn cờ ở mỗi nút (giữ lại để đối chiếu hiệu năng).
+    propagate=True (hoặc dãy tên luật): sau mỗi lần gán chạy thêm lớp lan truyền ràng buộc
+    (naked / hidden singles, locked candidates - xem propagation.py); stats có thêm số ô
+    mỗi luật điền được (naked_singles, hidden_singles) và số ứng viên bị loại (locked_candidates).
+    sink: xem sinks.py (CountingSink đếm thêm nodes_visited / prunes_made).
+    budget: SearchBudget (số nút / thời gian / token hủy, xem search_budget.py); chạm giới hạn thì trả về None
+    và stats["budget_exceeded"] ghi lý do.
     """
-    try:
-        # Khởi tạo và cắt tỉa domain ban đầu
-        domains = _initialize_domains(board_wrapper)
-    except ValueError:
+    counting, _ = sink_flags(sink)
+    # Khởi tạo và cắt tỉa domain ban đầu
+    domains = BucketedDomains(board_wrapper) if use_buckets else BitmaskDomains(board_wrapper)
+    if not domains.initialize(stats if counting else None):
         # Nếu đề bài ban đầu đã vi phạm luật chơi -> Trả về False
         return False
-        
-    # Bắt đầu quá trình giải đệ quy
-    return _solve_fc_recursive_mrv(board_wrapper, stats, domains)
 
-def _initialize_domains(board_wrapper):
-    """
-    Khởi tạo miền giá trị {1..N} cho mọi ô và loại bỏ các giá trị không hợp lệ
-    dựa trên các số đã có sẵn trên bàn cờ.
-    """
-    n = board_wrapper.n
-    board = board_wrapper.get_board()
-    
-    # Tạo domain đầy đủ ban đầu cho tất cả các ô
-    full_domain = set(range(1, n + 1))
-    domains = [[full_domain.copy() for _ in range(n)] for _ in range(n)]
-    
-    # Duyệt qua các ô đã có số (đề bài)
-    for r in range(n):
-        for c in range(n):
-            num = board[r][c]
-            if num != 0:
-                # Nếu ô đã có số, domain của nó chỉ còn chính số đó
-                domains[r][c] = {num}
-                
-                # Cắt tỉa số này khỏi domain của các ô hàng xóm (Hàng, Cột, Khối)
-                if not _prune_domains_on_setup(domains, r, c, num, board_wrapper):
-                    raise ValueError("Invalid initial puzzle")
-    return domains
-
-def _prune_domains_on_setup(domains, r, c, num, board_wrapper):
+    # Lan truyền ngay từ đầu (trail ở gốc không cần hoàn tác)
+    propagator = make_propagator(domains, stats, propagate)
+    if propagator is not None:
+        is_consistent, _ = propagator.propagate()
+        if counting: stats["prunes_made"] = stats.get("prunes_made", 0) + propagator.prunes
+        if not is_consistent:
+            return False
+
+    # Bắt đầu quá trình tìm kiếm
+    is_solved = run_search(search_forward_checking_mrv(domains, stats, sink, propagator=propagator, budget=budget), sink)
+    if is_solved:
+        domains.write_back(board_wrapper)
+    return is_solved
+
+def solve_forward_checking_mrv_ac(board_wrapper: SudokuBoard, stats: dict, per_node=True, sink=None, budget=None):
     """
-    Hàm cắt tỉa dùng riêng cho bước khởi tạo.
-    Nhiệm vụ: Loại bỏ số 'num' khỏi miền giá trị của tất cả các ô liên quan (Hàng, Cột, Khối).
+    FC + MRV có thêm nhất quán cung (AC-3 + AllDifferent, xem arc_consistency.py).
+    Lọc một lần sau khi khởi tạo domain; per_node=True thì lọc lại ở mọi nút (duy trì GAC),
+    False thì chỉ dùng như bước tiền xử lý.
+    Ngoài các chỉ số của FC + MRV, stats có: ac3_removed, alldiff_removed, ac_calls, ac_time_sec,
+    ac_domain_before / ac_domain_after (tổng kích thước domain ô trống trước / sau bước tiền xử lý),
+    ac_cells_reduced (số ô bị thu hẹp domain ở bước tiền xử lý).
     """
-    n = board_wrapper.n
-    box_size = board_wrapper.box_size
-    
-    # 1. Cắt tỉa trên Hàng
-    for col in range(n):
-        if col != c and num in domains[r][col]:
-            domains[r][col].remove(num)
-            if not domains[r][col]: return False # Mâu thuẫn: Ô hàng xóm hết giá trị để điền
-
-    # 2. Cắt tỉa trên Cột
-    for row in range(n):
-        if row != r and num in domains[row][c]:
-            domains[row][c].remove(num)
-            if not domains[row][c]: return False
-            
-    # 3. Cắt tỉa trong Khối (Box)
-    box_r = (r // box_size) * box_size
-    box_c = (c // box_size) * box_size
-    for br in range(box_r, box_r + box_size):
-        for bc in range(box_c, box_c + box_size):
-            if (br, bc) != (r, c) and num in domains[br][bc]:
-                domains[br][bc].remove(num)
-                if not domains[br][bc]: return False
-    return True
-
-def _find_cell_with_mrv(board_wrapper: SudokuBoard, domains: list):
+    counting, _ = sink_flags(sink)
+    domains = BucketedDomains(board_wrapper)
+    if not domains.initialize(stats if counting else None):
+        return False
+
+    stats["ac_domain_before"] = total_domain_size(domains)
+    consistency = ArcConsistency(domains, stats)
+    is_consistent, _ = consistency.propagate()
+    stats["ac_domain_after"] = total_domain_size(domains)
+    stats["ac_cells_reduced"] = len(consistency.reduction_report())
+    if not is_consistent:
+        return False
+
+    propagator = consistency if per_node else None
+    is_solved = run_search(search_forward_checking_mrv(domains, stats, sink, propagator=propagator, budget=budget), sink)
+    if is_solved:
+        domains.write_back(board_wrapper)
+    return is_solved
+
+def count_solutions(grid, limit=2, propagate=True, max_nodes=None):
     """
-    Chiến lược chọn biến MRV (Minimum Remaining Values).
-    
-    Thay vì chọn ô trống đầu tiên tìm thấy, hàm này sẽ:
-    1. Quét toàn bộ bàn cờ.
-    2. Tìm ô trống có miền giá trị (domain) NHỎ NHẤT (ít lựa chọn nhất).
-    3. Ưu tiên giải ô này trước ("Fail-First" principle).
+    Đếm lời giải của đề `grid` (ma trận NxN) bằng FC + MRV, dừng sớm khi đủ `limit` lời giải
+    (limit=2 đủ để kiểm tra tính duy nhất). Các luật lan truyền không làm mất lời giải nào
+    nên bật propagate vẫn đếm đúng mà nhanh hơn nhiều.
+    max_nodes: giới hạn số nút duyệt; vượt quá thì bỏ dở và trả về số lời giải là None (chưa xác định).
+    Trả về (số lời giải, số nút đã duyệt, thời gian chạy tính bằng giây).
     """
-    min_len = board_wrapper.n + 1 
-    best_cell = None
-    board = board_wrapper.get_board()
-    n = board_wrapper.n
-    
-    for r in range(n):
-        for c in range(n):
-            if board[r][c] == 0: # Chỉ xét ô chưa điền
-                current_len = len(domains[r][c])
-                
-                # Nếu gặp ô có domain rỗng -> Ngõ cụt chắc chắn -> Báo ngay
-                if current_len == 0: return None 
-                
-                # Cập nhật ô tốt nhất nếu tìm thấy ô có domain nhỏ hơn
-                if current_len < min_len:
-                    min_len = current_len
-                    best_cell = (r, c)
-                    
-                    # Tối ưu: Nếu domain chỉ còn 1 giá trị -> Chọn luôn vì không thể tốt hơn
-                    if min_len == 1: return best_cell
-    return best_cell
-
-def _solve_fc_recursive_mrv(board_wrapper: SudokuBoard, stats: dict, domains: list):
+    start = time.perf_counter()
+    stats = {"backtracks": 0, "nodes_visited": 0, "prunes_made": 0}
+    domains = BucketedDomains(SudokuBoard(grid))
+    if not domains.initialize():
+        return (0, 0, time.perf_counter() - start)
+    propagator = make_propagator(domains, stats, propagate)
+    if propagator is not None:
+        is_consistent, _ = propagator.propagate()
+        stats["prunes_made"] += propagator.prunes
+        if not is_consistent:
+            return (0, 0, time.perf_counter() - start)
+
+    budget = SearchBudget(max_nodes=max_nodes) if max_nodes is not None else None
+    done = run_search(search_forward_checking_mrv(domains, stats, CountingSink(), propagator=propagator,
+                                                  limit=limit, budget=budget))
+    if done is None:
+        return (None, stats["nodes_visited"], time.perf_counter() - start)
+
+    if done:
+        count = limit
+    else:
+        count = stats.get("solutions_found", 0)
+    return (count, stats["nodes_visited"], time.perf_counter() - start)
+
+def search_forward_checking_mrv(domains: BitmaskDomains, stats: dict, sink=None, degree_tie_break=False, propagator=None, limit=1, budget=None):
     """
-    Hàm đệ quy chính thực hiện FC + MRV.
-    
+    Vòng lặp chính thực hiện FC + MRV (xem quy ước sự kiện và sink trong algorithms.py).
+
     Quy trình hoạt động:
     1. Chọn ô trống tối ưu nhất bằng MRV.
     2. Nếu không còn ô trống -> Giải xong (Thành công).
     3. Lặp qua các giá trị trong domain của ô đó.
-    4. Thử điền -> Cắt tỉa domain hàng xóm -> Gọi đệ quy.
+    4. Thử điền -> Cắt tỉa domain hàng xóm -> Đi xuống nút con.
     5. Nếu thất bại -> Khôi phục domain (Undo) -> Quay lui.
+
+    Mỗi khung trên ngăn xếp là [idx, danh sách giá trị cần thử, vị trí, số đang thử, nhật ký cắt tỉa,
+    nhật ký lan truyền].
+    sink: xem sinks.py (CountingSink đếm thêm stats["nodes_visited"] và stats["prunes_made"]).
+    degree_tie_break=True: bằng kích thước domain thì chọn ô có bậc lớn nhất (cần BucketedDomains).
+    propagator: ConstraintPropagator chạy sau mỗi lần cắt tỉa thành công (None = chỉ Forward Checking);
+    số cắt tỉa do nó gây ra (propagator.prunes) được cộng vào prunes_made.
+    limit > 1: chế độ đếm - sau mỗi lời giải tiếp tục quay lui tìm lời giải khác, số lời giải
+    ghi vào stats["solutions_found"]; trả về True khi đủ `limit` lời giải.
+    budget: SearchBudget - chạm giới hạn thì dừng và trả về None.
     """
-    # Bước 1: Chọn ô cần điền bằng MRV
-    empty_cell = _find_cell_with_mrv(board_wrapper, domains)
-    
-    if not empty_cell:
-        # Nếu hàm tìm kiếm trả về None:
-        # - Hoặc là bàn cờ đã đầy (Thành công).
-        # - Hoặc là bàn cờ còn trống nhưng có ô bị rỗng domain (Thất bại).
-        if board_wrapper.find_empty_cell() is None: return True 
-        else: return False 
-        
-    row, col = empty_cell
-    
-    # Bước 2: Lấy danh sách các giá trị khả dĩ để thử
-    domain_to_try = list(domains[row][col])
-    
-    for num in domain_to_try:
-        # Bước 3: Gán giá trị thử
-        board_wrapper.set_cell(row, col, num)
-        
-        # Bước 4: Lan truyền ràng buộc (Cắt tỉa domain hàng xóm)
-        is_consistent, pruned_log = _prune_neighbors_domains(domains, row, col, num, board_wrapper)
-        
-        # Bước 5: Nếu cắt tỉa thành công (không gây mâu thuẫn), tiếp tục đệ quy
-        if is_consistent:
-            if _solve_fc_recursive_mrv(board_wrapper, stats, domains):
-                return True 
-
-        # Bước 6: Nếu đi vào ngõ cụt -> Quay lui (Backtrack)
-        stats["backtracks"] = stats.get("backtracks", 0) + 1
-        
-        # Khôi phục lại các giá trị đã bị cắt tỉa
-        _restore_neighbors_domains(domains, pruned_log)
-        
-        # Xóa số vừa điền khỏi bàn cờ
-        board_wrapper.set_cell(row, col, 0)
-    
-    # Đã thử hết các giá trị trong domain mà không thành công
-    return False
-
-def _prune_neighbors_domains(domains, r, c, num, board_wrapper):
-    """
-    Thực hiện Forward Checking: Loại bỏ 'num' khỏi domain của hàng xóm.
-    Trả về danh sách (log) các giá trị đã xóa để phục vụ việc khôi phục.
-    """
-    pruned_log = [] 
-    n = board_wrapper.n
-    box_size = board_wrapper.box_size
-    neighbors = set()
-    
-    # Xác định các ô hàng xóm (Hàng, Cột, Khối)
-    for col in range(n): neighbors.add((r, col))
-    for row in range(n): neighbors.add((row, c))
-    box_r = (r // box_size) * box_size
-    box_c = (c // box_size) * box_size
-    for br in range(box_r, box_r + box_size):
-        for bc in range(box_c, box_c + box_size):
-            neighbors.add((br, bc))
-    neighbors.discard((r, c)) # Loại bỏ chính ô đang xét
-
-    # Duyệt và cắt tỉa
-    for (nr, nc) in neighbors:
-        if num in domains[nr][nc]:
-            domains[nr][nc].remove(num)
-            pruned_log.append((nr, nc, num)) # Ghi nhật ký
-            
-            # Nếu domain hàng xóm trở nên rỗng -> Phát hiện mâu thuẫn ngay lập tức
-            if not domains[nr][nc]: 
-                return (False, pruned_log) 
-    return (True, pruned_log) 
-
-def _restore_neighbors_domains(domains, pruned_log):
-    """
-    Hoàn tác quá trình cắt tỉa: Trả lại các giá trị đã xóa vào domain tương ứng.
-    """
-    for (r, c, num) in pruned_log:
-        domains[r][c].add(num)
\ No newline at end of file
+    counting, emit = sink_flags(sink)
+    select_mrv = domains.select_mrv
+    frames = []
+    enter_node = True
+    found = 0
+    nodes = stats.get("nodes_visited", 0)
+    prunes = stats.get("prunes_made", 0)
+    backtracks = stats.get("backtracks", 0)
+    check_at = budget.begin(nodes) if budget is not None else NO_LIMIT
+
+    try:
+        while True:
+            if enter_node:
+                enter_node = False
+                nodes += 1
+                if nodes >= check_at:
+                    check_at = budget.check(nodes, len(frames), backtracks)
+                    if check_at is None:
+                        budget.exceeded(stats)
+                        return None
+
+                # Bước 1: Chọn ô cần điền bằng MRV (ô trống có domain nhỏ nhất)
+                if degree_tie_break:
+                    idx, is_dead_end = select_mrv(degree_tie_break=True)
+                else:
+                    idx, is_dead_end = select_mrv()
+
+                if idx is None:
+                    # - Bàn cờ đã đầy -> Thành công.
+                    # - Còn ô trống nhưng domain rỗng -> Nút này thất bại, quay về khung cha.
+                    if not is_dead_end:
+                        found += 1
+                        if found >= limit:
+                            if emit:
+                                publish_counters(stats, counting, nodes, prunes, backtracks)
+                                yield ("solved",)
+                            return True
+                        # Chế độ đếm: ghi nhận lời giải rồi quay lui như một nhánh thất bại
+                        stats["solutions_found"] = found
+                    if not frames:
+                        return False
+                else:
+                    # Bước 2: Lấy danh sách các giá trị khả dĩ để thử
+                    frames.append([idx, domains.candidates(idx), 0, 0, None, None])
+
+            frame = frames[-1]
+            idx, domain_to_try, pos, num, pruned_log, trail = frame
+
+            # Bước 6: Giá trị đang thử dẫn tới ngõ cụt -> Quay lui (Backtrack)
+            if num:
+                backtracks += 1
+                # Hoàn tác lan truyền, khôi phục lại các giá trị đã bị cắt tỉa và xóa số vừa điền
+                if trail:
+                    propagator.undo(trail)
+                    frame[5] = None
+                domains.restore(num, pruned_log)
+                domains.unassign(idx, num)
+                frame[3] = 0
+                if emit:
+                    publish_counters(stats, counting, nodes, prunes, backtracks)
+                    yield ("backtrack", idx, num)
+
+            # Đã thử hết các giá trị trong domain mà không thành công
+            if pos == len(domain_to_try):
+                frames.pop()
+                if not frames:
+                    return False
+                continue
+
+            # Bước 3: Gán giá trị thử
+            num = domain_to_try[pos]
+            domains.assign(idx, num)
+            if emit:
+                publish_counters(stats, counting, nodes, prunes, backtracks)
+                yield ("try", idx, num)
+
+            # Bước 4: Lan truyền ràng buộc (Cắt tỉa domain hàng xóm)
+            is_consistent, pruned_log = domains.prune_peers(idx, num)
+            prunes += len(pruned_log)
+            frame[2] = pos + 1
+            frame[3] = num
+            frame[4] = pruned_log
+            if emit:
+                publish_counters(stats, counting, nodes, prunes, backtracks)
+                yield ("prune", idx, is_consistent, pruned_log)
+
+            # Lan truyền tiếp tới điểm bất động (mọi thay đổi nằm trong trail để hoàn tác)
+            if is_consistent and propagator is not None:
+                propagator_prunes = propagator.prunes
+                is_consistent, frame[5] = propagator.propagate()
+                prunes += propagator.prunes - propagator_prunes
+
+            # Bước 5: Nếu cắt tỉa thành công (không gây mâu thuẫn), đi xuống nút con
+            if is_consistent:
+                enter_node = True
+    finally:
+        publish_counters(stats, counting, nodes, prunes, backtracks)
@@ -0,0 +1,319 @@
+"""
+Nhất quán cung (Arc Consistency) trên mô hình CSP của BitmaskDomains.
+
+Hai bộ lọc:
+- AC-3: ràng buộc nhị phân X != Y giữa các ô hàng xóm. Cung (X, Y) chỉ loại được giá trị v khỏi
+  D(X) khi D(Y) = {v}, nên hàng đợi chỉ cần giữ các ô vừa bị thu hẹp: mỗi ô Y trong hàng đợi đại diện
+  cho toàn bộ các cung (X, Y) với X là hàng xóm của Y.
+- AllDifferent (GAC theo Régin): với mỗi Hàng / Cột / Khối, dựng đồ thị hai phía ô <-> giá trị,
+  tìm ghép cặp cực đại; cạnh (ô, v) không nằm trong ghép cặp cực đại nào thì loại v khỏi ô.
+  Mạnh hơn AC-3 (bắt được naked / hidden pairs, triples, ...).
+
+ArcConsistency có cùng giao diện propagate() / undo(trail) với ConstraintPropagator
+(cùng định dạng nhật ký, xem propagation.py), nên dùng được:
+- làm bước tiền xử lý: gọi propagate() một lần sau domains.initialize();
+- làm bộ lan truyền ở mỗi nút: truyền vào search_forward_checking(_mrv)(..., propagator=...).
+"""
+import time
+
+from .sudoku_board import SudokuBoard
+from .board_geometry import get_geometry
+from .candidate_engine import BitmaskDomains, BucketedDomains
+
+# Giá trị trả về của một bộ lọc khi phát hiện mâu thuẫn
+_CONTRADICTION = -1
+
+
+class ArcConsistency:
+    """
+    Bộ lọc AC-3 / AllDifferent trên một BitmaskDomains.
+    Ô đã điền được xem như có miền {giá trị của nó}.
+
+    stats (nếu có) được cộng dồn:
+    - ac3_removed / alldiff_removed: số giá trị mỗi bộ lọc đã loại.
+    - ac_time_sec: tổng thời gian chạy lọc.
+    - ac_calls: số lần gọi propagate().
+    Số giá trị bị loại của từng ô được cộng vào self.reduction[idx] (xem reduction_report()).
+    """
+
+    def __init__(self, domains: BitmaskDomains, stats: dict = None, ac3=True, all_different=True):
+        self.domains = domains
+        self.stats = stats if stats is not None else {}
+        for key in ("ac3_removed", "alldiff_removed", "ac_calls"):
+            self.stats.setdefault(key, 0)
+        self.stats.setdefault("ac_time_sec", 0.0)
+        self.prunes = 0     # Không tự gán ô nên không cắt tỉa hàng xóm (cùng giao diện với ConstraintPropagator)
+        self.use_ac3 = ac3
+        self.use_all_different = all_different
+
+        geometry = get_geometry(domains.n)
+        self.units = geometry.units
+        self.peers = geometry.peers
+        self.reduction = [0] * (domains.n * domains.n)
+
+    def propagate(self):
+        """Lọc tới điểm bất động. Trả về (is_consistent, trail)."""
+        start = time.perf_counter()
+        self.stats["ac_calls"] += 1
+        trail = []
+        ok = self._run(trail)
+        self.stats["ac_time_sec"] += time.perf_counter() - start
+        return (ok, trail)
+
+    def undo(self, trail):
+        """Hoàn tác nhật ký theo thứ tự ngược lại (chỉ có các mục "elim")."""
+        domains = self.domains
+        reduction = self.reduction
+        for _, idx, bits in reversed(trail):
+            domains.readmit(idx, bits)
+            reduction[idx] -= bits.bit_count()
+
+    def reduction_report(self):
+        """{idx: số giá trị đã bị loại} cho các ô có miền bị thu hẹp (tính trên các thay đổi chưa hoàn tác)."""
+        return {idx: removed for idx, removed in enumerate(self.reduction) if removed}
+
+    def _run(self, trail):
+        dirty = None
+        while True:
+            if self.use_ac3:
+                if self._ac3(trail, dirty) == _CONTRADICTION:
+                    return False
+            if not self.use_all_different:
+                return True
+            mark = len(trail)
+            if self._all_different(trail) == _CONTRADICTION:
+                return False
+            if len(trail) == mark or not self.use_ac3:
+                return True
+            # AllDifferent vừa thu hẹp một số ô -> chạy lại AC-3 từ các ô đó
+            dirty = [entry[1] for entry in trail[mark:]]
+
+    def _eliminate(self, trail, idx, bits):
+        ok = self.domains.eliminate(idx, bits)
+        trail.append(("elim", idx, bits))
+        self.reduction[idx] += bits.bit_count()
+        return ok
+
+    # ---------------- AC-3 ----------------
+
+    def _ac3(self, trail, dirty=None):
+        domains = self.domains
+        masks = domains.domains
+        values = domains.values
+        peers = self.peers
+
+        # Hàng đợi ban đầu: các ô trống chỉ còn 1 giá trị. Ô đã điền không cần xét vì
+        # initialize() / prune_peers() đã loại giá trị của chúng khỏi mọi hàng xóm.
+        if dirty is None:
+            queue = [idx for idx in range(len(values))
+                     if values[idx] == 0 and not masks[idx] & (masks[idx] - 1)]
+        else:
+            queue = list(dirty)
+        removed = 0
+        while queue:
+            y = queue.pop()
+            dy = (1 << (values[y] - 1)) if values[y] else masks[y]
+            # Revise(X, Y) với X != Y chỉ loại được khi D(Y) có đúng 1 giá trị
+            if dy & (dy - 1):
+                continue
+            for x in peers[y]:
+                if values[x] == 0 and masks[x] & dy:
+                    removed += 1
+                    if not self._eliminate(trail, x, dy):
+                        self.stats["ac3_removed"] += removed
+                        return _CONTRADICTION
+                    queue.append(x)
+        self.stats["ac3_removed"] += removed
+        return removed
+
+    # ---------------- AllDifferent (Régin) ----------------
+
+    def _all_different(self, trail):
+        masks = self.domains.domains
+        values = self.domains.values
+        removed = 0
+        for unit in self.units:
+            cells = [idx for idx in unit if values[idx] == 0]
+            if len(cells) < 2:
+                continue
+            doms = [masks[idx] for idx in cells]
+            prune = _alldiff_filter(doms)
+            if prune is None:
+                return _CONTRADICTION
+            for idx, bits in zip(cells, prune):
+                if bits:
+                    removed += bits.bit_count()
+                    if not self._eliminate(trail, idx, bits):
+                        self.stats["alldiff_removed"] += removed
+                        return _CONTRADICTION
+        self.stats["alldiff_removed"] += removed
+        return removed
+
+
+def _alldiff_filter(doms):
+    """
+    Lọc AllDifferent cho một đơn vị: doms[i] là mask miền của ô trống thứ i.
+    Trả về danh sách mask giá trị cần loại cho từng ô, hoặc None nếu không tồn tại ghép cặp đủ.
+
+    Đồ thị có hướng theo Régin: cạnh ghép cặp đi từ ô sang giá trị, cạnh còn lại đi từ giá trị sang ô.
+    Cạnh (ô, v) ngoài ghép cặp được giữ lại khi ô và v cùng thành phần liên thông mạnh, hoặc
+    v đến được từ một giá trị tự do (đường xen kẽ chẵn); các cạnh khác bị loại.
+    """
+    k = len(doms)
+
+    # --- Ghép cặp cực đại (Kuhn: tìm đường tăng cho từng ô) ---
+    match_of_value = {}           # bit giá trị -> ô
+    match_of_cell = [0] * k       # ô -> bit giá trị
+    for cell in range(k):
+        seen = 0
+        # Ngăn xếp các (ô, mask giá trị còn phải thử) của đường tăng đang xét
+        stack = [(cell, doms[cell])]
+        path = []
+        found = False
+        while stack:
+            x, options = stack[-1]
+            options &= ~seen
+            if not options:
+                stack.pop()
+                if path: path.pop()
+                continue
+            bit = options & -options
+            seen |= bit
+            stack[-1] = (x, options ^ bit)
+            path.append((x, bit))
+            owner = match_of_value.get(bit)
+            if owner is None:
+                # Đảo các cạnh trên đường tăng
+                for px, pbit in path:
+                    match_of_value[pbit] = px
+                    match_of_cell[px] = pbit
+                found = True
+                break
+            stack.append((owner, doms[owner]))
+        if not found:
+            return None
+
+    # --- Đồ thị có hướng: nút 0..k-1 là ô, nút k + (v - 1) là giá trị v ---
+    all_values = 0
+    for d in doms:
+        all_values |= d
+    value_nodes = {}
+    for bit in _bits(all_values):
+        value_nodes[bit] = k + len(value_nodes)
+    total = k + len(value_nodes)
+    adj = [[] for _ in range(total)]
+    for x in range(k):
+        matched = match_of_cell[x]
+        adj[x].append(value_nodes[matched])
+        for bit in _bits(doms[x] & ~matched):
+            adj[value_nodes[bit]].append(x)
+
+    # Giá trị tự do (không được ghép) và các nút đến được từ chúng
+    reach = [False] * total
+    queue = [node for bit, node in value_nodes.items() if bit not in match_of_value]
+    for node in queue:
+        reach[node] = True
+    while queue:
+        node = queue.pop()
+        for nxt in adj[node]:
+            if not reach[nxt]:
+                reach[nxt] = True
+                queue.append(nxt)
+
+    comp = _strongly_connected(adj)
+
+    prune = [0] * k
+    for x in range(k):
+        for bit in _bits(doms[x] & ~match_of_cell[x]):
+            v = value_nodes[bit]
+            if comp[v] != comp[x] and not reach[v]:
+                prune[x] |= bit
+    return prune
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low
+        mask ^= low
+
+
+def _strongly_connected(adj):
+    """Tarjan dạng vòng lặp; trả về mã thành phần liên thông mạnh của từng nút."""
+    total = len(adj)
+    index = [-1] * total
+    low = [0] * total
+    on_stack = [False] * total
+    comp = [-1] * total
+    stack = []
+    counter = 0
+    comp_count = 0
+    for root in range(total):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, i = work[-1]
+            if i == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            if i < len(adj[node]):
+                work[-1] = (node, i + 1)
+                nxt = adj[node][i]
+                if index[nxt] == -1:
+                    work.append((nxt, 0))
+                elif on_stack[nxt]:
+                    low[node] = min(low[node], index[nxt])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    comp[w] = comp_count
+                    if w == node:
+                        break
+                comp_count += 1
+    return comp
+
+
+def total_domain_size(domains: BitmaskDomains):
+    """Tổng kích thước miền giá trị của các ô trống (dùng để đo mức thu hẹp)."""
+    masks, values = domains.domains, domains.values
+    return sum(masks[idx].bit_count() for idx in range(len(values)) if values[idx] == 0)
+
+
+def preprocess(board_wrapper: SudokuBoard, stats: dict, ac3=True, all_different=True, fill_forced=False):
+    """
+    Tiền xử lý dùng chung cho mọi bộ giải: khởi tạo miền giá trị rồi lọc AC-3 / AllDifferent
+    (solve_backtracking / solve_forward_checking / DLX với ac_preprocess=True).
+    Ghi vào stats: ac_domain_before / ac_domain_after (tổng kích thước miền các ô trống),
+    ac_cells_reduced, ac_time_sec, ac3_removed, alldiff_removed.
+    fill_forced=True: điền luôn các ô chỉ còn 1 giá trị vào bàn cờ (cho Backtracking / DLX,
+    vốn không dùng miền giá trị).
+    Trả về BucketedDomains đã lọc, hoặc None nếu phát hiện mâu thuẫn.
+    """
+    domains = BucketedDomains(board_wrapper)
+    if not domains.initialize():
+        return None
+    stats["ac_domain_before"] = total_domain_size(domains)
+
+    consistency = ArcConsistency(domains, stats, ac3=ac3, all_different=all_different)
+    ok, _ = consistency.propagate()
+    stats["ac_domain_after"] = total_domain_size(domains)
+    stats["ac_cells_reduced"] = len(consistency.reduction_report())
+    if not ok:
+        return None
+
+    if fill_forced:
+        n = domains.n
+        masks, values = domains.domains, domains.values
+        for idx in range(len(values)):
+            if values[idx] == 0 and not masks[idx] & (masks[idx] - 1):
+                board_wrapper.set_cell(idx // n, idx % n, masks[idx].bit_length())
+    return domains
@@ -0,0 +1,240 @@
+"""
+Giải hàng loạt (batch) bộ dữ liệu đề trên nhiều tiến trình.
+
+- ALGORITHMS: các thuật toán đăng ký được chạy hàng loạt (khóa giống khóa algo_key của Controller).
+- solve_chunk(): chạy trong tiến trình con - giải một lô đề bằng một thuật toán, đối chiếu với cột
+  lời giải và trả về số liệu đã gộp (không trả từng lời giải để giảm chi phí truyền giữa tiến trình).
+- BatchSolver.run(): chia nguồn đề thành các lô, giao cho ProcessPoolExecutor (mặc định dùng mọi lõi),
+  gộp số liệu theo từng thuật toán và báo tiến độ qua callback.
+- VECTOR_ALGORITHMS: lan truyền vector hóa cả lô 9x9 (vector_singles) trước, chỉ các đề còn dở mới được
+  giải tiếp từng đề bằng thuật toán tìm kiếm tương ứng; số đề xong ngay ở bước vector là "vector_solved".
+  Các thuật toán này chỉ nhận bộ đề 9x9 - BatchSolver(size=...) từ chối sớm các kích thước khác.
+Đề được đọc bằng cùng bảng ký tự với puzzle_text ('0' / '.' là ô trống, 'A'.. = 10.. với 16x16, 25x25).
+Nguồn đề là một iterable các lô (quizzes, solutions) - PuzzleDataset.iter_chunks(),
+hoặc bất kỳ nguồn đọc dần nào trả về cùng dạng.
+"""
+import os
+import time
+from math import isqrt
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from .sudoku_board import SudokuBoard
+from . import algorithms, algorithms_mrv
+from .solver_dlx_array import SudokuDLXArray
+from .puzzle_text import SIZES, CHAR_VALUES
+from .vector_singles import CELLS, propagate_batch
+
+
+def _solve_dlx(board_wrapper, stats):
+    return SudokuDLXArray(board_wrapper).solve(stats)
+
+
+# algo_key -> (tên hiển thị, hàm giải (board_wrapper, stats) -> bool)
+ALGORITHMS = {
+    'bt': ('Backtracking', algorithms.solve_backtracking),
+    'fc': ('Forward Checking', algorithms.solve_forward_checking),
+    'fc_mrv': ('FC + MRV', algorithms_mrv.solve_forward_checking_mrv),
+    'dlx': ('Dancing Links (DLX)', _solve_dlx),
+    'fc_mrv_ac': ('FC + MRV + AC', algorithms_mrv.solve_forward_checking_mrv_ac),
+}
+
+# algo_key -> (tên hiển thị, khóa thuật toán tìm kiếm cho các đề bước vector chưa giải xong)
+VECTOR_ALGORITHMS = {
+    'np_fc_mrv': ('NumPy + FC + MRV', 'fc_mrv'),
+    'np_dlx': ('NumPy + DLX', 'dlx'),
+}
+
+# Các khóa số liệu được cộng dồn giữa các lô
+_SUM_KEYS = ("count", "solved", "correct", "invalid", "time_sec", "backtracks", "vector_solved")
+
+
+def _parse(text):
+    """Chuỗi một đề / một lời giải -> (N, danh sách N*N giá trị ô); None nếu sai độ dài hoặc có ô ngoài 0..N."""
+    n = isqrt(len(text))
+    if n not in SIZES or n * n != len(text):
+        return None
+    values = [CHAR_VALUES[ch] for ch in text.encode("ascii", "replace")]
+    if max(values) > n:
+        return None
+    return n, values
+
+
+def _flatten(board):
+    return [v for row in board for v in row]
+
+
+def solve_chunk(algo_key, quizzes, solutions):
+    """
+    Giải một lô đề dạng chuỗi (mọi kích thước trong SIZES; VECTOR_ALGORITHMS chỉ nhận 9x9). Trả về dict số liệu:
+    count, solved, correct (trùng cột solutions), invalid (đề lỗi định dạng), time_sec, max_time_sec, backtracks,
+    vector_solved (chỉ với VECTOR_ALGORITHMS).
+    """
+    metrics = dict.fromkeys(_SUM_KEYS, 0)
+    metrics["time_sec"] = 0.0
+    metrics["max_time_sec"] = 0.0
+    if algo_key in VECTOR_ALGORITHMS:
+        return _solve_chunk_vectorized(VECTOR_ALGORITHMS[algo_key][1], quizzes, solutions, metrics)
+
+    solve = ALGORITHMS[algo_key][1]
+    for quiz, solution in zip(quizzes, solutions):
+        metrics["count"] += 1
+        parsed = _parse(str(quiz).strip())
+        if parsed is None:
+            metrics["invalid"] += 1
+            continue
+        n, values = parsed
+        board_wrapper = SudokuBoard([values[r * n:(r + 1) * n] for r in range(n)])
+        stats = {"backtracks": 0}
+        start = time.perf_counter()
+        is_solved = solve(board_wrapper, stats)
+        elapsed = time.perf_counter() - start
+
+        metrics["time_sec"] += elapsed
+        metrics["max_time_sec"] = max(metrics["max_time_sec"], elapsed)
+        metrics["backtracks"] += stats.get("backtracks", 0)
+        if is_solved:
+            metrics["solved"] += 1
+            expected = _parse(str(solution).strip())
+            if expected is not None and _flatten(board_wrapper.get_board()) == expected[1]:
+                metrics["correct"] += 1
+    return metrics
+
+
+def _solve_chunk_vectorized(search_key, quizzes, solutions, metrics):
+    """Lan truyền cả lô bằng NumPy; đề chưa xong (hoặc mâu thuẫn) mới chuyển cho thuật toán tìm kiếm search_key."""
+    solve = ALGORITHMS[search_key][1]
+    valid = []
+    for quiz, solution in zip(quizzes, solutions):
+        metrics["count"] += 1
+        parsed = _parse(str(quiz).strip())
+        if parsed is None or len(parsed[1]) != CELLS:
+            metrics["invalid"] += 1
+            continue
+        expected = _parse(str(solution).strip())
+        valid.append((parsed[1], expected[1] if expected is not None else None))
+    if not valid:
+        return metrics
+
+    start = time.perf_counter()
+    originals = np.array([values for values, _ in valid], dtype=np.uint8)
+    grids, solved, contradiction, _ = propagate_batch(originals)
+    # Thời gian bước vector chia đều cho các đề của lô
+    share = (time.perf_counter() - start) / len(valid)
+    metrics["time_sec"] += share * len(valid)
+    metrics["max_time_sec"] = share
+    metrics["vector_solved"] = int(np.count_nonzero(solved))
+
+    for pos, (_, solution) in enumerate(valid):
+        if solved[pos]:
+            metrics["solved"] += 1
+            if solution is not None and grids[pos].tolist() == solution:
+                metrics["correct"] += 1
+            continue
+        # Đề mâu thuẫn giao lại nguyên đề gốc để thuật toán tìm kiếm tự kết luận
+        source = originals[pos] if contradiction[pos] else grids[pos]
+        board_wrapper = SudokuBoard(source.reshape(9, 9).tolist())
+        stats = {"backtracks": 0}
+        start = time.perf_counter()
+        is_solved = solve(board_wrapper, stats)
+        elapsed = time.perf_counter() - start
+
+        metrics["time_sec"] += elapsed
+        metrics["max_time_sec"] = max(metrics["max_time_sec"], share + elapsed)
+        metrics["backtracks"] += stats.get("backtracks", 0)
+        if is_solved:
+            metrics["solved"] += 1
+            if _flatten(board_wrapper.get_board()) == solution:
+                metrics["correct"] += 1
+    return metrics
+
+
+def summarize(metrics, wall_sec=None):
+    """Thêm các chỉ số suy ra: accuracy, avg_ms, puzzles_per_sec (theo thời gian giải cộng dồn), vector_rate."""
+    result = dict(metrics)
+    count = metrics["count"] - metrics["invalid"]
+    result["accuracy"] = metrics["correct"] / count if count else 0.0
+    result["avg_ms"] = metrics["time_sec"] * 1000 / count if count else 0.0
+    result["puzzles_per_sec"] = count / metrics["time_sec"] if metrics["time_sec"] else 0.0
+    result["vector_rate"] = metrics["vector_solved"] / count if count else 0.0
+    if wall_sec is not None:
+        result["wall_sec"] = wall_sec
+    return result
+
+
+class BatchSolver:
+    def __init__(self, algo_keys, workers=None, size=None):
+        """size: cạnh lưới của bộ đề (nếu biết) - kiểm tra trước để không trả về toàn đề "lỗi định dạng"."""
+        for key in algo_keys:
+            if key not in ALGORITHMS and key not in VECTOR_ALGORITHMS:
+                raise ValueError(f"Thuật toán '{key}' không được hỗ trợ chạy hàng loạt.")
+        if size is not None:
+            if size not in SIZES:
+                raise ValueError(f"Không hỗ trợ giải hàng loạt đề {size}x{size}.")
+            vector_keys = [key for key in algo_keys if key in VECTOR_ALGORITHMS]
+            if vector_keys and size * size != CELLS:
+                raise ValueError(f"{', '.join(vector_keys)} chỉ hỗ trợ đề 9x9 (bộ đề đang là {size}x{size}).")
+        self.algo_keys = list(algo_keys)
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self, chunks, total=None, progress=None, should_stop=None):
+        """
+        chunks: iterable các lô (quizzes, solutions); total: tổng số đề (để báo tiến độ).
+        progress(algo_key, metrics): gọi mỗi khi một lô xong, metrics là số liệu đã gộp (đã summarize).
+        should_stop(): trả về True để dừng sớm (hủy các lô chưa chạy).
+        Trả về {algo_key: số liệu đã summarize, kèm "stopped" nếu bị dừng sớm}.
+        """
+        totals = {}
+        for key in self.algo_keys:
+            totals[key] = dict.fromkeys(_SUM_KEYS, 0)
+            totals[key]["time_sec"] = 0.0
+            totals[key]["max_time_sec"] = 0.0
+            totals[key]["total"] = total
+        start = time.perf_counter()
+
+        # Giới hạn số lô đang chờ để không nạp cả bộ dữ liệu vào hàng đợi của executor
+        max_in_flight = self.workers * 2
+        in_flight = {}
+        chunk_iter = iter(chunks)
+        stopped = False
+
+        def merge(key, metrics):
+            merged = totals[key]
+            for name in _SUM_KEYS:
+                merged[name] += metrics[name]
+            merged["max_time_sec"] = max(merged["max_time_sec"], metrics["max_time_sec"])
+            if progress: progress(key, summarize(merged, time.perf_counter() - start))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending_jobs = iter(())
+            while True:
+                # Nạp thêm việc: mỗi lô được giao cho từng thuật toán đã chọn
+                while not stopped and len(in_flight) < max_in_flight:
+                    job = next(pending_jobs, None)
+                    if job is None:
+                        batch = next(chunk_iter, None)
+                        if batch is None:
+                            break
+                        quizzes, solutions = batch
+                        pending_jobs = iter([(key, quizzes, solutions) for key in self.algo_keys])
+                        continue
+                    key, quizzes, solutions = job
+                    in_flight[executor.submit(solve_chunk, key, quizzes, solutions)] = key
+
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(in_flight.pop(future), future.result())
+                if not stopped and should_stop is not None and should_stop():
+                    stopped = True
+                    for future in in_flight:
+                        future.cancel()
+                    in_flight = {f: k for f, k in in_flight.items() if not f.cancelled()}
+
+        wall = time.perf_counter() - start
+        results = {key: summarize(metrics, wall) for key, metrics in totals.items()}
+        for metrics in results.values():
+            metrics["stopped"] = stopped
+        return results
@@ -0,0 +1,69 @@
+"""
+Bảng chỉ số hình học (Peer / Unit tables) dùng chung cho mọi bộ giải.
+
+Với mỗi kích thước N (4, 9, 16, 25, ...) các bảng chỉ được tạo MỘT lần rồi lưu cache,
+thay vì dựng lại tập hàng xóm (Hàng, Cột, Khối) trong vòng lặp tìm kiếm.
+Ô (r, c) được đánh chỉ số phẳng idx = r * N + c.
+"""
+import math
+from functools import lru_cache
+
+
+class BoardGeometry:
+    """
+    Các bảng chỉ số cho lưới NxN (chỉ đọc):
+    - row_of / col_of / box_of[idx]: hàng, cột, khối của ô idx.
+    - peers[idx]: chỉ số phẳng các ô hàng xóm của idx (không gồm chính nó).
+    - peer_rc[idx]: cùng danh sách hàng xóm nhưng ở dạng (r, c) cho các hàm làm việc với lưới 2 chiều.
+    - units: 3N đơn vị, lần lượt N Hàng, N Cột, N Khối; mỗi đơn vị là tuple chỉ số phẳng.
+    - units_of[idx]: (chỉ số đơn vị Hàng, Cột, Khối) chứa ô idx trong `units`.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.box_size = int(math.isqrt(n))
+        box_size = self.box_size
+        cells = range(n * n)
+
+        self.row_of = tuple(idx // n for idx in cells)
+        self.col_of = tuple(idx % n for idx in cells)
+        self.box_of = tuple((idx // n // box_size) * box_size + (idx % n) // box_size for idx in cells)
+
+        rows = [tuple(r * n + c for c in range(n)) for r in range(n)]
+        cols = [tuple(r * n + c for r in range(n)) for c in range(n)]
+        boxes = [[] for _ in range(n)]
+        for idx in cells:
+            boxes[self.box_of[idx]].append(idx)
+        self.units = tuple(rows + cols + [tuple(b) for b in boxes])
+        self.units_of = tuple((self.row_of[idx], n + self.col_of[idx], 2 * n + self.box_of[idx]) for idx in cells)
+
+        self.peers = _build_peers(n, box_size)
+        self.peer_rc = tuple(tuple((p // n, p % n) for p in peers) for peers in self.peers)
+
+
+def _build_peers(n, box_size):
+    """
+    Tạo danh sách hàng xóm (Hàng, Cột, Khối) của từng ô.
+    Thứ tự được giữ đúng như thứ tự duyệt của tập `neighbors` trong bản cài đặt cũ
+    để số lần cắt tỉa (prunes_made) báo cáo không thay đổi.
+    """
+    peers = []
+    for r in range(n):
+        for c in range(n):
+            neighbors = set()
+            for col in range(n): neighbors.add((r, col))
+            for row in range(n): neighbors.add((row, c))
+            box_r = (r // box_size) * box_size
+            box_c = (c // box_size) * box_size
+            for br in range(box_r, box_r + box_size):
+                for bc in range(box_c, box_c + box_size):
+                    neighbors.add((br, bc))
+            neighbors.discard((r, c))
+            peers.append(tuple(nr * n + nc for (nr, nc) in neighbors))
+    return tuple(peers)
+
+
+@lru_cache(maxsize=None)
+def get_geometry(n: int) -> BoardGeometry:
+    """Lấy bảng chỉ số cho lưới NxN (tạo lần đầu, các lần sau dùng lại từ cache)."""
+    return BoardGeometry(n)
@@ -0,0 +1,178 @@
+"""
+Chỉ mục đề theo nhóm độ khó - lấy đề ngẫu nhiên O(1), không lặp lại trong một phiên.
+
+Mỗi lần bấm "Lấy Đề" trước đây phải lọc toàn bộ bộ dữ liệu (O(số đề)). BucketIndex lọc một lần
+khi nạp và giữ danh sách chỉ số đề theo từng nhóm:
+- "grade:<độ khó>": độ khó theo kỹ thuật giải (cập nhật dần khi luồng chấm nền chạy).
+- "clues:<độ khó>": nhóm theo số gợi ý (dùng khi chưa chấm xong hoặc nhóm kỹ thuật đã hết đề);
+  ngưỡng là ngưỡng 9x9 co giãn theo số ô N*N (clue_buckets).
+draw() dùng Fisher-Yates "lười": mỗi lần rút đổi chỗ một phần tử ngẫu nhiên về đầu phần chưa dùng,
+nên không cần xáo trước và không trả lại đề đã ra. sample() chỉ bắt đầu vòng mới khi mọi nhóm
+ứng viên của độ khó đều đã hết đề chưa ra.
+Chỉ mục được lưu ra file .idx.npz cạnh file dữ liệu kèm dấu vân tay (kích thước, thời điểm sửa)
+và dùng lại khi file chưa thay đổi.
+"""
+import os
+import threading
+
+import numpy as np
+
+from .difficulty_grader import GRADES
+
+INDEX_EXT = ".idx.npz"
+_FILE_VERSION = 2
+
+# (độ khó, số gợi ý tối đa trên lưới 9x9) - cùng ngưỡng với cách lọc theo số gợi ý trước đây
+_CLUE_LIMITS_9X9 = (
+    ("extreme", 24),
+    ("hard", 29),
+    ("medium", 35),
+    ("easy", None),
+)
+
+
+def clue_buckets(cells=81):
+    """
+    (độ khó, số gợi ý tối thiểu, tối đa) cho lưới `cells` ô: ngưỡng 9x9 nhân tỉ lệ cells / 81
+    (9x9: <= 24, 25-29, 30-35, >= 36; 16x16: <= 75, 76-91, 92-110, >= 111).
+    """
+    buckets, low = [], None
+    for difficulty, limit in _CLUE_LIMITS_9X9:
+        high = None if limit is None else cells * limit // 81
+        buckets.append((difficulty, low, high))
+        low = None if high is None else high + 1
+    return tuple(buckets)
+
+
+# Ngưỡng của lưới 9x9 - thứ tự các độ khó dùng khi hạ dần độ khó
+CLUE_BUCKETS = clue_buckets()
+
+
+def index_path_for(path):
+    """data/sudoku.csv -> data/sudoku.idx.npz"""
+    return os.path.splitext(path)[0] + INDEX_EXT
+
+
+def file_fingerprint(path):
+    st = os.stat(path)
+    return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+
+class BucketIndex:
+    def __init__(self, rows, seed=None):
+        self.rows = rows
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+        self._buckets = {}     # khóa nhóm -> mảng chỉ số đề (phần [0, pos) là đề đã rút)
+        self._pos = {}
+        self._seen = np.zeros(rows, dtype=bool)   # đề đã ra trong phiên (dùng chung giữa các nhóm)
+
+    @classmethod
+    def build(cls, dataset, seed=None):
+        index = cls(len(dataset), seed)
+        index.rebuild_clues(dataset.clues, dataset.cells)
+        index.rebuild_grades(dataset.grades)
+        return index
+
+    # ---------------- Xây dựng ----------------
+
+    def rebuild_clues(self, clues, cells=81):
+        for difficulty, low, high in clue_buckets(cells):
+            mask = np.ones(len(clues), dtype=bool)
+            if low is not None: mask &= clues >= low
+            if high is not None: mask &= clues <= high
+            self._set_bucket(f"clues:{difficulty}", np.flatnonzero(mask))
+
+    def rebuild_grades(self, grades):
+        """Dựng lại các nhóm theo kỹ thuật (gọi từ luồng chấm nền sau mỗi phần đã chấm)."""
+        for code, grade in enumerate(GRADES):
+            self._set_bucket(f"grade:{grade}", np.flatnonzero(grades == code))
+
+    def _set_bucket(self, key, rows):
+        rows = rows.astype(np.int64)
+        with self._lock:
+            # Đưa các đề đã ra trong phiên về phần "đã rút" để không bị rút lại
+            seen = self._seen[rows]
+            self._buckets[key] = np.concatenate([rows[seen], rows[~seen]])
+            self._pos[key] = int(np.count_nonzero(seen))
+
+    # ---------------- Rút đề ----------------
+
+    def count(self, key):
+        """Số đề của nhóm (kể cả đề đã rút)."""
+        with self._lock:
+            return len(self._buckets.get(key, ()))
+
+    def remaining(self, key):
+        with self._lock:
+            return len(self._buckets.get(key, ())) - self._pos.get(key, 0)
+
+    def draw(self, key, restart=True):
+        """
+        Rút một đề chưa ra của nhóm (O(1) trung bình); None nếu nhóm rỗng.
+        Hết đề chưa ra: restart=True bắt đầu vòng mới của nhóm, restart=False trả về None.
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or not len(bucket):
+                return None
+            while True:
+                pos = self._pos[key]
+                if pos >= len(bucket):
+                    if not restart:
+                        return None
+                    # Hết đề trong nhóm -> Vòng mới
+                    self._seen[bucket] = False
+                    pos = 0
+                j = int(self._rng.integers(pos, len(bucket)))
+                bucket[pos], bucket[j] = bucket[j], bucket[pos]
+                row = int(bucket[pos])
+                self._pos[key] = pos + 1
+                if not self._seen[row]:   # Có thể đã ra qua một nhóm khác
+                    self._seen[row] = True
+                    return row
+
+    def sample(self, difficulty):
+        """
+        Rút đề theo độ khó: ưu tiên nhóm theo kỹ thuật, rồi nhóm theo số gợi ý (hạ dần độ khó, sau đó
+        các nhóm khó hơn). Nhóm nào đã hết đề chưa ra thì chuyển sang nhóm kế; chỉ khi mọi nhóm đều hết
+        mới bắt đầu vòng mới. Trả về (chỉ số đề, khóa nhóm đã dùng).
+        """
+        order = [name for name, _, _ in CLUE_BUCKETS]
+        start = order.index(difficulty) if difficulty in order else len(order) - 1
+        candidates = [f"grade:{difficulty}"] + [f"clues:{name}" for name in order[start:] + order[:start][::-1]]
+        for restart in (False, True):
+            for key in candidates:
+                row = self.draw(key, restart)
+                if row is not None:
+                    return row, key
+        return None, None
+
+    # ---------------- Lưu / nạp ----------------
+
+    def save(self, path, fingerprint):
+        """Ghi các nhóm (đã sắp xếp, không kèm trạng thái phiên) ra file .idx.npz; lỗi ghi (OSError) được ném ra."""
+        with self._lock:
+            arrays = {key: np.sort(bucket) for key, bucket in self._buckets.items()}
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, _version=np.array([_FILE_VERSION]), _rows=np.array([self.rows]),
+                 _fingerprint=fingerprint, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, fingerprint, rows, seed=None):
+        """
+        Nạp chỉ mục nếu file còn khớp (cùng phiên bản, số đề và dấu vân tay); ngược lại trả về None.
+        File không đọc được / hỏng: lỗi (OSError, ValueError, KeyError) được ném ra.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if (int(data["_version"][0]) != _FILE_VERSION or int(data["_rows"][0]) != rows
+                    or not np.array_equal(data["_fingerprint"], fingerprint)):
+                return None
+            index = cls(rows, seed)
+            for key in data.files:
+                if not key.startswith("_"):
+                    index._set_bucket(key, data[key])
+            return index
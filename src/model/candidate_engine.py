@@ -0,0 +1,321 @@
+"""
+Bộ máy miền giá trị dạng Bitmask (Candidate Engine) dùng chung cho FC và FC + MRV.
+
+Thay vì giữ một `set` cho mỗi ô, miền giá trị của ô được biểu diễn bằng một số nguyên:
+bit thứ (v - 1) bật nghĩa là số v vẫn còn khả dĩ. Nhờ đó:
+- Kích thước miền giá trị = popcount (int.bit_count()).
+- Thứ tự thử giá trị = lần lượt lấy bit thấp nhất (tăng dần 1..N).
+- Cắt tỉa / khôi phục chỉ là phép AND / OR trên số nguyên.
+
+Ngoài ra mỗi Hàng, Cột, Khối giữ một mask các số đã được điền.
+"""
+from .sudoku_board import SudokuBoard
+
+
+def popcount(mask: int) -> int:
+    """Số giá trị còn lại trong miền (số bit đang bật)."""
+    return mask.bit_count()
+
+
+def iter_values(mask: int):
+    """Duyệt các giá trị trong miền theo thứ tự tăng dần (lấy bit thấp nhất trước)."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length()
+        mask ^= low
+
+
+class BitmaskDomains:
+    """
+    Trạng thái CSP của một lần giải:
+    - domains[idx]: mask miền giá trị của ô idx (idx = r * n + c).
+    - values[idx]: giá trị đã điền (0 nếu còn trống).
+    - row_used / col_used / box_used: mask các số đã điền trong từng đơn vị.
+    """
+
+    def __init__(self, board_wrapper: SudokuBoard):
+        self.n = board_wrapper.n
+        self.box_size = board_wrapper.box_size
+        n = self.n
+        self.full_mask = (1 << n) - 1
+
+        self.domains = [self.full_mask] * (n * n)
+        self.values = [0] * (n * n)
+        self.row_used = [0] * n
+        self.col_used = [0] * n
+        self.box_used = [0] * n
+
+        geometry = board_wrapper.geometry
+        self.row_of = geometry.row_of
+        self.col_of = geometry.col_of
+        self.box_of = geometry.box_of
+        self.peers = geometry.peers
+
+        self._board_wrapper = board_wrapper
+
+    def initialize(self, stats: dict = None):
+        """
+        Khởi tạo miền giá trị từ bàn cờ: ô đề bài chốt domain chỉ còn số đó
+        và loại số đó khỏi domain các ô hàng xóm.
+        Trả về False nếu đề bài ban đầu đã mâu thuẫn.
+        Nếu truyền `stats`, số lần cắt tỉa được cộng vào stats["prunes_made"].
+        """
+        n = self.n
+        board = self._board_wrapper.get_board()
+        domains = self.domains
+        peers = self.peers
+        pruned = 0
+
+        for r in range(n):
+            for c in range(n):
+                num = board[r][c]
+                if num == 0:
+                    continue
+                idx = r * n + c
+                bit = 1 << (num - 1)
+                domains[idx] = bit
+                self.assign(idx, num)
+
+                # Cắt tỉa số đề bài khỏi domain các ô hàng xóm
+                for p in peers[idx]:
+                    d = domains[p]
+                    if d & bit:
+                        d ^= bit
+                        domains[p] = d
+                        pruned += 1
+                        if not d:
+                            if stats is not None: stats["prunes_made"] = stats.get("prunes_made", 0) + pruned
+                            return False
+
+        if stats is not None: stats["prunes_made"] = stats.get("prunes_made", 0) + pruned
+        return True
+
+    def assign(self, idx, num):
+        """Ghi nhận giá trị của ô và cập nhật mask của Hàng, Cột, Khối."""
+        bit = 1 << (num - 1)
+        self.values[idx] = num
+        self.row_used[self.row_of[idx]] |= bit
+        self.col_used[self.col_of[idx]] |= bit
+        self.box_used[self.box_of[idx]] |= bit
+
+    def unassign(self, idx, num):
+        """Xóa giá trị của ô (khi quay lui)."""
+        mask = ~(1 << (num - 1))
+        self.values[idx] = 0
+        self.row_used[self.row_of[idx]] &= mask
+        self.col_used[self.col_of[idx]] &= mask
+        self.box_used[self.box_of[idx]] &= mask
+
+    def prune_peers(self, idx, num):
+        """
+        Forward Checking: loại 'num' khỏi domain các ô hàng xóm của idx.
+        Trả về (is_consistent, pruned_log); pruned_log là danh sách chỉ số ô đã bị cắt
+        (cùng một bit) để khôi phục khi quay lui.
+        """
+        bit = 1 << (num - 1)
+        domains = self.domains
+        pruned_log = []
+        for p in self.peers[idx]:
+            d = domains[p]
+            if d & bit:
+                d ^= bit
+                domains[p] = d
+                pruned_log.append(p)
+                # Domain hàng xóm rỗng -> Phát hiện ngõ cụt sớm
+                if not d:
+                    return (False, pruned_log)
+        return (True, pruned_log)
+
+    def restore(self, num, pruned_log):
+        """Hoàn tác cắt tỉa: bật lại bit của 'num' cho các ô trong nhật ký."""
+        bit = 1 << (num - 1)
+        domains = self.domains
+        for p in pruned_log:
+            domains[p] |= bit
+
+    def eliminate(self, idx, bits):
+        """Loại các giá trị trong mask `bits` khỏi domain của ô idx. Trả về False nếu domain rỗng."""
+        d = self.domains[idx] & ~bits
+        self.domains[idx] = d
+        return d != 0
+
+    def readmit(self, idx, bits):
+        """Hoàn tác eliminate: bật lại các bit trong `bits` cho domain của ô idx."""
+        self.domains[idx] |= bits
+
+    def select_mrv(self):
+        """
+        Chọn biến MRV bằng cách quét toàn bộ bàn cờ: ô trống có domain nhỏ nhất
+        (ô đứng trước theo thứ tự hàng-cột được ưu tiên khi bằng nhau).
+        Trả về (idx, is_dead_end): idx = None và is_dead_end = False nghĩa là bàn cờ đã đầy.
+        """
+        min_len = self.n + 1
+        best_cell = None
+        values = self.values
+        masks = self.domains
+
+        for idx in range(len(values)):
+            if values[idx] == 0:
+                current_len = masks[idx].bit_count()
+                # Ô trống có domain rỗng -> Ngõ cụt chắc chắn
+                if current_len == 0: return (None, True)
+                if current_len < min_len:
+                    min_len = current_len
+                    best_cell = idx
+                    # Domain chỉ còn 1 giá trị -> Không thể tốt hơn
+                    if min_len == 1: break
+        return (best_cell, False)
+
+    def size(self, idx):
+        return self.domains[idx].bit_count()
+
+    def candidates(self, idx):
+        """Danh sách giá trị khả dĩ của ô, tăng dần."""
+        return list(iter_values(self.domains[idx]))
+
+    def write_back(self, board_wrapper: SudokuBoard = None):
+        """Ghi các giá trị đã điền vào bàn cờ (dùng sau khi giải xong)."""
+        board_wrapper = board_wrapper or self._board_wrapper
+        n = self.n
+        values = self.values
+        for idx in range(n * n):
+            if values[idx]:
+                board_wrapper.set_cell(idx // n, idx % n, values[idx])
+
+
+class BucketedDomains(BitmaskDomains):
+    """
+    BitmaskDomains kèm hàng đợi theo kích thước miền (bucket queue) để chọn biến MRV
+    mà không phải quét lại N^2 ô ở mỗi nút.
+
+    buckets[s] là một mask trên chỉ số ô: bit idx bật khi ô idx còn trống và domain có đúng s giá trị.
+    Gán / bỏ gán / cắt tỉa / khôi phục đều cập nhật bucket tương ứng, nên việc chọn ô chỉ cần
+    tìm bucket khác 0 nhỏ nhất rồi lấy bit thấp nhất (ô đứng trước theo thứ tự hàng-cột,
+    giống hệt kết quả của phép quét).
+    """
+
+    def __init__(self, board_wrapper: SudokuBoard):
+        super().__init__(board_wrapper)
+        geometry = board_wrapper.geometry
+        self.units = geometry.units
+        self.units_of = geometry.units_of
+        self.buckets = [0] * (self.n + 1)
+        # Số ô còn trống trong từng đơn vị (dùng cho tie-break theo bậc)
+        self.unit_free = [len(unit) for unit in self.units]
+
+    def initialize(self, stats: dict = None):
+        if not super().initialize(stats):
+            return False
+        buckets = self.buckets
+        domains = self.domains
+        for idx, value in enumerate(self.values):
+            if value == 0:
+                buckets[domains[idx].bit_count()] |= 1 << idx
+        return True
+
+    def assign(self, idx, num):
+        super().assign(idx, num)
+        self.buckets[self.domains[idx].bit_count()] &= ~(1 << idx)
+        unit_free = self.unit_free
+        for u in self.units_of[idx]:
+            unit_free[u] -= 1
+
+    def unassign(self, idx, num):
+        super().unassign(idx, num)
+        self.buckets[self.domains[idx].bit_count()] |= 1 << idx
+        unit_free = self.unit_free
+        for u in self.units_of[idx]:
+            unit_free[u] += 1
+
+    def prune_peers(self, idx, num):
+        bit = 1 << (num - 1)
+        domains = self.domains
+        values = self.values
+        buckets = self.buckets
+        pruned_log = []
+        for p in self.peers[idx]:
+            d = domains[p]
+            if d & bit:
+                d ^= bit
+                domains[p] = d
+                pruned_log.append(p)
+                if values[p] == 0:
+                    # Chuyển ô sang bucket nhỏ hơn 1 bậc
+                    size = d.bit_count()
+                    cell_bit = 1 << p
+                    buckets[size + 1] ^= cell_bit
+                    buckets[size] |= cell_bit
+                if not d:
+                    return (False, pruned_log)
+        return (True, pruned_log)
+
+    def restore(self, num, pruned_log):
+        bit = 1 << (num - 1)
+        domains = self.domains
+        values = self.values
+        buckets = self.buckets
+        for p in pruned_log:
+            d = domains[p] | bit
+            domains[p] = d
+            if values[p] == 0:
+                size = d.bit_count()
+                cell_bit = 1 << p
+                buckets[size - 1] ^= cell_bit
+                buckets[size] |= cell_bit
+
+    def eliminate(self, idx, bits):
+        old = self.domains[idx]
+        d = old & ~bits
+        self.domains[idx] = d
+        if self.values[idx] == 0:
+            cell_bit = 1 << idx
+            self.buckets[old.bit_count()] ^= cell_bit
+            self.buckets[d.bit_count()] |= cell_bit
+        return d != 0
+
+    def readmit(self, idx, bits):
+        old = self.domains[idx]
+        d = old | bits
+        self.domains[idx] = d
+        if self.values[idx] == 0:
+            cell_bit = 1 << idx
+            self.buckets[old.bit_count()] ^= cell_bit
+            self.buckets[d.bit_count()] |= cell_bit
+
+    def degree(self, idx):
+        """
+        Bậc của ô trống: số ô trống khác cùng Hàng, Cột, Khối, đếm theo từng đơn vị
+        (ô vừa cùng hàng vừa cùng khối được tính 2 lần vì tham gia 2 ràng buộc).
+        """
+        unit_free = self.unit_free
+        row_u, col_u, box_u = self.units_of[idx]
+        return unit_free[row_u] + unit_free[col_u] + unit_free[box_u] - 3
+
+    def select_mrv(self, degree_tie_break=False):
+        """
+        Chọn ô MRV từ bucket nhỏ nhất còn phần tử.
+        Nếu degree_tie_break=True, các ô bằng kích thước domain được phân định bằng bậc lớn nhất
+        (Degree Heuristic); bằng bậc thì lấy ô đứng trước.
+        """
+        buckets = self.buckets
+        if buckets[0]:
+            return (None, True)
+        for size in range(1, self.n + 1):
+            cells = buckets[size]
+            if not cells:
+                continue
+            if not degree_tie_break or not (cells & (cells - 1)):
+                return ((cells & -cells).bit_length() - 1, False)
+
+            best_cell = None
+            max_degree = -1
+            while cells:
+                low = cells & -cells
+                cells ^= low
+                idx = low.bit_length() - 1
+                deg = self.degree(idx)
+                if deg > max_degree:
+                    max_degree = deg
+                    best_cell = idx
+            return (best_cell, False)
+        return (None, False)
@@ -0,0 +1,215 @@
+"""
+Chấm độ khó theo kỹ thuật giải của người chơi (thay cho việc chỉ đếm số gợi ý).
+
+Bộ chấm giải đề bằng một "thang" kỹ thuật (LADDER) từ dễ đến khó, luôn ưu tiên kỹ thuật dễ nhất
+còn áp dụng được (ConstraintPropagator bắt đầu lại từ luật đầu tiên sau mỗi thay đổi).
+Kết quả:
+- hardest: kỹ thuật khó nhất đã phải dùng ("guessing" nếu các kỹ thuật logic không giải hết).
+- steps: số bước (ô điền được / ứng viên loại được) của từng kỹ thuật.
+- score: tổng trọng số * số bước; grade: nhãn độ khó suy ra từ hardest.
+
+grade_many() chấm cả danh sách đề trên nhiều tiến trình; GradeCache lưu kết quả (theo băm của đề) ra file
+để không phải chấm lại những đề không nằm trong kho .sdkb.
+"""
+import hashlib
+import os
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .sudoku_board import SudokuBoard
+from .candidate_engine import BitmaskDomains
+from .propagation import ConstraintPropagator
+
+# (kỹ thuật, trọng số, nhãn độ khó) theo thứ tự từ dễ đến khó
+LADDER = (
+    ("naked_singles", 1, "easy"),
+    ("hidden_singles", 2, "easy"),
+    ("locked_candidates", 4, "medium"),
+    ("naked_pairs", 6, "medium"),
+    ("hidden_pairs", 8, "medium"),
+    ("naked_triples", 10, "hard"),
+    ("hidden_triples", 12, "hard"),
+    ("x_wing", 16, "hard"),
+    ("swordfish", 20, "extreme"),
+)
+GUESSING = "guessing"
+GUESSING_WEIGHT = 50
+GRADES = ("easy", "medium", "hard", "extreme")
+
+_WEIGHT = {name: weight for name, weight, _ in LADDER}
+_GRADE_OF = {name: grade for name, _, grade in LADDER}
+_GRADE_OF[GUESSING] = "extreme"
+_HARDEST = tuple(name for name, _, _ in LADDER) + (GUESSING,)
+
+
+def grade_puzzle(grid):
+    """
+    Chấm một đề (ma trận NxN). Trả về dict:
+    {"grade", "hardest", "score", "steps": {kỹ thuật: số bước}, "solved": giải hết bằng logic hay không}
+    hoặc None nếu đề mâu thuẫn.
+    """
+    domains = BitmaskDomains(SudokuBoard([row[:] for row in grid]))
+    if not domains.initialize():
+        return None
+    stats = {}
+    propagator = ConstraintPropagator(domains, stats, rules=[name for name, _, _ in LADDER])
+    ok, _ = propagator.propagate()
+    if not ok:
+        return None
+
+    steps = {name: stats[name] for name, _, _ in LADDER if stats[name]}
+    solved = all(domains.values)
+    hardest = "naked_singles"
+    for name, _, _ in LADDER:
+        if name in steps:
+            hardest = name
+    score = sum(_WEIGHT[name] * count for name, count in steps.items())
+    if not solved:
+        hardest = GUESSING
+        score += GUESSING_WEIGHT
+    return {"grade": _GRADE_OF[hardest], "hardest": hardest, "score": score, "steps": steps, "solved": solved}
+
+
+def grade_string(puzzle):
+    """Chấm đề dạng chuỗi N*N ký tự ('0' hoặc '.' là ô trống). Trả về (grade, score, hardest) hoặc None."""
+    n = int(len(puzzle) ** 0.5)
+    grid = [[_char_value(ch) for ch in puzzle[r * n:(r + 1) * n]] for r in range(n)]
+    result = grade_puzzle(grid)
+    if result is None:
+        return None
+    return (result["grade"], result["score"], result["hardest"])
+
+
+def _char_value(ch):
+    if ch in "0.":
+        return 0
+    return int(ch) if ch.isdigit() else ord(ch.upper()) - 55
+
+
+def grade_many(puzzles, workers=None, chunksize=64, cache=None, progress=None):
+    """
+    Chấm danh sách đề dạng chuỗi trên nhiều tiến trình. Trả về list (grade, score, hardest) | None
+    theo đúng thứ tự đầu vào.
+    cache: GradeCache - đề đã có trong cache không chấm lại, đề mới chấm xong được thêm vào cache.
+    progress(done, total): gọi sau mỗi lô (trên luồng gọi grade_many); trả về False để dừng sớm
+    (các đề chưa chấm giữ giá trị None).
+    """
+    results = [None] * len(puzzles)
+    todo = []
+    for pos, puzzle in enumerate(puzzles):
+        cached = cache.get(puzzle) if cache is not None else None
+        if cached is not None:
+            results[pos] = cached
+        else:
+            todo.append(pos)
+
+    total = len(puzzles)
+    done = total - len(todo)
+    if progress: progress(done, total)
+    if not todo:
+        return results
+
+    batch = chunksize * (workers or os.cpu_count() or 1) * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(todo), batch):
+            positions = todo[start:start + batch]
+            graded = executor.map(grade_string, [puzzles[pos] for pos in positions], chunksize=chunksize)
+            new_entries = []
+            for pos, result in zip(positions, graded):
+                results[pos] = result
+                if result is not None:
+                    new_entries.append((puzzles[pos], result))
+            if cache is not None:
+                cache.update(new_entries)
+            done += len(positions)
+            if progress and progress(done, total) is False:
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+    return results
+
+
+class GradeCache:
+    """
+    Cache kết quả chấm cho các đề không nằm trong kho .sdkb (kho tự lưu độ khó trong metadata).
+    Khóa là băm blake2b 8 byte của chuỗi đề (không giữ chuỗi đề), file nhị phân bản ghi cỡ cố định
+    (RECORD: khóa, mã độ khó, mã kỹ thuật khó nhất, điểm) - kết quả mới được ghi nối vào cuối file.
+    Giữ tối đa `capacity` đề (bỏ đề cũ nhất khi đầy; file được thu gọn lúc nạp nếu dài hơn).
+    File chỉ được đọc ở lần get / update đầu tiên - tức là trên luồng chấm nền, không phải lúc khởi động.
+    Lỗi đọc / ghi file không làm dừng việc chấm: cache vẫn dùng được trong bộ nhớ và lỗi được báo qua
+    on_error(thông báo) (gọi trên luồng đang chấm); không có on_error thì lỗi được ném ra.
+    """
+    RECORD = struct.Struct("<QbBH")
+
+    def __init__(self, path=None, capacity=500_000, on_error=None):
+        self.path = path
+        self.capacity = capacity
+        self.on_error = on_error
+        self._lock = threading.Lock()
+        self._grades = None   # khóa băm -> (grade, score, hardest); None = chưa nạp
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._grades)
+
+    def get(self, puzzle):
+        with self._lock:
+            self._load()
+            return self._grades.get(puzzle_key(puzzle))
+
+    def update(self, entries):
+        """entries: danh sách (puzzle, (grade, score, hardest))."""
+        records = []
+        with self._lock:
+            self._load()
+            for puzzle, (grade, score, hardest) in entries:
+                key = puzzle_key(puzzle)
+                if key not in self._grades:
+                    self._add(key, (grade, score, hardest))
+                    records.append(self.RECORD.pack(key, GRADES.index(grade), _HARDEST.index(hardest), min(score, 0xFFFF)))
+        if records and self.path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "ab") as f:
+                    f.write(b"".join(records))
+            except OSError as e:
+                self._report(f"Lỗi lưu cache độ khó: {e}", e)
+
+    def _add(self, key, value):
+        if len(self._grades) >= self.capacity:
+            del self._grades[next(iter(self._grades))]
+        self._grades[key] = value
+
+    def _load(self):
+        if self._grades is not None:
+            return
+        self._grades = {}
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            size = self.RECORD.size
+            count = len(data) // size
+            first = max(0, count - self.capacity)
+            for key, grade, hardest, score in self.RECORD.iter_unpack(data[first * size:count * size]):
+                if 0 <= grade < len(GRADES) and hardest < len(_HARDEST):
+                    self._grades[key] = (GRADES[grade], score, _HARDEST[hardest])
+            if first or len(data) != count * size:
+                # Thu gọn file: chỉ giữ các bản ghi còn trong cache
+                with open(self.path, "wb") as f:
+                    f.write(data[first * size:count * size])
+        except (OSError, struct.error) as e:
+            self._report(f"Lỗi nạp cache độ khó: {e}", e)
+
+    def _report(self, message, error):
+        if self.on_error is None:
+            raise error
+        self.on_error(message)
+
+
+def puzzle_key(puzzle):
+    """Khóa 64 bit của một đề dạng chuỗi ('.' và '0' đều là ô trống)."""
+    digest = hashlib.blake2b(puzzle.replace(".", "0").encode("ascii", "replace"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
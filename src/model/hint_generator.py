@@ -69,24 +69,6 @@ class HintGenerator:
 
     @staticmethod
     def _prune_neighbors(domains, r, c, num, board_wrapper):
-        """Loại bỏ 'num' khỏi domain của hàng, cột, khối liên quan."""
-        n = board_wrapper.n
-        box_size = board_wrapper.box_size
-        
-        # Cắt tỉa Hàng
-        for col in range(n):
-            if col != c and num in domains[r][col]:
-                domains[r][col].discard(num)
-
-        # Cắt tỉa Cột
-        for row in range(n):
-            if row != r and num in domains[row][c]:
-                domains[row][c].discard(num)
-
-        # Cắt tỉa Khối
-        box_r = (r // box_size) * box_size
-        box_c = (c // box_size) * box_size
-        for br in range(box_r, box_r + box_size):
-            for bc in range(box_c, box_c + box_size):
-                if (br, bc) != (r, c) and num in domains[br][bc]:
-                    domains[br][bc].discard(num)
\ No newline at end of file
+        """Loại bỏ 'num' khỏi domain của hàng, cột, khối liên quan (dùng bảng hàng xóm dựng sẵn)."""
+        for (nr, nc) in board_wrapper.geometry.peer_rc[r * board_wrapper.n + c]:
+            domains[nr][nc].discard(num)
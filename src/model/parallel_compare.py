@@ -0,0 +1,257 @@
+"""
+So sánh nhiều thuật toán song song - mỗi thuật toán chạy trong một tiến trình riêng.
+
+Chạy lần lượt trong cùng tiến trình thì tổng thời gian là tổng của mọi thuật toán, và các số đo
+ảnh hưởng lẫn nhau (bộ nhớ đã cấp phát, GC, cache). Ở đây:
+- Mỗi thuật toán có một tiến trình "spawn" (không thừa hưởng bộ nhớ của ứng dụng, nên mức nền như nhau).
+  Chạy cùng lúc tối đa `workers` tiến trình (mặc định số lõi CPU) - nhiều tiến trình hơn số lõi thì chúng
+  tranh nhau CPU và thời gian thực không còn so sánh được; các thuật toán còn lại chờ lượt.
+- Tiến trình con tự đo thời gian thực (wall), thời gian CPU và bộ nhớ đỉnh (RSS) của chính nó.
+- Giới hạn thời gian (tính từ lúc tiến trình của thuật toán bắt đầu): SearchBudget trong tiến trình con dừng
+  engine đúng hạn (giữ số liệu đến lúc dừng); tiến trình không trả kết quả sau timeout + grace_sec (VD kẹt ở bước tiền xử lý) bị kết thúc cưỡng bức.
+- Kết quả về qua hàng đợi theo thứ tự thuật toán xong; poll() trả về các kết quả mới (gọi bằng root.after).
+"""
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+
+from .sudoku_board import SudokuBoard
+from .search_budget import SearchBudget, REASON_CANCELLED, REASON_TIMEOUT
+from .sinks import CountingSink
+
+
+def _solve_dlx(board_wrapper, stats, sink=None, budget=None, dlx_engine='array', ac_preprocess=False):
+    if ac_preprocess:
+        # Các ô bị ép sau khi lọc AC được điền sẵn -> Ma trận phủ chính xác nhỏ hơn
+        from .arc_consistency import preprocess
+        if preprocess(board_wrapper, stats, fill_forced=True) is None:
+            return False
+    if dlx_engine == 'array':
+        from .solver_dlx_array import SudokuDLXArray
+        return SudokuDLXArray(board_wrapper).solve(stats, budget)
+    from .solver_dlx import SudokuDLX
+    return SudokuDLX(board_wrapper).solve(stats, budget)
+
+
+# Các thuật toán nhận ac_preprocess=True (fc_mrv_ac luôn lọc AC, fc_mrv tự lan truyền trong lúc tìm kiếm)
+AC_PREPROCESS_KEYS = ('bt', 'fc', 'dlx')
+
+
+def solver_options(algo_key, dlx_engine='array', ac_preprocess=False):
+    """Tham số thêm cho hàm giải của solver_for(algo_key): engine DLX và lọc AC (nếu thuật toán hỗ trợ)."""
+    extra = {"dlx_engine": dlx_engine} if algo_key == 'dlx' else {}
+    if ac_preprocess and algo_key in AC_PREPROCESS_KEYS:
+        extra["ac_preprocess"] = True
+    return extra
+
+
+def solver_for(algo_key):
+    """
+    Hàm giải (board_wrapper, stats, sink=..., budget=...) của thuật toán (import trong tiến trình con).
+    BT / FC / DLX nhận thêm ac_preprocess=True để lọc AC-3 / AllDifferent trước khi tìm kiếm.
+    """
+    if algo_key == 'bt':
+        from .algorithms import solve_backtracking
+        return solve_backtracking
+    if algo_key == 'fc':
+        from .algorithms import solve_forward_checking
+        return solve_forward_checking
+    if algo_key == 'fc_mrv':
+        from .algorithms_mrv import solve_forward_checking_mrv
+        return solve_forward_checking_mrv
+    if algo_key == 'fc_mrv_ac':
+        from .algorithms_mrv import solve_forward_checking_mrv_ac
+        return solve_forward_checking_mrv_ac
+    if algo_key == 'dlx':
+        return _solve_dlx
+    raise ValueError(f"Thuật toán '{algo_key}' không tồn tại.")
+
+
+def peak_memory_bytes():
+    """Bộ nhớ đỉnh (RSS) của tiến trình hiện tại tính bằng byte; None nếu hệ điều hành không hỗ trợ."""
+    try:
+        import resource
+    except ImportError:
+        return _peak_memory_windows()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về byte
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _peak_memory_windows():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def measure_algorithm(algo_key, grid, timeout=None, dlx_engine='array', cancel_event=None, ac_preprocess=False):
+    """
+    Giải `grid` bằng một thuật toán (có đếm nút / cắt tỉa) và đo tài nguyên của tiến trình hiện tại.
+    Trả về stats của thuật toán kèm: solved (True / False / None = chạm giới hạn), execution_time_sec (wall),
+    cpu_time_sec, peak_memory_bytes (RSS đỉnh của tiến trình), memory_growth_bytes (phần tăng thêm khi giải).
+    """
+    solve = solver_for(algo_key)
+    board_wrapper = SudokuBoard([row[:] for row in grid])
+    stats = {"backtracks": 0}
+    extra = solver_options(algo_key, dlx_engine, ac_preprocess)
+
+    memory_before = peak_memory_bytes()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    budget = SearchBudget(timeout=timeout, cancel_token=cancel_event)
+    is_solved = solve(board_wrapper, stats, sink=CountingSink(), budget=budget, **extra)
+    stats["execution_time_sec"] = time.perf_counter() - wall_start
+    stats["cpu_time_sec"] = time.process_time() - cpu_start
+    memory_after = peak_memory_bytes()
+
+    stats["solved"] = is_solved
+    stats["peak_memory_bytes"] = memory_after
+    if memory_before is not None and memory_after is not None:
+        stats["memory_growth_bytes"] = memory_after - memory_before
+    return stats
+
+
+def _worker(algo_key, grid, timeout, dlx_engine, ac_preprocess, cancel_event, results):
+    try:
+        results.put((algo_key, measure_algorithm(algo_key, grid, timeout, dlx_engine, cancel_event, ac_preprocess), None))
+    except Exception:
+        results.put((algo_key, None, traceback.format_exc()))
+
+
+class ParallelCompare:
+    """
+    Chạy các thuật toán `algo_keys` trên cùng đề `grid`, mỗi thuật toán một tiến trình.
+    start() khởi động; poll() trả về danh sách (algo_key, stats | None, lỗi | None) mới về;
+    cancel() yêu cầu dừng; done = mọi thuật toán đã có kết quả.
+    """
+
+    def __init__(self, grid, algo_keys, timeout=None, dlx_engine='array', workers=None, grace_sec=2.0,
+                 ac_preprocess=False):
+        self.grid = [list(row) for row in grid]
+        self.algo_keys = list(algo_keys)
+        self.timeout = timeout
+        self.dlx_engine = dlx_engine
+        self.ac_preprocess = ac_preprocess
+        self.workers = workers or os.cpu_count() or 1
+        self.grace_sec = grace_sec
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._cancel_event = self._ctx.Event()
+        self._waiting = list(self.algo_keys)
+        self._processes = {}    # algo_key -> (Process, thời điểm bắt đầu) của các tiến trình chưa có kết quả
+        self._started_at = None
+        self._cancelled_at = None
+        self.results = {}   # algo_key -> (stats | None, lỗi | None)
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._launch()
+
+    def _launch(self):
+        while self._waiting and len(self._processes) < self.workers and self._cancelled_at is None:
+            key = self._waiting.pop(0)
+            process = self._ctx.Process(
+                target=_worker, daemon=True,
+                args=(key, self.grid, self.timeout, self.dlx_engine, self.ac_preprocess, self._cancel_event, self._results),
+            )
+            process.start()
+            self._processes[key] = (process, time.perf_counter())
+
+    @property
+    def done(self):
+        return len(self.results) == len(self.algo_keys)
+
+    @property
+    def cancelled(self):
+        return self._cancelled_at is not None
+
+    @property
+    def wall_sec(self):
+        return time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+
+    def cancel(self):
+        if self._cancelled_at is None:
+            self._cancelled_at = time.perf_counter()
+            self._cancel_event.set()
+
+    def poll(self):
+        """Đọc các kết quả đã về; kết thúc các tiến trình quá hạn, chạy các thuật toán đang chờ. Trả về danh sách kết quả mới."""
+        arrived = self._drain()
+
+        now = time.perf_counter()
+        for key, (process, started) in list(self._processes.items()):
+            if key in self.results:
+                continue
+            if process.is_alive():
+                if now >= self._hard_deadline(started):
+                    process.terminate()
+                    process.join(1.0)
+                    reason = REASON_CANCELLED if self._cancelled_at is not None else REASON_TIMEOUT
+                    self._add(arrived, key, {"budget_exceeded": reason, "solved": None, "terminated": True,
+                                             "execution_time_sec": now - started}, None)
+                continue
+            # Tiến trình đã thoát: kết quả có thể vừa được ghi vào hàng đợi sau lần đọc ở trên
+            arrived.extend(self._drain())
+            if key not in self.results:
+                self._add(arrived, key, None, f"Tiến trình kết thúc bất thường (mã {process.exitcode}).")
+
+        for key in list(self._processes):
+            if key in self.results:
+                process, _ = self._processes.pop(key)
+                process.join(0.1)
+        if self._cancelled_at is not None:
+            # Các thuật toán chưa kịp chạy
+            for key in self._waiting:
+                self._add(arrived, key, {"budget_exceeded": REASON_CANCELLED, "solved": None}, None)
+            self._waiting = []
+        self._launch()
+        return arrived
+
+    def _hard_deadline(self, started):
+        deadline = float("inf")
+        if self.timeout is not None:
+            deadline = started + self.timeout + self.grace_sec
+        if self._cancelled_at is not None:
+            deadline = min(deadline, self._cancelled_at + self.grace_sec)
+        return deadline
+
+    def _add(self, arrived, key, stats, error):
+        self.results[key] = (stats, error)
+        arrived.append((key, stats, error))
+
+    def _drain(self):
+        arrived = []
+        while True:
+            try:
+                key, stats, error = self._results.get_nowait()
+            except queue.Empty:
+                return arrived
+            if key not in self.results:
+                self._add(arrived, key, stats, error)
+
+    def shutdown(self):
+        """Dừng ngay mọi tiến trình còn chạy (khi đóng ứng dụng)."""
+        self._cancel_event.set()
+        self._waiting = []
+        for process, _ in self._processes.values():
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,214 @@
+"""
+Chế độ "Danh mục" (portfolio): chạy đua nhiều thuật toán trên cùng một đề, mỗi thuật toán một tiến trình,
+lấy kết quả của thuật toán về đích đầu tiên và dừng các thuật toán còn lại.
+
+Không thuật toán nào nhanh nhất trên mọi đề: DLX mạnh ở 9x9, FC + MRV + AC đôi khi nhanh hơn ở 25x25,
+Backtracking đôi khi nhanh hơn với lưới gần đầy. Thuật toán thắng của mỗi lần chạy được ghi vào
+PortfolioHistory (file CSV trong data/) để sau này dựng bộ chọn thuật toán cố định từ lịch sử đó.
+
+"Về đích" = có câu trả lời chắc chắn: tìm được lời giải, hoặc đã chứng minh đề vô nghiệm.
+Thuật toán chạm giới hạn thời gian (SearchBudget trong tiến trình con) không được tính là về đích.
+Tiến trình được tạo bằng "spawn" (xem parallel_compare.py); thời gian khởi động tiến trình
+(~0.1 - 0.5 s) nằm trong thời gian chờ, nên với đề dễ chạy một thuật toán trực tiếp vẫn nhanh hơn.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import Counter
+
+from .sudoku_board import SudokuBoard
+from .search_budget import SearchBudget, REASON_CANCELLED, REASON_TIMEOUT
+from .parallel_compare import solver_for, solver_options
+from src.utils.sudoku_converter import SudokuConverter
+
+# Các thuật toán tham gia chạy đua mặc định
+PORTFOLIO_ENGINES = ('dlx', 'fc_mrv_ac', 'fc_mrv', 'bt')
+
+# Tiền tố của outcome khi tiến trình lỗi: "error: <thông báo lỗi>"
+ERROR = "error"
+
+
+def _race_worker(algo_key, grid, timeout, dlx_engine, ac_preprocess, results):
+    try:
+        solve = solver_for(algo_key)
+        board_wrapper = SudokuBoard(grid)
+        stats = {"backtracks": 0}
+        extra = solver_options(algo_key, dlx_engine, ac_preprocess)
+        start = time.perf_counter()
+        is_solved = solve(board_wrapper, stats, budget=SearchBudget(timeout=timeout), **extra)
+        stats["execution_time_sec"] = time.perf_counter() - start
+        results.put((algo_key, is_solved, board_wrapper.get_board() if is_solved else None, stats, None))
+    except Exception:
+        results.put((algo_key, None, None, None, traceback.format_exc()))
+
+
+class PortfolioRace:
+    """
+    start() khởi động các tiến trình; gọi poll() định kỳ (root.after) cho tới khi trả về True.
+    Kết quả: winner (algo_key về đích đầu tiên, None nếu không có), is_solved (True / False / None),
+    solution (lưới lời giải), stats (của thuật toán thắng, hoặc stats ghi lý do dừng),
+    outcomes: algo_key -> "solved" / "unsolvable" / lý do dừng / "error: <thông báo>" / "stopped" (bị dừng vì đã có
+    người thắng). Lỗi của tiến trình con không được in ra mà giữ trong outcomes (xem errors()) để controller hiển thị.
+    """
+
+    def __init__(self, grid, engines=PORTFOLIO_ENGINES, timeout=None, dlx_engine='array', grace_sec=2.0,
+                 ac_preprocess=False):
+        self.grid = [list(row) for row in grid]
+        self.engines = list(engines)
+        self.timeout = timeout
+        self.dlx_engine = dlx_engine
+        self.ac_preprocess = ac_preprocess
+        self.grace_sec = grace_sec
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._processes = {}
+        self._started_at = None
+        self.winner = None
+        self.is_solved = None
+        self.solution = None
+        self.stats = None
+        self.outcomes = {}
+        self.cancelled = False
+        self.done = False
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        for key in self.engines:
+            process = self._ctx.Process(target=_race_worker, daemon=True,
+                                        args=(key, self.grid, self.timeout, self.dlx_engine, self.ac_preprocess, self._results))
+            process.start()
+            self._processes[key] = process
+
+    @property
+    def wall_sec(self):
+        return time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+
+    def cancel(self):
+        """Người dùng hủy: dừng ngay mọi tiến trình."""
+        if self.done:
+            return
+        self.cancelled = True
+        self._finish(None, None, None, {"budget_exceeded": REASON_CANCELLED, "execution_time_sec": self.wall_sec})
+
+    def poll(self):
+        """Đọc kết quả đã về; True khi cuộc đua kết thúc (có người thắng, tất cả đều dừng, hoặc bị hủy)."""
+        if self.done:
+            return True
+        self._drain()
+        if self.done:
+            return True
+
+        for key, process in self._processes.items():
+            if key in self.outcomes or process.is_alive():
+                continue
+            # Tiến trình đã thoát: kết quả có thể vừa được ghi vào hàng đợi sau lần đọc ở trên
+            self._drain()
+            if self.done:
+                return True
+            if key not in self.outcomes:
+                self.outcomes[key] = f"{ERROR}: Tiến trình kết thúc bất thường (mã {process.exitcode})."
+
+        if self.timeout is not None and self.wall_sec >= self.timeout + self.grace_sec:
+            for key in self.engines:
+                self.outcomes.setdefault(key, REASON_TIMEOUT)
+        if len(self.outcomes) == len(self.engines):
+            # Không thuật toán nào về đích; nếu mọi thuật toán đều lỗi thì không có lý do dừng (xem errors())
+            stats = {"execution_time_sec": self.wall_sec}
+            if len(self.errors()) < len(self.engines):
+                stats["budget_exceeded"] = REASON_TIMEOUT
+            self._finish(None, None, None, stats)
+        return self.done
+
+    def errors(self):
+        """algo_key -> thông báo lỗi của các tiến trình bị lỗi."""
+        prefix = f"{ERROR}: "
+        return {key: outcome[len(prefix):] for key, outcome in self.outcomes.items() if outcome.startswith(prefix)}
+
+    def _drain(self):
+        while not self.done:
+            try:
+                key, is_solved, solution, stats, error = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if error is not None:
+                self.outcomes[key] = f"{ERROR}: {error.strip().splitlines()[-1]}"
+            elif is_solved is None:
+                self.outcomes[key] = stats.get("budget_exceeded") or "stopped"
+            else:
+                self.outcomes[key] = "solved" if is_solved else "unsolvable"
+                self._finish(key, is_solved, solution, stats)
+
+    def _finish(self, winner, is_solved, solution, stats):
+        self.winner, self.is_solved, self.solution, self.stats = winner, is_solved, solution, stats
+        self.done = True
+        for key in self.engines:
+            self.outcomes.setdefault(key, "stopped")
+        self.shutdown()
+
+    def shutdown(self):
+        """Dừng mọi tiến trình còn chạy (các thuật toán chưa về đích không còn cần thiết)."""
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+
+
+class PortfolioHistory:
+    """
+    Lịch sử thuật toán thắng của chế độ Danh mục, ghi nối vào file CSV không tiêu đề:
+    puzzle,size,clues,winner,result,solve_sec (result: solved / unsolvable; solve_sec: thời gian giải
+    của thuật toán thắng, đo trong tiến trình của nó - không gồm thời gian khởi động tiến trình).
+    Lỗi đọc / ghi file không làm mất lịch sử trong bộ nhớ; lỗi được báo qua on_error(thông báo),
+    không có on_error thì lỗi được ném ra.
+    """
+
+    def __init__(self, path=None, on_error=None):
+        self.path = path
+        self.on_error = on_error
+        self._lock = threading.Lock()
+        self._entries = None   # Nạp khi cần
+
+    def record(self, grid, winner, is_solved, solve_sec):
+        n = len(grid)
+        puzzle = "".join(SudokuConverter.int_to_char(v) or '0' for row in grid for v in row)
+        clues = sum(1 for row in grid for v in row if v)
+        entry = (puzzle, n, clues, winner, "solved" if is_solved else "unsolvable", solve_sec)
+        with self._lock:
+            self._load()
+            self._entries.append(entry)
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(f"{puzzle},{n},{clues},{winner},{entry[4]},{solve_sec:.6f}\n")
+            except OSError as e:
+                self._report(f"Lỗi lưu lịch sử Danh mục: {e}", e)
+
+    def wins(self, size=None):
+        """Số lần thắng của mỗi thuật toán (chỉ tính đề kích thước `size` nếu có)."""
+        with self._lock:
+            self._load()
+            return Counter(e[3] for e in self._entries if size is None or e[1] == size)
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = []
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split(",")
+                    if len(parts) == 6:
+                        self._entries.append((parts[0], int(parts[1]), int(parts[2]), parts[3], parts[4], float(parts[5])))
+        except (OSError, ValueError) as e:
+            self._report(f"Lỗi nạp lịch sử Danh mục: {e}", e)
+
+    def _report(self, message, error):
+        if self.on_error is None:
+            raise error
+        self.on_error(message)
+
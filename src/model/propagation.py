@@ -0,0 +1,393 @@
+"""
+Lớp lan truyền ràng buộc (Constraint Propagation) cho FC / FC + MRV.
+
+Forward Checking chỉ cắt tỉa hàng xóm của ô vừa điền. ConstraintPropagator chạy thêm các luật
+suy diễn sau mỗi lần gán cho tới khi không còn gì thay đổi (điểm bất động):
+- naked_singles: ô trống chỉ còn 1 giá trị -> điền luôn.
+- hidden_singles: trong một Hàng / Cột / Khối, giá trị chỉ còn 1 ô có thể nhận -> điền vào ô đó.
+- locked_candidates: trong một Khối, giá trị chỉ nằm trên 1 Hàng (Cột) -> loại khỏi phần còn lại
+  của Hàng (Cột) đó (pointing); trong một Hàng (Cột), giá trị chỉ nằm trong 1 Khối -> loại khỏi
+  phần còn lại của Khối (claiming).
+
+Các luật nâng cao (ADVANCED_RULES, không bật mặc định cho bộ giải, dùng cho bộ chấm độ khó):
+- naked_pairs / naked_triples: k ô trong một đơn vị có hợp domain đúng k giá trị -> loại k giá trị đó
+  khỏi các ô còn lại của đơn vị.
+- hidden_pairs / hidden_triples: k giá trị trong một đơn vị chỉ nằm trong đúng k ô -> loại các giá trị
+  khác khỏi k ô đó.
+- x_wing / swordfish: với một giá trị, k hàng mà vị trí có thể của giá trị chỉ nằm trong k cột
+  -> loại giá trị đó khỏi k cột ấy ở các hàng khác (và ngược lại hàng <-> cột).
+
+Mọi thay đổi được ghi vào một nhật ký (trail) để hoàn tác khi quay lui:
+  ("assign", idx, num, pruned_log)   - điền num vào ô idx và cắt tỉa hàng xóm
+  ("elim", idx, bits)                - loại các bit `bits` khỏi domain ô idx
+"""
+from functools import lru_cache
+from itertools import combinations
+
+from .board_geometry import get_geometry
+from .candidate_engine import BitmaskDomains
+
+RULES = ("naked_singles", "hidden_singles", "locked_candidates")
+ADVANCED_RULES = ("naked_pairs", "hidden_pairs", "naked_triples", "hidden_triples", "x_wing", "swordfish")
+ALL_RULES = RULES + ADVANCED_RULES
+
+# Giá trị trả về của một luật khi phát hiện mâu thuẫn
+_CONTRADICTION = -1
+
+
+@lru_cache(maxsize=None)
+def _segment_tables(n):
+    """
+    Các đoạn giao giữa Hàng / Cột và Khối (mỗi đoạn dài box_size ô), tính một lần cho mỗi N.
+    Với hàng r và cột-khối k (khối (r // bs, k)):
+    - row_segments[r][k]: các ô của đoạn.
+    - row_rest_of_line[r][k]: các ô của hàng r nằm ngoài khối đó.
+    - row_rest_of_box[r][k]: các ô của khối đó nằm ngoài hàng r.
+    Tương tự cho cột (col_*[c][R] với hàng-khối R).
+    """
+    bs = get_geometry(n).box_size
+
+    def build(cell):
+        # cell(line, pos) -> idx; line là hàng (hoặc cột), pos là vị trí dọc theo line
+        segments, rest_of_line, rest_of_box = [], [], []
+        for line in range(n):
+            segs, lines, boxes = [], [], []
+            group = (line // bs) * bs
+            for k in range(bs):
+                segs.append(tuple(cell(line, p) for p in range(k * bs, (k + 1) * bs)))
+                lines.append(tuple(cell(line, p) for p in range(n) if p // bs != k))
+                boxes.append(tuple(cell(other, p)
+                                   for other in range(group, group + bs) if other != line
+                                   for p in range(k * bs, (k + 1) * bs)))
+            segments.append(tuple(segs))
+            rest_of_line.append(tuple(lines))
+            rest_of_box.append(tuple(boxes))
+        return tuple(segments), tuple(rest_of_line), tuple(rest_of_box)
+
+    rows = build(lambda r, c: r * n + c)
+    cols = build(lambda c, r: r * n + c)
+    return bs, rows, cols
+
+
+class ConstraintPropagator:
+    """
+    Chạy các luật lan truyền trên một BitmaskDomains (hoặc BucketedDomains).
+    Số ô mỗi luật điền được (naked / hidden singles) và số ứng viên bị loại (locked candidates)
+    được cộng vào stats[<tên luật>]. Số lần cắt tỉa hàng xóm do các ô tự điền gây ra được đếm ở
+    self.prunes (cộng dồn) - engine cộng phần tăng thêm vào bộ đếm prunes_made của chính nó,
+    vì engine ghi đè stats["prunes_made"] bằng bộ đếm cục bộ khi kết thúc.
+    """
+
+    def __init__(self, domains: BitmaskDomains, stats: dict = None, rules=RULES):
+        self.domains = domains
+        self.stats = stats if stats is not None else {}
+        self.prunes = 0
+        self.rules = tuple(rules)
+        for rule in self.rules:
+            if rule not in ALL_RULES:
+                raise ValueError(f"Luật lan truyền không hợp lệ: {rule}")
+            self.stats.setdefault(rule, 0)
+        self._apply = [getattr(self, "_" + rule) for rule in self.rules]
+
+        n = domains.n
+        self.n = n
+        self.units = get_geometry(n).units
+        self.box_size, self.row_tables, self.col_tables = _segment_tables(n)
+
+    def propagate(self):
+        """
+        Chạy các luật tới điểm bất động (sau mỗi thay đổi lại bắt đầu từ luật đầu tiên, rẻ nhất).
+        Trả về (is_consistent, trail); trail phải được undo khi quay lui, kể cả khi mâu thuẫn.
+        """
+        trail = []
+        apply = self._apply
+        while True:
+            for rule in apply:
+                changed = rule(trail)
+                if changed == _CONTRADICTION:
+                    return (False, trail)
+                if changed:
+                    break
+            else:
+                return (True, trail)
+
+    def undo(self, trail):
+        """Hoàn tác nhật ký theo thứ tự ngược lại."""
+        domains = self.domains
+        for entry in reversed(trail):
+            if entry[0] == "assign":
+                _, idx, num, pruned_log = entry
+                domains.restore(num, pruned_log)
+                domains.unassign(idx, num)
+            else:
+                domains.readmit(entry[1], entry[2])
+
+    # ---------------- Thao tác có ghi nhật ký ----------------
+
+    def _assign(self, trail, idx, num):
+        domains = self.domains
+        domains.assign(idx, num)
+        is_consistent, pruned_log = domains.prune_peers(idx, num)
+        trail.append(("assign", idx, num, pruned_log))
+        self.prunes += len(pruned_log)
+        return is_consistent
+
+    def _eliminate(self, trail, cells, bits):
+        """Loại `bits` khỏi các ô trống trong `cells`. Trả về số ứng viên đã loại, hoặc _CONTRADICTION."""
+        domains = self.domains
+        masks = domains.domains
+        values = domains.values
+        removed = 0
+        for idx in cells:
+            hit = masks[idx] & bits
+            if hit and values[idx] == 0:
+                ok = domains.eliminate(idx, hit)
+                trail.append(("elim", idx, hit))
+                removed += hit.bit_count()
+                if not ok:
+                    return _CONTRADICTION
+        return removed
+
+    # ---------------- Các luật ----------------
+
+    def _naked_singles(self, trail):
+        masks = self.domains.domains
+        values = self.domains.values
+        count = 0
+        for idx in range(len(values)):
+            if values[idx] == 0:
+                m = masks[idx]
+                if m & (m - 1) == 0:
+                    if not m:
+                        return _CONTRADICTION
+                    count += 1
+                    self.stats["naked_singles"] += 1
+                    if not self._assign(trail, idx, m.bit_length()):
+                        return _CONTRADICTION
+        return count
+
+    def _hidden_singles(self, trail):
+        domains = self.domains
+        masks = domains.domains
+        values = domains.values
+        n = self.n
+        full = domains.full_mask
+        used_of = (domains.row_used, domains.col_used, domains.box_used)
+        count = 0
+        for u, unit in enumerate(self.units):
+            # once: giá trị xuất hiện ở >= 1 ô trống; twice: ở >= 2 ô trống
+            once = twice = 0
+            for idx in unit:
+                if values[idx] == 0:
+                    m = masks[idx]
+                    twice |= once & m
+                    once |= m
+            # Có giá trị không còn chỗ nào để điền trong đơn vị -> Mâu thuẫn
+            if (once | used_of[u // n][u % n]) != full:
+                return _CONTRADICTION
+
+            singles = once & ~twice
+            while singles:
+                low = singles & -singles
+                singles ^= low
+                for idx in unit:
+                    if values[idx] == 0 and masks[idx] & low:
+                        break
+                else:
+                    # Ô duy nhất của giá trị này vừa bị điền số khác -> Mâu thuẫn
+                    return _CONTRADICTION
+                count += 1
+                self.stats["hidden_singles"] += 1
+                if not self._assign(trail, idx, low.bit_length()):
+                    return _CONTRADICTION
+        return count
+
+    def _locked_candidates(self, trail):
+        removed = 0
+        for segments, rest_of_line, rest_of_box in (self.row_tables, self.col_tables):
+            result = self._locked_in(trail, segments, rest_of_line, rest_of_box)
+            if result == _CONTRADICTION:
+                return _CONTRADICTION
+            removed += result
+        self.stats["locked_candidates"] += removed
+        return removed
+
+    def _locked_in(self, trail, segments, rest_of_line, rest_of_box):
+        masks = self.domains.domains
+        values = self.domains.values
+        bs = self.box_size
+        n = self.n
+
+        # seg[line][k]: hợp các domain ô trống trong đoạn giao giữa line và khối thứ k dọc theo line
+        seg = []
+        for line_segments in segments:
+            row = []
+            for cells in line_segments:
+                m = 0
+                for idx in cells:
+                    if values[idx] == 0:
+                        m |= masks[idx]
+                row.append(m)
+            seg.append(row)
+
+        removed = 0
+        for line in range(n):
+            group = (line // bs) * bs
+            for k in range(bs):
+                m = seg[line][k]
+                if not m:
+                    continue
+                # Pointing: trong khối, giá trị chỉ nằm trên line này -> loại khỏi phần còn lại của line
+                others = 0
+                for other in range(group, group + bs):
+                    if other != line:
+                        others |= seg[other][k]
+                only = m & ~others
+                if only:
+                    result = self._eliminate(trail, rest_of_line[line][k], only)
+                    if result == _CONTRADICTION:
+                        return _CONTRADICTION
+                    removed += result
+
+                # Claiming: trên line, giá trị chỉ nằm trong khối này -> loại khỏi phần còn lại của khối
+                others = 0
+                for other in range(bs):
+                    if other != k:
+                        others |= seg[line][other]
+                only = m & ~others
+                if only:
+                    result = self._eliminate(trail, rest_of_box[line][k], only)
+                    if result == _CONTRADICTION:
+                        return _CONTRADICTION
+                    removed += result
+        return removed
+
+
+    # ---------------- Các luật nâng cao ----------------
+
+    def _naked_pairs(self, trail):
+        return self._counted("naked_pairs", self._naked_subsets(trail, 2))
+
+    def _naked_triples(self, trail):
+        return self._counted("naked_triples", self._naked_subsets(trail, 3))
+
+    def _hidden_pairs(self, trail):
+        return self._counted("hidden_pairs", self._hidden_subsets(trail, 2))
+
+    def _hidden_triples(self, trail):
+        return self._counted("hidden_triples", self._hidden_subsets(trail, 3))
+
+    def _x_wing(self, trail):
+        return self._counted("x_wing", self._fish(trail, 2))
+
+    def _swordfish(self, trail):
+        return self._counted("swordfish", self._fish(trail, 3))
+
+    def _counted(self, rule, result):
+        if result != _CONTRADICTION:
+            self.stats[rule] += result
+        return result
+
+    def _naked_subsets(self, trail, k):
+        masks = self.domains.domains
+        values = self.domains.values
+        removed = 0
+        for unit in self.units:
+            empty = [idx for idx in unit if values[idx] == 0]
+            if len(empty) <= k:
+                continue
+            small = [idx for idx in empty if masks[idx].bit_count() <= k]
+            for group in combinations(small, k):
+                union = 0
+                for idx in group:
+                    union |= masks[idx]
+                if union.bit_count() != k:
+                    continue
+                # Hợp domain của cả nhóm có thể đã đổi do lần loại trước trong cùng đơn vị; vẫn đúng vì chỉ thu hẹp
+                result = self._eliminate(trail, [idx for idx in empty if idx not in group], union)
+                if result == _CONTRADICTION:
+                    return _CONTRADICTION
+                removed += result
+        return removed
+
+    def _hidden_subsets(self, trail, k):
+        masks = self.domains.domains
+        values = self.domains.values
+        removed = 0
+        for unit in self.units:
+            empty = [idx for idx in unit if values[idx] == 0]
+            if len(empty) <= k:
+                continue
+            # where[bit]: mask vị trí (theo thứ tự trong `empty`) của các ô còn nhận được giá trị bit
+            where = {}
+            for pos, idx in enumerate(empty):
+                m = masks[idx]
+                while m:
+                    low = m & -m
+                    m ^= low
+                    where[low] = where.get(low, 0) | (1 << pos)
+            options = [bit for bit, cells in where.items() if cells.bit_count() <= k]
+            for group in combinations(options, k):
+                cells = 0
+                keep = 0
+                for bit in group:
+                    cells |= where[bit]
+                    keep |= bit
+                if cells.bit_count() != k:
+                    continue
+                for pos, idx in enumerate(empty):
+                    if cells >> pos & 1:
+                        extra = masks[idx] & ~keep
+                        if extra:
+                            result = self._eliminate(trail, (idx,), extra)
+                            if result == _CONTRADICTION:
+                                return _CONTRADICTION
+                            removed += result
+        return removed
+
+    def _fish(self, trail, k):
+        masks = self.domains.domains
+        values = self.domains.values
+        n = self.n
+        removed = 0
+        for bit in (1 << v for v in range(n)):
+            for by_row in (True, False):
+                # lines[i]: mask các vị trí (cột nếu by_row) trên đường thứ i có thể nhận giá trị bit
+                lines = []
+                for line in range(n):
+                    m = 0
+                    for pos in range(n):
+                        idx = line * n + pos if by_row else pos * n + line
+                        if values[idx] == 0 and masks[idx] & bit:
+                            m |= 1 << pos
+                    lines.append(m)
+                base = [line for line in range(n) if 2 <= lines[line].bit_count() <= k]
+                for group in combinations(base, k):
+                    cover = 0
+                    for line in group:
+                        cover |= lines[line]
+                    if cover.bit_count() != k:
+                        continue
+                    targets = []
+                    for line in range(n):
+                        if line in group or not lines[line] & cover:
+                            continue
+                        for pos in range(n):
+                            if cover >> pos & 1:
+                                targets.append(line * n + pos if by_row else pos * n + line)
+                    result = self._eliminate(trail, targets, bit)
+                    if result == _CONTRADICTION:
+                        return _CONTRADICTION
+                    removed += result
+        return removed
+
+
+def make_propagator(domains: BitmaskDomains, stats: dict, propagate):
+    """
+    propagate=False/None: không lan truyền (trả về None); True: dùng mọi luật trong RULES;
+    hoặc một dãy tên luật trong ALL_RULES, VD ("naked_singles", "hidden_singles").
+    """
+    if not propagate:
+        return None
+    rules = RULES if propagate is True else propagate
+    return ConstraintPropagator(domains, stats, rules)
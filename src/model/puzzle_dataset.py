@@ -0,0 +1,258 @@
+"""
+Bộ dữ liệu đề dạng gọn (compact) và bộ đọc CSV theo từng khối (streaming).
+
+pd.read_csv cả file Kaggle (1 - 9 triệu dòng) giữ mỗi đề dưới dạng 2 chuỗi Python và đếm gợi ý bằng
+apply(lambda) từng dòng - tốn hàng chục giây và nhiều GB RAM. Ở đây:
+- stream_csv() đọc file nhị phân theo khối, tách dòng bằng NumPy (frombuffer + so sánh byte);
+  khi mọi dòng cùng độ dài (định dạng Kaggle "quizzes,solutions") cả khối được reshape thành ma trận
+  ký tự mà không tạo chuỗi Python nào. Dòng có độ dài khác nhau đi theo đường tách thông thường.
+  Ký tự được giải mã theo bảng chữ cái của SudokuConverter (puzzle_text.CHAR_VALUES: '1'..'9', 'A'.. = 10..),
+  nên file 4x4, 16x16 và 25x25 cũng đọc được; dòng có giá trị vượt quá cạnh N của đề bị bỏ qua.
+- PuzzleDataset giữ mỗi đề là một dòng uint8 (giá trị 0..N, 0 = ô trống) cho đề và lời giải, số gợi ý
+  (uint16) và mã độ khó theo kỹ thuật (int8, -1 = chưa chấm). Có thể đọc trong khi đang nạp dở.
+"""
+import os
+import threading
+from math import isqrt
+
+import numpy as np
+
+from .difficulty_grader import GRADES
+from .puzzle_text import CHAR_VALUES, PUZZLE_CELLS
+
+_NEWLINE = ord('\n')
+_COMMA = ord(',')
+# Giá trị ô -> ký tự khi chuyển về chuỗi (10.. -> 'A'.. cho đề 16x16, 25x25)
+_CHARS = np.frombuffer(b'0123456789ABCDEFGHIJKLMNOP', dtype=np.uint8)
+# Ký tự -> giá trị ô ('.', '0', '-', '_' là ô trống); 255 = ký tự không hợp lệ
+_CHAR_VALUES = np.array(CHAR_VALUES, dtype=np.uint8)
+
+QUIZ_COLUMNS = ('quizzes', 'puzzle', 'quiz')
+SOLUTION_COLUMNS = ('solutions', 'solution')
+
+
+class PuzzleDataset:
+    """
+    Kho đề gọn, chỉ nối thêm (append) - an toàn khi một luồng nạp và luồng giao diện đọc cùng lúc.
+    quizzes / solutions: ma trận (số đề, N*N) uint8; clues: số gợi ý; grades: mã độ khó (chỉ số trong GRADES).
+    """
+
+    def __init__(self, cells=81):
+        self.source = None
+        self.is_complete = False
+        self._lock = threading.Lock()
+        self._reset(cells)
+
+    def _reset(self, cells):
+        self.cells = cells
+        self._count = 0
+        self._quizzes = np.zeros((0, cells), dtype=np.uint8)
+        self._solutions = np.zeros((0, cells), dtype=np.uint8)
+        self._clues = np.zeros(0, dtype=np.uint16)
+        self._grades = np.zeros(0, dtype=np.int8)
+
+    def __len__(self):
+        return self._count
+
+    # ---------------- Nạp ----------------
+
+    def append(self, quizzes, solutions):
+        """
+        Nối thêm một khối đề (ma trận giá trị ô uint8, cùng số dòng).
+        Khi bộ dữ liệu còn rỗng, số ô mỗi đề được lấy theo khối đầu tiên (hỗ trợ file 16x16, 25x25).
+        """
+        k = len(quizzes)
+        if not k:
+            return
+        if not self._count and quizzes.shape[1] != self.cells:
+            self._reset(quizzes.shape[1])
+        if quizzes.shape[1] != self.cells or solutions.shape != quizzes.shape:
+            raise ValueError("Kích thước đề không khớp với bộ dữ liệu.")
+        with self._lock:
+            need = self._count + k
+            if need > len(self._quizzes):
+                capacity = max(need, 2 * len(self._quizzes), 1024)
+                self._quizzes = _grow(self._quizzes, capacity)
+                self._solutions = _grow(self._solutions, capacity)
+                self._clues = _grow(self._clues, capacity)
+                self._grades = _grow(self._grades, capacity, fill=-1)
+            self._quizzes[self._count:need] = quizzes
+            self._solutions[self._count:need] = solutions
+            self._clues[self._count:need] = count_clues(quizzes)
+            self._grades[self._count:need] = -1
+            self._count = need
+
+    # ---------------- Đọc ----------------
+
+    @property
+    def clues(self):
+        return self._clues[:self._count]
+
+    @property
+    def grades(self):
+        return self._grades[:self._count]
+
+    def quiz_string(self, i):
+        return _to_string(self._quizzes[i])
+
+    def solution_string(self, i):
+        return _to_string(self._solutions[i])
+
+    @property
+    def size(self):
+        return int(round(self.cells ** 0.5))
+
+    def quiz_grid(self, i):
+        return self._quizzes[i].reshape(self.size, self.size).tolist()
+
+    def solution_grid(self, i):
+        return self._solutions[i].reshape(self.size, self.size).tolist()
+
+    def rows(self, start=0, stop=None):
+        """Các đề [start, stop) dạng ma trận giá trị ô (quizzes, solutions)."""
+        stop = self._count if stop is None else min(stop, self._count)
+        return self._quizzes[start:stop], self._solutions[start:stop]
+
+    def quiz_strings(self, start=0, stop=None):
+        stop = self._count if stop is None else min(stop, self._count)
+        return [_to_string(row) for row in self._quizzes[start:stop]]
+
+    def iter_chunks(self, chunk_size, limit=None):
+        """Các lô (quizzes, solutions) dạng chuỗi - nguồn cho BatchSolver.run()."""
+        total = self._count if limit is None else min(limit, self._count)
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            yield ([_to_string(row) for row in self._quizzes[start:stop]],
+                   [_to_string(row) for row in self._solutions[start:stop]])
+
+    def indices_by_clues(self, low=None, high=None):
+        """Chỉ số các đề có low <= số gợi ý <= high."""
+        clues = self.clues
+        mask = np.ones(len(clues), dtype=bool)
+        if low is not None: mask &= clues >= low
+        if high is not None: mask &= clues <= high
+        return np.flatnonzero(mask)
+
+    def indices_by_grade(self, grade):
+        return np.flatnonzero(self.grades == GRADES.index(grade))
+
+    def set_grades(self, start, grades):
+        """Ghi mã độ khó cho các đề từ vị trí start (grades: danh sách nhãn hoặc None)."""
+        codes = np.array([GRADES.index(g) if g in GRADES else -1 for g in grades], dtype=np.int8)
+        with self._lock:
+            self._grades[start:start + len(codes)] = codes
+
+    def grade_counts(self):
+        grades = self.grades
+        return {grade: int(np.count_nonzero(grades == code)) for code, grade in enumerate(GRADES)}
+
+
+def _grow(array, capacity, fill=0):
+    shape = (capacity,) + array.shape[1:]
+    grown = np.full(shape, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _to_string(row):
+    return _CHARS[row].tobytes().decode('ascii')
+
+
+def count_clues(quizzes):
+    """Số ô khác 0 trên mỗi dòng (vector hóa, không lặp Python)."""
+    return np.count_nonzero(quizzes, axis=1).astype(np.uint16)
+
+
+def _values(chars):
+    """Ma trận ký tự ASCII -> giá trị ô uint8 (ô trống = 0, ký tự không hợp lệ = 255)."""
+    return _CHAR_VALUES[chars]
+
+
+def _valid_rows(quizzes, solutions):
+    """Dòng mà mọi ô của đề và lời giải nằm trong 0..N (N = cạnh lưới suy từ số ô mỗi dòng)."""
+    side = isqrt(quizzes.shape[1])
+    return (quizzes.max(axis=1, initial=0) <= side) & (solutions.max(axis=1, initial=0) <= side)
+
+
+def stream_csv(path, block_bytes=16 << 20):
+    """
+    Đọc CSV theo khối. Mỗi lần yield (quizzes, solutions, bytes_read, total_bytes) với quizzes / solutions là
+    ma trận giá trị ô uint8 (đề 4x4, 9x9, 16x16 hoặc 25x25 - mọi đề trong file cùng kích thước). Dòng đầu là tiêu đề, phải có cột đề (quizzes / puzzle) và lời giải (solutions / solution).
+    """
+    total_bytes = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline().decode('utf-8-sig').strip().lower()
+        columns = [name.strip().strip('"') for name in header.split(',')]
+        quiz_col = next((columns.index(c) for c in QUIZ_COLUMNS if c in columns), None)
+        sol_col = next((columns.index(c) for c in SOLUTION_COLUMNS if c in columns), None)
+        if quiz_col is None or sol_col is None:
+            raise ValueError("File thiếu cột 'quizzes' hoặc 'solutions'.")
+        fast_layout = (quiz_col, sol_col) == (0, 1) and len(columns) == 2
+
+        bytes_read = f.tell()
+        rest = b''
+        while True:
+            block = f.read(block_bytes)
+            if not block and not rest:
+                break
+            data = rest + block
+            bytes_read += len(block)
+            if block:
+                cut = data.rfind(b'\n') + 1
+                if cut == 0:
+                    rest = data
+                    continue
+                data, rest = data[:cut], data[cut:]
+            else:
+                rest = b''
+                if not data.endswith(b'\n'): data += b'\n'
+
+            parsed = _parse_fixed(data) if fast_layout else None
+            if parsed is None:
+                parsed = _parse_lines(data, quiz_col, sol_col)
+            if parsed is not None and len(parsed[0]):
+                yield parsed[0], parsed[1], bytes_read, total_bytes
+
+
+def _parse_fixed(data):
+    """Đường nhanh: mọi dòng dạng '<đề>,<lời giải>\\n' cùng độ dài. Trả về None nếu không khớp."""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(buf == _NEWLINE)
+    width = int(ends[0]) + 1
+    if len(buf) != width * len(ends) or np.any(np.diff(ends) != width):
+        return None
+    rows = buf.reshape(len(ends), width)
+    line = width - 1 - (1 if rows[0, width - 2] == ord('\r') else 0)
+    cells = (line - 1) // 2
+    if line != 2 * cells + 1 or cells not in PUZZLE_CELLS or np.any(rows[:, cells] != _COMMA):
+        return None
+    quizzes = _values(rows[:, :cells])
+    solutions = _values(rows[:, cells + 1:line])
+    if not _valid_rows(quizzes, solutions).all():
+        return None
+    return quizzes, solutions
+
+
+def _parse_lines(data, quiz_col, sol_col):
+    """Đường tổng quát: tách từng dòng (cột tùy ý, độ dài dòng khác nhau); bỏ qua dòng lỗi."""
+    quizzes, solutions = [], []
+    width = None
+    for line in data.split(b'\n'):
+        parts = line.strip().split(b',')
+        if len(parts) <= max(quiz_col, sol_col):
+            continue
+        quiz, solution = parts[quiz_col].strip(b'"'), parts[sol_col].strip(b'"')
+        if width is None:
+            if len(quiz) not in PUZZLE_CELLS:
+                continue
+            width = len(quiz)
+        if len(quiz) != width or len(solution) != width:
+            continue
+        quizzes.append(quiz)
+        solutions.append(solution)
+    if not quizzes:
+        return None
+    q = _values(np.frombuffer(b''.join(quizzes), dtype=np.uint8).reshape(len(quizzes), width))
+    s = _values(np.frombuffer(b''.join(solutions), dtype=np.uint8).reshape(len(solutions), width))
+    valid = _valid_rows(q, s)
+    return q[valid], s[valid]
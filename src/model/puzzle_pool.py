@@ -0,0 +1,235 @@
+"""
+Kho đề sinh sẵn (prefetch pool) cho từng cặp (kích thước, độ khó).
+
+Sinh đề 16x16 / 25x25 mất vài giây nên không thể gọi đồng bộ trên luồng giao diện.
+PuzzlePool giữ sẵn tối đa `capacity` đề cho mỗi cặp (size, difficulty):
+- take(): lấy ngay một đề có sẵn (None nếu kho rỗng).
+- Khi số đề sẵn + đang sinh tụt dưới `low_water`, các tiến trình nền (ProcessPoolExecutor)
+  được giao sinh bù cho tới khi đầy `capacity`.
+- Kho được ghi ra file JSON sau mỗi thay đổi nên giữ được qua các lần mở ứng dụng.
+- stats(): độ sâu kho, số đề đang sinh, tổng số đề đã sinh và tốc độ sinh (đề/giây) để theo dõi,
+  cùng số lần sinh lỗi và lỗi gần nhất; cặp nào lỗi MAX_FAILURES lần liên tiếp thì ngừng sinh bù.
+"""
+import os
+import json
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .sudoku_generator import SudokuGenerator, DIFFICULTIES
+
+# 2: đề được xếp theo độ khó thực đạt được (kho cũ có thể ghi nhãn Rất khó cho đề chỉ đạt mức Khó)
+_FILE_VERSION = 2
+
+# Số lần sinh lỗi liên tiếp của một cặp (size, difficulty) trước khi ngừng sinh bù cặp đó
+MAX_FAILURES = 3
+
+
+def _lower_priority():
+    """Khởi tạo tiến trình con: hạ độ ưu tiên để không tranh CPU với giao diện."""
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+
+def _generate_one(size, difficulty, mode):
+    """Chạy trong tiến trình con: sinh một đề, trả về (puzzle, solution, độ khó thực đạt được, thời gian sinh)."""
+    start = time.perf_counter()
+    generator = SudokuGenerator(size, mode=mode)
+    puzzle, solution = generator.generate_puzzle(difficulty)
+    return puzzle, solution, generator.last_stats["difficulty"], time.perf_counter() - start
+
+
+def _key_name(size, difficulty):
+    return f"{size}:{difficulty}"
+
+
+class PuzzlePool:
+    def __init__(self, path=None, capacity=6, low_water=2, workers=2, mode='solver'):
+        """
+        path: file JSON lưu kho (None = chỉ giữ trong bộ nhớ).
+        capacity: số đề tối đa cho mỗi (size, difficulty); low_water: ngưỡng bắt đầu sinh bù.
+        workers: số tiến trình nền; mode: chế độ sinh lời giải của SudokuGenerator.
+        """
+        if not 0 <= low_water <= capacity:
+            raise ValueError("Cần 0 <= low_water <= capacity")
+        self.path = path
+        self.capacity = capacity
+        self.low_water = low_water
+        self.workers = workers
+        self.mode = mode
+
+        self._lock = threading.Lock()
+        self._ready = {}       # (size, difficulty) -> [(puzzle, solution), ...]
+        self._pending = {}     # (size, difficulty) -> số đề đang sinh
+        self._generated = 0    # tổng số đề tiến trình nền đã sinh
+        self._gen_time = 0.0   # tổng thời gian sinh (tính trong tiến trình con)
+        self._first_submit = None
+        self._failures = {}    # (size, difficulty) -> số lần sinh lỗi liên tiếp
+        self._failed = 0       # tổng số lần sinh lỗi
+        self._errors = 0       # tổng số lỗi (sinh đề + đọc / ghi file kho)
+        self._last_error = None
+        self._executor = None
+        self._closed = False
+        # Ghi file từ luồng giao diện và luồng callback của executor: cả lần ghi nằm trong khóa này
+        # để bản chụp cũ không thể đè bản mới hơn
+        self._save_lock = threading.Lock()
+        self.load()
+
+    # ---------------- Lấy đề ----------------
+
+    def take(self, size, difficulty):
+        """Lấy một đề (puzzle, solution) có sẵn, hoặc None nếu kho của cặp này đang rỗng."""
+        key = (size, difficulty)
+        with self._lock:
+            ready = self._ready.get(key)
+            item = ready.pop(0) if ready else None
+        if item is not None:
+            self.save()
+        self.refill(size, difficulty)
+        return item
+
+    def depth(self, size, difficulty):
+        with self._lock:
+            return len(self._ready.get((size, difficulty), ()))
+
+    # ---------------- Sinh bù ----------------
+
+    def refill(self, size, difficulty, force=False):
+        """
+        Nếu số đề sẵn + đang sinh < low_water (hoặc force=True) thì giao sinh bù tới capacity.
+        Trả về số đề vừa giao cho tiến trình nền.
+        """
+        key = (size, difficulty)
+        with self._lock:
+            if self._closed or self._failures.get(key, 0) >= MAX_FAILURES:
+                return 0
+            have = len(self._ready.get(key, ())) + self._pending.get(key, 0)
+            if have >= self.capacity or (have >= self.low_water and not force):
+                return 0
+            missing = self.capacity - have
+            self._pending[key] = self._pending.get(key, 0) + missing
+            if self._first_submit is None:
+                self._first_submit = time.perf_counter()
+            executor = self._get_executor()
+
+        for _ in range(missing):
+            future = executor.submit(_generate_one, size, difficulty, self.mode)
+            future.add_done_callback(lambda f, key=key: self._on_done(key, f))
+        return missing
+
+    def warm(self, size, difficulties=DIFFICULTIES):
+        """Nạp đầy kho cho mọi độ khó của một kích thước (gọi khi người dùng chọn kích thước)."""
+        return sum(self.refill(size, difficulty, force=True) for difficulty in difficulties)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_lower_priority)
+        return self._executor
+
+    def _on_done(self, key, future):
+        # Chạy trên luồng quản lý của executor, không phải luồng giao diện
+        with self._lock:
+            self._pending[key] = max(0, self._pending.get(key, 0) - 1)
+            if future.cancelled():
+                return
+        error = future.exception()
+        if error is not None:
+            with self._lock:
+                self._failures[key] = self._failures.get(key, 0) + 1
+                self._failed += 1
+            self._set_error(f"Sinh đề {_key_name(*key)}: {error}")
+            return
+        puzzle, solution, reached, elapsed = future.result()
+        with self._lock:
+            self._failures.pop(key, None)
+            # Đề không đạt độ khó yêu cầu (hết thời gian đục lỗ) được xếp vào kho của mức thực đạt được
+            ready = self._ready.setdefault((key[0], reached), [])
+            if len(ready) < self.capacity:
+                ready.append((puzzle, solution))
+            self._generated += 1
+            self._gen_time += elapsed
+        self.save()
+
+    # ---------------- Theo dõi ----------------
+
+    def _set_error(self, message):
+        with self._lock:
+            self._errors += 1
+            self._last_error = message
+
+    def stats(self):
+        """
+        Trả về dict:
+        - depth / pending: {"size:difficulty": số đề sẵn / đang sinh}
+        - generated: tổng số đề đã sinh ở nền; avg_gen_sec: thời gian sinh trung bình mỗi đề
+        - fill_rate: số đề sinh được mỗi giây (tính từ lần giao việc đầu tiên)
+        - failures: tổng số lần sinh lỗi; stopped: các cặp đã ngừng sinh bù vì lỗi liên tiếp
+        - errors / last_error: tổng số lỗi và lỗi gần nhất (sinh đề / đọc / ghi file kho), None nếu chưa có
+        """
+        with self._lock:
+            depth = {_key_name(*key): len(items) for key, items in self._ready.items()}
+            pending = {_key_name(*key): count for key, count in self._pending.items() if count}
+            elapsed = time.perf_counter() - self._first_submit if self._first_submit else 0.0
+            return {
+                "depth": depth,
+                "pending": pending,
+                "generated": self._generated,
+                "avg_gen_sec": self._gen_time / self._generated if self._generated else 0.0,
+                "fill_rate": self._generated / elapsed if elapsed else 0.0,
+                "failures": self._failed,
+                "stopped": [_key_name(*key) for key, count in self._failures.items() if count >= MAX_FAILURES],
+                "errors": self._errors,
+                "last_error": self._last_error,
+            }
+
+    # ---------------- Lưu / nạp ----------------
+
+    def save(self):
+        """Ghi kho ra file (ghi file tạm rồi đổi tên để không hỏng file khi đang ghi dở)."""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                data = {
+                    "version": _FILE_VERSION,
+                    "puzzles": {_key_name(*key): [[p, s] for p, s in items] for key, items in self._ready.items()},
+                }
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                self._set_error(f"Lưu kho đề: {e}")
+
+    def load(self):
+        """Nạp kho từ file (bỏ qua nếu file chưa có hoặc hỏng)."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _FILE_VERSION:
+                return
+            ready = {}
+            for name, items in data.get("puzzles", {}).items():
+                size, difficulty = name.split(":", 1)
+                ready[(int(size), difficulty)] = [(p, s) for p, s in items][:self.capacity]
+        except (OSError, ValueError) as e:
+            self._set_error(f"Nạp kho đề: {e}")
+            return
+        with self._lock:
+            self._ready = ready
+
+    def shutdown(self):
+        """Lưu kho và dừng các tiến trình nền (hủy các việc chưa bắt đầu)."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        self.save()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
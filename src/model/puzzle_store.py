@@ -0,0 +1,368 @@
+"""
+Kho đề nhị phân (.sdkb) đọc qua mmap - truy cập ngẫu nhiên O(1), không sao chép.
+
+Cấu trúc file (little-endian):
+- Header 32 byte: magic b"SDKB", version, N, số bit mỗi ô, cờ (có lời giải), số đề,
+  số byte mỗi bản ghi, vị trí bảng metadata.
+- Các bản ghi cỡ cố định: đề đã nén (+ lời giải đã nén nếu có). 4 bit mỗi ô khi N <= 15
+  (đề 9x9: 41 byte), 8 bit mỗi ô cho 16x16 / 25x25.
+- Bảng metadata cuối file, mỗi đề 4 byte: số gợi ý (uint16), mã độ khó (int8, -1 = chưa chấm), dự phòng.
+
+PuzzleStore có cùng giao diện đọc với PuzzleDataset nên Controller / BatchSolver / bộ chấm độ khó
+dùng được cả hai. Đề 9x9 chiếm 86 byte (có lời giải) so với ~200 byte khi giữ dạng chuỗi Python.
+Chuyển đổi: convert_to_store() (CSV / TXT) hoặc save_store() (từ một PuzzleDataset đã nạp).
+"""
+import os
+import sys
+import mmap
+import struct
+
+import numpy as np
+
+from .difficulty_grader import GRADES
+from .puzzle_dataset import count_clues, stream_csv, _to_string
+from .puzzle_text import CHAR_VALUES, iter_puzzles
+
+STORE_EXT = ".sdkb"
+MAGIC = b"SDKB"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHBBB3xQIQ")   # magic, version, N, bits, flags, count, record_bytes, meta_offset
+_FLAG_SOLUTIONS = 1
+META_DTYPE = np.dtype([("clues", "<u2"), ("grade", "i1"), ("reserved", "u1")])
+
+# Ký tự -> giá trị ô khi đọc TXT ('.', '0', '-', '_' là ô trống; 'A'.. = 10..); 255 = ký tự không hợp lệ
+_CHAR_VALUES = np.array(CHAR_VALUES, dtype=np.uint8)
+
+
+def bits_per_cell(n):
+    return 4 if n <= 15 else 8
+
+
+def packed_bytes(cells, bits):
+    return (cells + 1) // 2 if bits == 4 else cells
+
+
+def pack_cells(matrix, bits):
+    """Nén ma trận (số đề, N*N) uint8 thành (số đề, packed_bytes) - 2 ô / byte khi bits = 4."""
+    matrix = np.asarray(matrix, dtype=np.uint8)
+    if bits == 8:
+        return matrix
+    if matrix.shape[1] % 2:
+        matrix = np.pad(matrix, ((0, 0), (0, 1)))
+    return (matrix[:, 0::2] << 4) | matrix[:, 1::2]
+
+
+def unpack_cells(packed, bits, cells):
+    """Ngược lại pack_cells; nhận một bản ghi (1 chiều) hoặc nhiều bản ghi (2 chiều)."""
+    if bits == 8:
+        return np.array(packed[..., :cells])
+    out = np.empty(packed.shape[:-1] + (packed.shape[-1] * 2,), dtype=np.uint8)
+    out[..., 0::2] = packed >> 4
+    out[..., 1::2] = packed & 0x0F
+    return out[..., :cells]
+
+
+def store_path_for(path):
+    """File kho đi kèm một file dữ liệu: data/sudoku.csv -> data/sudoku.sdkb."""
+    return os.path.splitext(path)[0] + STORE_EXT
+
+
+def is_store_fresh(store_path, source_path):
+    """Kho đã có và mới hơn file nguồn (file nguồn chưa bị sửa từ lần chuyển đổi trước)."""
+    try:
+        return os.path.getmtime(store_path) >= os.path.getmtime(source_path)
+    except OSError:
+        return False
+
+
+class StoreWriter:
+    """
+    Ghi kho theo từng khối (không cần biết trước số đề): bản ghi được ghi nối tiếp, bảng metadata
+    và header hoàn chỉnh được ghi khi close(). Ghi ra file tạm rồi đổi tên nên không để lại file hỏng.
+    """
+
+    def __init__(self, path, size, has_solutions=True):
+        self.path = path
+        self.size = size
+        self.cells = size * size
+        self.bits = bits_per_cell(size)
+        self.has_solutions = has_solutions
+        self.record_bytes = packed_bytes(self.cells, self.bits) * (2 if has_solutions else 1)
+        self.count = 0
+        self._meta = []
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(b"\0" * _HEADER.size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def append(self, quizzes, solutions=None, grades=None):
+        """Ghi thêm một khối đề (ma trận chữ số uint8, mỗi dòng N*N ô); grades: mã độ khó (mặc định -1)."""
+        quizzes = np.asarray(quizzes, dtype=np.uint8)
+        k = len(quizzes)
+        if not k:
+            return
+        if quizzes.shape[1] != self.cells or quizzes.max(initial=0) > self.size:
+            raise ValueError("Kích thước đề không khớp với kho.")
+        records = pack_cells(quizzes, self.bits)
+        if self.has_solutions:
+            solutions = np.zeros_like(quizzes) if solutions is None else np.asarray(solutions, dtype=np.uint8)
+            if solutions.shape != quizzes.shape or solutions.max(initial=0) > self.size:
+                raise ValueError("Lời giải không khớp với đề.")
+            records = np.hstack([records, pack_cells(solutions, self.bits)])
+        self._file.write(np.ascontiguousarray(records).tobytes())
+
+        meta = np.zeros(k, dtype=META_DTYPE)
+        meta["clues"] = count_clues(quizzes)
+        meta["grade"] = -1 if grades is None else grades
+        self._meta.append(meta)
+        self.count += k
+
+    def close(self):
+        meta_offset = _HEADER.size + self.count * self.record_bytes
+        for meta in self._meta:
+            self._file.write(meta.tobytes())
+        flags = _FLAG_SOLUTIONS if self.has_solutions else 0
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.size, self.bits, flags,
+                                      self.count, self.record_bytes, meta_offset))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+class PuzzleStore:
+    """
+    Đọc kho .sdkb qua mmap. Bản ghi và metadata là các view NumPy trên vùng nhớ ánh xạ (không sao chép);
+    chỉ cột độ khó được chép ra bộ nhớ (1 byte / đề) để có thể chấm lại rồi ghi về file bằng save_grades().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.source = os.path.basename(path)
+        self.is_complete = True
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, size, bits, flags, count, record_bytes, meta_offset = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("File không phải kho đề .sdkb hợp lệ.")
+            if len(self._mm) < meta_offset + count * META_DTYPE.itemsize:
+                raise ValueError("File kho đề bị cắt cụt.")
+        except Exception:
+            self.close()
+            raise
+
+        self.cells = size * size
+        self.bits = bits
+        self.has_solutions = bool(flags & _FLAG_SOLUTIONS)
+        self._count = count
+        self._packed = packed_bytes(self.cells, bits)
+        self._meta_offset = meta_offset
+        self._records = np.frombuffer(self._mm, np.uint8, count * record_bytes, _HEADER.size).reshape(count, record_bytes)
+        self._meta = np.frombuffer(self._mm, META_DTYPE, count, meta_offset)
+        self._grades = self._meta["grade"].copy()
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._records = self._meta = None
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass   # Còn view NumPy đang dùng vùng nhớ -> Để bộ thu gom rác đóng sau
+        self._file.close()
+
+    # ---------------- Đọc ----------------
+
+    @property
+    def size(self):
+        return int(round(self.cells ** 0.5))
+
+    @property
+    def clues(self):
+        return self._meta["clues"]
+
+    @property
+    def grades(self):
+        return self._grades
+
+    def rows(self, start=0, stop=None):
+        """Giải nén các đề [start, stop) thành (quizzes, solutions) dạng ma trận chữ số (solutions None nếu kho không có)."""
+        records = self._records[start:stop]
+        quizzes = unpack_cells(records[:, :self._packed], self.bits, self.cells)
+        solutions = unpack_cells(records[:, self._packed:], self.bits, self.cells) if self.has_solutions else None
+        return quizzes, solutions
+
+    def _quiz(self, i):
+        return unpack_cells(self._records[i, :self._packed], self.bits, self.cells)
+
+    def _solution(self, i):
+        if not self.has_solutions:
+            return None
+        return unpack_cells(self._records[i, self._packed:], self.bits, self.cells)
+
+    def quiz_string(self, i):
+        return _to_string(self._quiz(i))
+
+    def solution_string(self, i):
+        solution = self._solution(i)
+        return _to_string(solution) if solution is not None else ""
+
+    def quiz_grid(self, i):
+        return self._quiz(i).reshape(self.size, self.size).tolist()
+
+    def solution_grid(self, i):
+        solution = self._solution(i)
+        if solution is None or not solution.any():
+            return None
+        return solution.reshape(self.size, self.size).tolist()
+
+    def quiz_strings(self, start=0, stop=None):
+        quizzes, _ = self.rows(start, stop)
+        return [_to_string(row) for row in quizzes]
+
+    def iter_chunks(self, chunk_size, limit=None):
+        """Các lô (quizzes, solutions) dạng chuỗi - nguồn cho BatchSolver.run()."""
+        total = self._count if limit is None else min(limit, self._count)
+        for start in range(0, total, chunk_size):
+            quizzes, solutions = self.rows(start, min(start + chunk_size, total))
+            yield ([_to_string(row) for row in quizzes],
+                   [_to_string(row) for row in solutions] if solutions is not None else [""] * len(quizzes))
+
+    def indices_by_clues(self, low=None, high=None):
+        """Chỉ số các đề có low <= số gợi ý <= high."""
+        clues = self.clues
+        mask = np.ones(len(clues), dtype=bool)
+        if low is not None: mask &= clues >= low
+        if high is not None: mask &= clues <= high
+        return np.flatnonzero(mask)
+
+    def indices_by_grade(self, grade):
+        return np.flatnonzero(self._grades == GRADES.index(grade))
+
+    def grade_counts(self):
+        return {grade: int(np.count_nonzero(self._grades == code)) for code, grade in enumerate(GRADES)}
+
+    # ---------------- Độ khó ----------------
+
+    def set_grades(self, start, grades):
+        """Ghi mã độ khó (trong bộ nhớ) cho các đề từ vị trí start; gọi save_grades() để lưu vào file."""
+        codes = np.array([GRADES.index(g) if g in GRADES else -1 for g in grades], dtype=np.int8)
+        self._grades[start:start + len(codes)] = codes
+
+    def save_grades(self):
+        """Ghi cột độ khó về bảng metadata của file (các view mmap thấy ngay giá trị mới)."""
+        meta = self._meta.copy()
+        meta["grade"] = self._grades
+        with open(self.path, "r+b") as f:
+            f.seek(self._meta_offset)
+            f.write(meta.tobytes())
+
+
+# ---------------- Chuyển đổi ----------------
+
+def save_store(dataset, path, chunk_size=100_000):
+    """Ghi một bộ dữ liệu đã nạp (PuzzleDataset / PuzzleStore) ra kho .sdkb. Trả về số đề đã ghi."""
+    total = len(dataset)
+    with StoreWriter(path, dataset.size, has_solutions=getattr(dataset, "has_solutions", True)) as writer:
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            quizzes, solutions = dataset.rows(start, stop)
+            writer.append(quizzes, solutions, dataset.grades[start:stop])
+    return total
+
+
+def convert_to_store(src_path, dst_path=None, progress=None):
+    """
+    Chuyển file CSV (quizzes,solutions) hoặc TXT sang kho .sdkb (mặc định cạnh file nguồn).
+    progress(bytes_read, total_bytes): gọi sau mỗi khối. Trả về (đường dẫn kho, số đề).
+    """
+    dst_path = dst_path or store_path_for(src_path)
+    blocks = stream_csv(src_path) if src_path.lower().endswith(".csv") else stream_txt(src_path)
+    writer = None
+    try:
+        for quizzes, solutions, done, total in blocks:
+            if writer is None:
+                n = int(round(quizzes.shape[1] ** 0.5))
+                writer = StoreWriter(dst_path, n, has_solutions=solutions is not None)
+            writer.append(quizzes, solutions)
+            if progress: progress(done, total)
+        if writer is None:
+            raise ValueError("File không có đề hợp lệ.")
+    except Exception:
+        if writer is not None: writer.abort()
+        raise
+    writer.close()
+    return dst_path, writer.count
+
+
+def stream_txt(path, block_lines=50_000):
+    """
+    Đọc file TXT theo khối block_lines dòng (không nạp cả file), yield (quizzes, solutions | None, bytes_read, total_bytes).
+    Bố cục (mỗi dòng một đề, hoặc một đề dạng lưới N dòng) do puzzle_text.iter_puzzles nhận ra theo độ rộng dòng.
+    Dòng có số ô khác dòng đầu tiên hoặc có ký tự không hợp lệ bị bỏ qua.
+    """
+    total_bytes = os.path.getsize(path)
+    with open(path, "rb") as f:
+        records = iter_puzzles(f)
+        first = next(records, None)
+        if first is None:
+            return
+        cells = len(first[0])
+        n = int(round(cells ** 0.5))
+        if n * n != cells:
+            raise ValueError("Dòng đầu tiên không phải một đề N*N ô.")
+        has_solutions = first[1] is not None
+
+        block = [first]
+        for record in records:
+            block.append(record)
+            if len(block) >= block_lines:
+                quizzes, solutions = _txt_block(block, cells, n, has_solutions)
+                if len(quizzes): yield quizzes, solutions, f.tell(), total_bytes
+                block = []
+        quizzes, solutions = _txt_block(block, cells, n, has_solutions)
+        if len(quizzes): yield quizzes, solutions, total_bytes, total_bytes
+
+
+def _txt_block(block, cells, n, has_solutions):
+    block = [(q, s) for q, s in block if len(q) == cells and (s is None or len(s) == cells)]
+    if not block:
+        return (), None
+    quizzes = _values(b"".join(q for q, _ in block)).reshape(len(block), cells)
+    solutions = None
+    if has_solutions:
+        solutions = _values(b"".join(s or b"0" * cells for _, s in block)).reshape(len(block), cells)
+    valid = quizzes.max(axis=1) <= n
+    if solutions is not None: valid &= solutions.max(axis=1) <= n
+    return quizzes[valid], solutions[valid] if solutions is not None else None
+
+
+def _values(chars):
+    return _CHAR_VALUES[np.frombuffer(chars, dtype=np.uint8)]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Cách dùng: python -m src.model.puzzle_store <file.csv|file.txt> [file.sdkb]")
+        sys.exit(1)
+    out_path, written = convert_to_store(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Đã ghi {written:,} đề vào {out_path} ({os.path.getsize(out_path) / max(written, 1):.1f} byte/đề)")
@@ -0,0 +1,100 @@
+"""
+Đọc đề từ file văn bản - dùng chung cho kho .sdkb (puzzle_store.stream_txt) và dòng lệnh (src/cli.py).
+
+Hai bố cục được hỗ trợ:
+- Mỗi dòng một đề N*N ký tự ('0' / '.' / '-' / '_' là ô trống, 'A'.. = 10.. với đề 16x16, 25x25),
+  có thể kèm lời giải sau dấu phẩy hoặc dấu cách; dòng tiêu đề CSV (quizzes,solutions / puzzle,solution)
+  được nhận ra và dùng để chọn cột.
+- Một lưới N dòng, mỗi dòng N ô (cách nhau bởi dấu cách / dấu phẩy hoặc viết liền) - file .txt của ứng dụng.
+
+Bố cục được quyết định theo độ rộng dòng chứ không theo số dòng: một dòng N*N ô là một đề; chỉ coi file là
+một lưới khi file có đúng N dòng, mỗi dòng N ô. Độ rộng 16 vừa là một đề 4x4 vừa là một hàng 16x16:
+dòng chỉ có giá trị <= 4 là đề 4x4. Dòng trống và dòng bắt đầu bằng '#' được bỏ qua.
+File được đọc từng dòng; chỉ tối đa MAX_SIZE + 1 dòng đầu được đọc trước để nhận ra bố cục.
+"""
+from itertools import chain, islice
+from math import isqrt
+
+# Kích thước lưới được hỗ trợ (N) và độ dài một đề trên một dòng (N*N)
+SIZES = (4, 9, 16, 25)
+PUZZLE_CELLS = tuple(n * n for n in SIZES)
+MAX_SIZE = max(SIZES)
+
+_SEPARATORS = b" \t,;"
+_BOM = b"\xef\xbb\xbf"
+
+# Ký tự -> giá trị ô (cùng bảng chữ cái với SudokuConverter); 255 = ký tự không hợp lệ
+CHAR_VALUES = [255] * 256
+for _ch in b".0-_":
+    CHAR_VALUES[_ch] = 0
+for _v in range(1, 10):
+    CHAR_VALUES[ord(str(_v))] = _v
+for _v in range(10, 36):
+    CHAR_VALUES[ord("A") + _v - 10] = CHAR_VALUES[ord("a") + _v - 10] = _v
+
+
+def iter_puzzles(lines):
+    """
+    lines: các dòng dạng bytes (file mở ở chế độ 'rb', sys.stdin.buffer...).
+    Yield (đề, lời giải | None) dạng bytes, mỗi ô một ký tự. Người dùng tự kiểm tra độ dài / ký tự.
+    """
+    data = _data_lines(lines)
+    head = list(islice(data, MAX_SIZE + 1))
+    if not head:
+        return
+
+    quiz_col, sol_col = 0, 1
+    columns = _header_columns(head[0])
+    if columns is not None:
+        quiz_col, sol_col = columns
+        head = head[1:]
+    elif _is_grid(head):
+        yield b"".join(_row_cells(line) for line in head), None
+        return
+
+    for line in chain(head, data):
+        tokens = [t.strip(b'"') for t in (line.split(b",") if b"," in line else line.split())]
+        if quiz_col >= len(tokens) or not tokens[quiz_col]:
+            continue
+        solution = tokens[sol_col] if sol_col is not None and sol_col < len(tokens) and tokens[sol_col] else None
+        yield tokens[quiz_col], solution
+
+
+def _data_lines(lines):
+    first = True
+    for line in lines:
+        if first:
+            line, first = line.lstrip(_BOM), False
+        line = line.strip()
+        if line and not line.startswith(b"#"):
+            yield line
+
+
+def _header_columns(line):
+    """(cột đề, cột lời giải | None) nếu `line` là dòng tiêu đề CSV."""
+    lowered = line.lower()
+    if b"quiz" not in lowered and b"puzzle" not in lowered:
+        return None
+    names = [c.strip().strip(b'"') for c in lowered.split(b",")]
+    quiz_col = next((i for i, c in enumerate(names) if c in (b"quizzes", b"quiz", b"puzzle", b"puzzles")), 0)
+    sol_col = next((i for i, c in enumerate(names) if c in (b"solutions", b"solution")), None)
+    return quiz_col, sol_col
+
+
+def _row_cells(line):
+    return line.translate(None, _SEPARATORS)
+
+
+def _is_grid(head):
+    """Các dòng đầu file là toàn bộ một lưới N x N (file có đúng N dòng, mỗi dòng N ô)."""
+    n = len(_row_cells(head[0]))
+    if n not in SIZES or len(head) != n:
+        return False
+    rows = [_row_cells(line) for line in head]
+    if any(len(row) != n for row in rows):
+        return False
+    if n in PUZZLE_CELLS:
+        # Độ rộng này cũng là một đề trên một dòng: chỉ là lưới khi có giá trị vượt quá cạnh của đề đó
+        side = isqrt(n)
+        return any(CHAR_VALUES[ch] > side for row in rows for ch in row)
+    return True
@@ -0,0 +1,137 @@
+"""
+Giới hạn cho một lần tìm kiếm: số nút tối đa, thời gian chạy tối đa và token hủy.
+
+Backtracking trên đề 16x16 / 25x25 thưa có thể chạy hàng giờ. Mọi hàm giải (algorithms.py,
+algorithms_mrv.py, solver_dlx*.py) nhận `budget=SearchBudget(...)`; khi chạm giới hạn, engine dừng,
+hàm giải trả về None (khác False = đã chứng minh vô nghiệm) và ghi lý do vào
+stats["budget_exceeded"] ("nodes" / "timeout" / "cancelled") cùng các số liệu đã đếm được đến lúc đó.
+
+Engine chỉ hỏi budget khi số nút chạm mốc kiểm tra kế tiếp (mốc giới hạn nút, hoặc sau một khoảng nút
+để xem đồng hồ / token), nên không có budget thì chỉ tốn một phép so sánh số nguyên mỗi nút.
+Khoảng nút giữa hai lần xem đồng hồ tự điều chỉnh để mỗi lần cách nhau khoảng CHECK_PERIOD giây:
+một nút Backtracking tốn ~1 µs, một nút FC + MRV + AC trên 25x25 có thể tốn vài ms.
+Cũng tại các mốc đó, budget có `progress` gửi mẫu tiến độ (số nút, nút/giây, độ sâu, số bước lùi)
+tối đa mỗi `progress_interval` giây - dùng để báo tiến độ khi giải ở luồng nền (solve_jobs.py).
+"""
+import threading
+import time
+
+# Chưa có giới hạn nào -> Mốc kiểm tra không bao giờ tới
+NO_LIMIT = float("inf")
+# Khoảng thời gian mong muốn giữa hai lần xem đồng hồ / token hủy (giây) và giới hạn số nút giữa hai lần
+CHECK_PERIOD = 0.01
+MIN_INTERVAL = 1
+MAX_INTERVAL = 4096
+
+REASON_NODES = "nodes"
+REASON_TIMEOUT = "timeout"
+REASON_CANCELLED = "cancelled"
+
+REASON_LABELS = {
+    REASON_NODES: "Vượt giới hạn số nút",
+    REASON_TIMEOUT: "Quá thời gian",
+    REASON_CANCELLED: "Đã hủy",
+}
+
+
+class CancelToken:
+    """Token hủy dùng chung giữa luồng giao diện và luồng giải (an toàn luồng)."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class SearchBudget:
+    """
+    max_nodes: số nút được phép duyệt (None = không giới hạn).
+    timeout: số giây được phép chạy, tính từ lúc tạo budget (None = không giới hạn) - nên tạo ngay trước khi giải
+    để thời gian khởi tạo domain / tiền xử lý cũng được tính.
+    cancel_token: đối tượng có is_set() - CancelToken, threading.Event hoặc multiprocessing.Event.
+    progress: hàm nhận dict {"nodes", "nodes_per_sec", "depth", "backtracks", "elapsed_sec"},
+    gọi từ luồng đang giải (None = không báo tiến độ).
+    Một budget dùng cho một lần giải; reason cho biết giới hạn nào đã chạm (None nếu chưa).
+    """
+
+    def __init__(self, max_nodes=None, timeout=None, cancel_token=None, progress=None, progress_interval=0.25):
+        self.max_nodes = max_nodes
+        self.timeout = timeout
+        self.cancel_token = cancel_token
+        self.reason = None
+        self._node_limit = NO_LIMIT
+        self._started = time.perf_counter()
+        self._deadline = self._started + timeout if timeout is not None else None
+        self._watch = timeout is not None or cancel_token is not None or progress is not None
+        self._interval = 16
+        self._last_check = None
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self._first_node = 0
+        self._last_sample = (self._started, 0)
+
+    def begin(self, nodes):
+        """Gọi khi engine bắt đầu, `nodes` là giá trị bộ đếm nút hiện tại. Trả về mốc kiểm tra đầu tiên."""
+        self._first_node = nodes
+        if self.max_nodes is not None:
+            self._node_limit = nodes + self.max_nodes + 1
+        # Có đồng hồ / token -> kiểm tra ngay ở nút đầu tiên (token có thể đã bị hủy trước khi chạy)
+        return nodes + 1 if self._watch else self._node_limit
+
+    def check(self, nodes, depth=None, backtracks=None):
+        """
+        Trả về mốc kiểm tra kế tiếp, hoặc None nếu đã chạm giới hạn (lý do ghi ở self.reason).
+        depth / backtracks: độ sâu ngăn xếp và số bước lùi hiện tại của engine (chỉ dùng cho mẫu tiến độ).
+        """
+        if nodes >= self._node_limit:
+            self.reason = REASON_NODES
+            return None
+        if self.cancel_token is not None and self.cancel_token.is_set():
+            self.reason = REASON_CANCELLED
+            return None
+        if not self._watch:
+            return self._node_limit
+        now = time.perf_counter()
+        if self._deadline is not None and now >= self._deadline:
+            self.reason = REASON_TIMEOUT
+            return None
+        # Điều chỉnh khoảng nút theo thời gian thực tế của khoảng vừa rồi
+        if self._last_check is not None:
+            elapsed = now - self._last_check
+            if elapsed < CHECK_PERIOD / 2:
+                self._interval = min(self._interval * 2, MAX_INTERVAL)
+            elif elapsed > CHECK_PERIOD:
+                self._interval = max(self._interval // 2, MIN_INTERVAL)
+        self._last_check = now
+        if self.progress is not None and now - self._last_sample[0] >= self.progress_interval:
+            self._report(now, nodes - self._first_node, depth, backtracks)
+        return min(nodes + self._interval, self._node_limit)
+
+    def _report(self, now, nodes, depth, backtracks):
+        last_time, last_nodes = self._last_sample
+        self._last_sample = (now, nodes)
+        self.progress({
+            "nodes": nodes,
+            "nodes_per_sec": (nodes - last_nodes) / (now - last_time) if now > last_time else 0.0,
+            "depth": depth,
+            "backtracks": backtracks,
+            "elapsed_sec": now - self._started,
+        })
+
+    def exceeded(self, stats: dict):
+        """Ghi lý do dừng vào stats (engine gọi khi check() trả về None)."""
+        stats["budget_exceeded"] = self.reason
+
+
+def budget_label(stats: dict):
+    """Mô tả ngắn lý do dừng để hiển thị (None nếu thuật toán chạy hết)."""
+    reason = stats.get("budget_exceeded")
+    return REASON_LABELS.get(reason, reason) if reason else None
@@ -0,0 +1,58 @@
+"""
+Bộ nhận sự kiện (sink) cho các engine tìm kiếm (algorithms.py, algorithms_mrv.py).
+
+Mỗi thuật toán chỉ có MỘT engine; cách engine được quan sát do sink truyền vào quyết định:
+- sink=None        : chạy một mạch, chỉ ghi stats["backtracks"] lúc kết thúc (giải nhanh, hàng loạt).
+- CountingSink()   : ghi thêm stats["nodes_visited"] / stats["prunes_made"] (thay cho các module profiler_* cũ).
+- EventSink()      : engine yield một sự kiện ở mỗi bước để người gọi lặp qua (Visualizer);
+                     stats được cập nhật ngay trước mỗi sự kiện nên giao diện hiện số liệu trực tiếp.
+- QueueSink(queue) : như EventSink nhưng run_search() tự chạy engine (thường trên luồng nền)
+                     và đẩy từng sự kiện vào hàng đợi.
+
+Engine luôn đếm bằng biến cục bộ và chỉ ghi vào stats khi kết thúc (hoặc trước mỗi sự kiện
+ở chế độ phát sự kiện), nên chạy không có sink không tốn thêm thao tác nào trên dict trong vòng lặp.
+"""
+
+
+class SearchSink:
+    """Sink gốc: không đếm, không phát sự kiện."""
+    counting = False   # Ghi nodes_visited / prunes_made vào stats
+    emit = False       # Engine yield sự kiện ở mỗi bước
+
+    def event(self, event):
+        """Nhận một sự kiện khi engine được chạy qua run_search(search, sink)."""
+
+
+class CountingSink(SearchSink):
+    """Đo hiệu năng: đếm số nút đã duyệt và số lần cắt tỉa."""
+    counting = True
+
+
+class EventSink(SearchSink):
+    """
+    Engine phát sự kiện ("try" / "prune" / "backtrack" / "solved", xem algorithms.py);
+    người gọi lặp qua generator tìm kiếm để nhận từng sự kiện (Visualizer, giới hạn số nút...).
+    counting=True: đếm thêm nodes_visited / prunes_made như CountingSink.
+    """
+    emit = True
+
+    def __init__(self, counting=False):
+        self.counting = counting
+
+
+class QueueSink(EventSink):
+    """Đẩy mọi sự kiện vào `events_queue` (queue.Queue) khi chạy bằng run_search(search, sink)."""
+
+    def __init__(self, events_queue, counting=False):
+        super().__init__(counting)
+        self.queue = events_queue
+
+    def event(self, event):
+        self.queue.put(event)
+
+
+def sink_flags(sink):
+    """(counting, emit) của sink; None -> (False, False)."""
+    if sink is None:
+        return False, False
+    return sink.counting, sink.emit
@@ -0,0 +1,109 @@
+"""
+Chạy các lần giải ở luồng nền để cửa sổ không bị treo trong lúc giải.
+
+- SolveJobManager.submit(task, on_done, on_progress, on_error=...): chạy task(job) trên một luồng nền.
+  on_error là bắt buộc - lỗi của job luôn được báo cho nơi gọi (controller hiển thị), không in ra console.
+  task dùng job.budget(...) cho các hàm giải (budget gắn sẵn token hủy của job và hàm báo tiến độ),
+  có thể gọi job.report(...) để gửi thông tin riêng (VD thuật toán đang chạy).
+- Mọi sự kiện (tiến độ, kết quả, lỗi) đi qua một hàng đợi; luồng giao diện gọi dispatch() định kỳ
+  (root.after) để các callback chạy trên luồng giao diện, không bao giờ trên luồng giải.
+- cancel(job_id) / cancel(): đặt token hủy; engine dừng ở mốc kiểm tra kế tiếp
+  và hàm giải trả về None với stats["budget_exceeded"] = "cancelled".
+Mẫu tiến độ được gửi thưa (mặc định 4 lần mỗi giây), xem SearchBudget.
+"""
+import itertools
+import queue
+import threading
+import traceback
+
+from .search_budget import CancelToken, SearchBudget
+
+
+class SolveJob:
+    def __init__(self, job_id, events: queue.Queue, progress_interval):
+        self.id = job_id
+        self.cancel_token = CancelToken()
+        self._events = events
+        self._progress_interval = progress_interval
+
+    def budget(self, max_nodes=None, timeout=None):
+        """SearchBudget cho một lần giải trong job (mỗi lần giải cần một budget mới)."""
+        return SearchBudget(max_nodes=max_nodes, timeout=timeout, cancel_token=self.cancel_token,
+                            progress=self.report, progress_interval=self._progress_interval)
+
+    def report(self, sample: dict):
+        """Gửi một mẫu tiến độ (gọi được từ luồng giải)."""
+        self._events.put(("progress", self.id, sample))
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+    @property
+    def cancelled(self):
+        return self.cancel_token.cancelled
+
+
+class SolveJobManager:
+    def __init__(self, progress_interval=0.25):
+        self.progress_interval = progress_interval
+        self._events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._jobs = {}        # job_id -> SolveJob (đang chạy)
+        self._callbacks = {}   # job_id -> (on_done, on_progress, on_error) - chỉ đọc trên luồng giao diện
+
+    def submit(self, task, on_done=None, on_progress=None, *, on_error):
+        """
+        Chạy task(job) trên luồng nền; trả về job_id. Các callback được gọi từ dispatch().
+        on_error(traceback_text): bắt buộc - được gọi khi task ném ngoại lệ.
+        """
+        job = SolveJob(next(self._ids), self._events, self.progress_interval)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._callbacks[job.id] = (on_done, on_progress, on_error)
+        threading.Thread(target=self._run, args=(job, task), daemon=True).start()
+        return job.id
+
+    def _run(self, job, task):
+        try:
+            result = task(job)
+            self._events.put(("done", job.id, result))
+        except Exception:
+            self._events.put(("error", job.id, traceback.format_exc()))
+        finally:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+
+    def cancel(self, job_id=None):
+        """Hủy một job (hoặc mọi job nếu job_id là None)."""
+        with self._lock:
+            jobs = list(self._jobs.values()) if job_id is None else [self._jobs[job_id]] if job_id in self._jobs else []
+        for job in jobs:
+            job.cancel()
+
+    def is_running(self, job_id=None):
+        with self._lock:
+            return bool(self._jobs) if job_id is None else job_id in self._jobs
+
+    def has_pending(self):
+        """Còn job đang chạy hoặc sự kiện chưa được dispatch()."""
+        return bool(self._callbacks)
+
+    def dispatch(self):
+        """Đọc hết các sự kiện trong hàng đợi và gọi callback tương ứng (gọi trên luồng giao diện)."""
+        while True:
+            try:
+                kind, job_id, payload = self._events.get_nowait()
+            except queue.Empty:
+                return
+            if job_id not in self._callbacks:
+                continue
+            on_done, on_progress, on_error = self._callbacks[job_id]
+            if kind == "progress":
+                if on_progress is not None: on_progress(payload)
+                continue
+            self._callbacks.pop(job_id, None)
+            if kind == "done":
+                if on_done is not None: on_done(payload)
+            else:
+                on_error(payload)
@@ -1,4 +1,6 @@
 from .sudoku_board import SudokuBoard
+from .algorithms import run_search
+from .search_budget import NO_LIMIT
 
 class DLXNode:
     """
@@ -30,6 +32,7 @@ class SudokuDLX:
         self.wrapper = board_wrapper
         self.n = board_wrapper.n
         self.box_size = board_wrapper.box_size
+        self.box_of = board_wrapper.geometry.box_of
         self.original_board = board_wrapper.get_board()
         
 
@@ -40,7 +43,11 @@ class SudokuDLX:
         self.columns_list = []  
 
 
-    def solve(self, stats: dict):
+    def solve(self, stats: dict, budget=None):
+        """
+        Giải và ghi lời giải vào wrapper; stats["nodes_visited"] = số lần chọn cột (Cover).
+        budget: SearchBudget (xem search_budget.py) - chạm giới hạn thì trả về None, stats["budget_exceeded"] ghi lý do.
+        """
 
         # Biến đổi Sudoku thành bài toán Exact Cover (Ma trận 0-1)
         self._build_exact_cover_matrix()
@@ -49,12 +56,18 @@ class SudokuDLX:
         # Giúp giảm không gian tìm kiếm ngay từ đầu bằng cách loại bỏ các phương án mâu thuẫn.
         self._initialize_clues()
         
-        # Đệ quy tìm lời giải
-        if self._search(visualize=False):
+        # Chạy vòng lặp tìm kiếm đến khi kết thúc
+        found = run_search(self._search(budget=budget))
+        self._release()
+        if found is None:
+            stats["nodes_visited"] = self.nodes_visited
+            budget.exceeded(stats)
+            return None
+        if found:
             # Nếu tìm thấy: Tái tạo bàn cờ từ danh sách solution
             result_board = [row[:] for row in self.original_board]
             for node in self.solution:
-                r, c, val = node.row_data
+                r, c, val = self._row_data(node)
                 result_board[r][c] = val
             
             # Cập nhật kết quả vào wrapper để Controller hiển thị
@@ -72,13 +85,54 @@ class SudokuDLX:
     def solve_visual(self, wrapper, stats: dict):
         """
         Generator trả về từng bước chạy để vẽ lên giao diện.
+        Vòng lặp tìm kiếm chạy ở chế độ phát sự kiện, mỗi sự kiện được đổi thành trạng thái để vẽ.
         """
         self._build_exact_cover_matrix()
         self._initialize_clues() 
         
-        yield from self._search_visual_generator(stats)
+        for event in self._search(emit=True):
+            stats["nodes_visited"] = self.nodes_visited
+            action = event[0]
+
+            if action == "solved":
+                self._release()
+                yield {"status": "solved", "stats": stats}
+                return True
+
+            r, c, val = self._row_data(event[1])
+            # Chỉ báo hiệu nếu là ô trống (để tránh tô xanh ô đề bài)
+            if self.original_board[r][c] != 0:
+                continue
+
+            if action == "try":
+                self.wrapper.set_cell(r, c, val)
+                yield {
+                    "action": "try", 
+                    "cell": (r, c), "num": val, 
+                    "stats": stats, 
+                    "status": "running"
+                }
+            elif action == "backtrack":
+                # Báo hiệu quay lui (Tô đỏ)
+                self.wrapper.set_cell(r, c, 0)
+                stats["backtracks"] = stats.get("backtracks", 0) + 1
+                yield {
+                    "action": "backtrack", 
+                    "cell": (r, c), 
+                    "stats": stats, 
+                    "status": "running"
+                }
+        self._release()
+        return False
 
 
+    def _row_data(self, row_node):
+        """Phương án (r, c, val) mà một hàng của ma trận biểu diễn."""
+        return row_node.row_data
+
+    def _release(self):
+        """Dọn ma trận sau khi giải xong (ma trận ở đây dựng riêng cho mỗi đề nên không cần làm gì)."""
+
     def _initialize_clues(self):
        
         for r in range(self.n):
@@ -114,109 +168,75 @@ class SudokuDLX:
                         self.solution.append(target_row)
 
   
-    def _search(self, visualize=False):
-        # ĐK Dừng: Nếu Header trỏ về chính nó -> Hết cột -> Ma trận rỗng -> Đã phủ kín -> THÀNH CÔNG
-        if self.head.right == self.head:
-            return True
-        
-        self.nodes_visited += 1
-        
-        # Chọn cột tốt nhất (Heuristic: Cột có kích thước nhỏ nhất -> Dễ fail nhất)
-        col = self._choose_column()
-        
-        # Cover cột này (Xóa cột và các hàng liên quan khỏi ma trận)
-        self._cover(col)
-        
-        # Duyệt qua từng Hàng (Row) trong cột đó -> Đây là các phương án thử
-        curr_row = col.down
-        while curr_row != col:
-            # Chọn phương án này -> Đẩy vào stack
-            self.solution.append(curr_row)
-            
-            # Cover các cột khác mà hàng này cũng đi qua (Lan truyền ràng buộc)
-            j = curr_row.right
-            while j != curr_row:
-                self._cover(j.column)
-                j = j.right
-            
-            # Đệ quy xuống cấp sâu hơn
-            if self._search(visualize):
-                return True
-            
-            # Nếu thất bại -> BACKTRACK (Quay lui)
-            # Uncover các cột theo thứ tự ngược lại (LIFO)
-            self.solution.pop()
-            j = curr_row.left
-            while j != curr_row:
-                self._uncover(j.column)
-                j = j.left
-            
-            # Thử hàng tiếp theo
-            curr_row = curr_row.down
-            
-        # Trả lại cột ban đầu nếu không tìm thấy lời giải ở nhánh này
-        self._uncover(col)
-        return False
+    def _search(self, emit=False, budget=None):
+        """
+        Algorithm X dạng vòng lặp với ngăn xếp tường minh (không đệ quy).
+        Mỗi khung là [cột đã chọn, hàng đang thử]; hàng đang thử == cột nghĩa là chưa thử hàng nào.
+        Generator: với emit=True yield ("try", row_node), ("backtrack", row_node), ("solved",).
+        budget: SearchBudget - chạm giới hạn thì dừng trước khi cover cột mới và trả về None.
+        """
+        frames = []
+        enter_node = True
+        check_at = budget.begin(self.nodes_visited) if budget is not None else NO_LIMIT
 
-    def _search_visual_generator(self, stats):
-        if self.head.right == self.head:
-            yield {"status": "solved", "stats": stats}
-            return True
+        while True:
+            if enter_node:
+                enter_node = False
+                # ĐK Dừng: Nếu Header trỏ về chính nó -> Hết cột -> Ma trận rỗng -> Đã phủ kín -> THÀNH CÔNG
+                if self.head.right == self.head:
+                    if emit: yield ("solved",)
+                    return True
 
-        self.nodes_visited += 1
-        stats["nodes_visited"] = self.nodes_visited 
+                self.nodes_visited += 1
+                if self.nodes_visited >= check_at:
+                    check_at = budget.check(self.nodes_visited, len(frames))
+                    if check_at is None:
+                        return None
 
-        col = self._choose_column()
-        self._cover(col)
-        
-        curr_row = col.down
-        while curr_row != col:
+                # Chọn cột tốt nhất (Heuristic: Cột có kích thước nhỏ nhất -> Dễ fail nhất)
+                col = self._choose_column()
+
+                # Cover cột này (Xóa cột và các hàng liên quan khỏi ma trận)
+                self._cover(col)
+                frames.append([col, col])
+
+            frame = frames[-1]
+            col, curr_row = frame
+
+            if curr_row != col:
+                # Hàng đang thử thất bại -> BACKTRACK (Quay lui)
+                # Uncover các cột theo thứ tự ngược lại (LIFO)
+                self.solution.pop()
+                j = curr_row.left
+                while j != curr_row:
+                    self._uncover(j.column)
+                    j = j.left
+                if emit: yield ("backtrack", curr_row)
+
+            # Thử hàng tiếp theo trong cột -> Đây là các phương án thử
+            curr_row = curr_row.down
+            if curr_row == col:
+                # Hết phương án: trả lại cột ban đầu và quay về khung cha
+                self._uncover(col)
+                frames.pop()
+                if not frames:
+                    return False
+                continue
+
+            # Chọn phương án này -> Đẩy vào stack
+            frame[1] = curr_row
             self.solution.append(curr_row)
-            r, c, val = curr_row.row_data
-            
-            # Chỉ báo hiệu nếu là ô trống (để tránh tô xanh ô đề bài)
-            if self.original_board[r][c] == 0:
-                self.wrapper.set_cell(r, c, val)
-                yield {
-                    "action": "try", 
-                    "cell": (r, c), "num": val, 
-                    "stats": stats, 
-                    "status": "running"
-                }
 
+            # Cover các cột khác mà hàng này cũng đi qua (Lan truyền ràng buộc)
             j = curr_row.right
             while j != curr_row:
                 self._cover(j.column)
                 j = j.right
-            
-            # Đệ quy
-            if (yield from self._search_visual_generator(stats)):
-                return True
-            
-            # Backtrack
-            self.solution.pop()
-            j = curr_row.left
-            while j != curr_row:
-                self._uncover(j.column)
-                j = j.left
+            if emit: yield ("try", curr_row)
 
-            # Báo hiệu quay lui (Tô đỏ)
-            if self.original_board[r][c] == 0:
-                self.wrapper.set_cell(r, c, 0)
-                stats["backtracks"] = stats.get("backtracks", 0) + 1
-                yield {
-                    "action": "backtrack", 
-                    "cell": (r, c), 
-                    "stats": stats, 
-                    "status": "running"
-                }
-                
-            curr_row = curr_row.down
-            
-        self._uncover(col)
-        return False
+            # Đi xuống cấp sâu hơn
+            enter_node = True
 
- 
     def _cover(self, col):
 
         #  Gỡ cột ra khỏi danh sách Header ngang
@@ -326,7 +346,7 @@ class SudokuDLX:
         
         # Cột 4: Box b có số val
         # Index: 3*N^2 -> 4*N^2 - 1
-        b = (r // self.box_size) * self.box_size + (c // self.box_size)
+        b = self.box_of[r * self.n + c]
         idx4 = (3 * self.n**2) + (b * self.n) + (val - 1)
         
         indices = [idx1, idx2, idx3, idx4]
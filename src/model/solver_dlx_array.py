@@ -0,0 +1,451 @@
+import random
+import time
+from array import array
+
+from .sudoku_board import SudokuBoard
+from .board_geometry import get_geometry
+from .solver_dlx import SudokuDLX
+from .algorithms import run_search
+from .search_budget import NO_LIMIT, SearchBudget
+
+
+class DLXTemplate:
+    """
+    Ma trận Exact Cover ĐẦY ĐỦ của bàn N x N, dựng một lần và dùng lại cho mọi đề cùng kích thước.
+
+    Mỗi nút là một chỉ số nguyên; các liên kết Trái / Phải / Trên / Dưới / Cột nằm trong các mảng
+    cấp phát sẵn một lần:
+    - Nút 0 là ROOT, nút 1..4N^2 là Header của các cột ràng buộc, phía sau là các nút dữ liệu.
+    - size[col] là số nút còn lại trong cột col.
+    - Mỗi phương án (r, c, val) có đủ N^3 hàng, hàng thứ rid = (r * N + c) * N + (val - 1)
+      gồm 4 nút liên tiếp bắt đầu từ first_node + 4 * rid (nút đầu tiên nằm ở cột "Ô (r,c) có số").
+      Nhờ đó tra hàng của một số đề bài chỉ là một phép tính, không phải duyệt cột.
+
+    compact=True: giữ liên kết trong array('i') (4 byte / liên kết, ít bộ nhớ nhất, nhưng mỗi lần đọc
+    phải tạo lại đối tượng int nên cover / uncover chậm hơn).
+    compact=False: sau khi dựng xong, các mảng được chuyển sang list dùng chung một bảng số nguyên
+    -> cover / uncover nhanh hơn DLXNode, bộ nhớ vẫn ít hơn khoảng 2 lần.
+
+    buckets[s] là mask trên chỉ số cột: bit col bật khi cột col còn trong danh sách Header và có đúng
+    s nút. Cover / uncover cập nhật bucket cùng lúc với size, nên cột nhỏ nhất là bit thấp nhất của
+    bucket khác 0 đầu tiên (không phải duyệt 4N^2 Header ở mỗi nút).
+    """
+
+    def __init__(self, n, compact=False):
+        self.n = n
+        self.compact = compact
+        nn = n * n
+        num_cols = 4 * nn
+        total = 1 + num_cols + 4 * n * nn
+        self.first_node = num_cols + 1
+
+        left = array('i', bytes(4 * total))
+        right = array('i', bytes(4 * total))
+        up = array('i', bytes(4 * total))
+        down = array('i', bytes(4 * total))
+        col_of = array('i', bytes(4 * total))
+        size = array('i', bytes(4 * (num_cols + 1)))
+
+        # --- TẠO HEADER: danh sách vòng tròn ngang ROOT <-> C1 <-> ... <-> C(4N^2) ---
+        for i in range(num_cols + 1):
+            left[i] = i - 1 if i > 0 else num_cols
+            right[i] = i + 1 if i < num_cols else 0
+            up[i] = down[i] = col_of[i] = i
+
+        # --- TẠO HÀNG --- (cùng thứ tự với SudokuDLX: theo ô hàng-cột, giá trị tăng dần)
+        box_of = get_geometry(n).box_of
+        node = self.first_node
+        for r in range(n):
+            for c in range(n):
+                b = box_of[r * n + c]
+                for v in range(n):
+                    # Chỉ số Header = chỉ số cột ràng buộc + 1 (vì nút 0 là ROOT)
+                    headers = (
+                        r * n + c + 1,
+                        nn + r * n + v + 1,
+                        2 * nn + c * n + v + 1,
+                        3 * nn + b * n + v + 1,
+                    )
+                    start = node
+                    for k, col in enumerate(headers):
+                        col_of[node] = col
+
+                        # Link Dọc (Nối vào cuối cột)
+                        up[node] = up[col]
+                        down[node] = col
+                        down[up[col]] = node
+                        up[col] = node
+                        size[col] += 1
+
+                        # Link Ngang (4 nút liên tiếp tạo thành vòng tròn)
+                        left[node] = start + (k - 1) % 4
+                        right[node] = start + (k + 1) % 4
+                        node += 1
+
+        if not compact:
+            # Mọi phần tử trỏ tới cùng một đối tượng int của bảng `pool` (không nhân bản số nguyên)
+            pool = list(range(total))
+            left = [pool[x] for x in left]
+            right = [pool[x] for x in right]
+            up = [pool[x] for x in up]
+            down = [pool[x] for x in down]
+            col_of = [pool[x] for x in col_of]
+            size = list(size)
+
+        self.left, self.right, self.up, self.down = left, right, up, down
+        self.col_of = col_of
+        self.size = size
+
+        # Ma trận đầy đủ: mọi cột ràng buộc đều có đúng N nút
+        self.col_bit = [1 << col for col in range(num_cols + 1)]
+        self.buckets = [0] * (n + 1)
+        self.buckets[n] = (1 << (num_cols + 1)) - 2
+
+
+# Các template đang rảnh, theo (N, compact). Một template chỉ được trả lại đây khi đã khôi phục
+# về trạng thái đầy đủ; nếu lần giải bị bỏ dở (VD: dừng Visualizer) nó đơn giản bị bỏ đi.
+_template_pool = {}
+
+def acquire_template(n, compact=False):
+    """Lấy một template sạch cho bàn N x N (dựng mới nếu chưa có template rảnh)."""
+    free = _template_pool.setdefault((n, compact), [])
+    try:
+        return free.pop()
+    except IndexError:
+        return DLXTemplate(n, compact)
+
+def release_template(template: DLXTemplate):
+    """Trả template (đã khôi phục đầy đủ) về kho để lần giải sau dùng lại."""
+    _template_pool.setdefault((template.n, template.compact), []).append(template)
+
+
+class SudokuDLXArray(SudokuDLX):
+    """
+    Dancing Links lưu trên mảng số nguyên phẳng (DLXTemplate) thay vì đối tượng DLXNode.
+
+    Thay vì dựng ma trận mới cho mỗi đề, bộ giải mượn template của kích thước N,
+    cover các hàng ứng với số đề bài (tra trực tiếp theo chỉ số), tìm kiếm,
+    rồi uncover ngược lại toàn bộ và trả template về kho (_release).
+
+    Sau khi cover số đề bài, các hàng / cột còn lại và thứ tự của chúng giống hệt ma trận
+    SudokuDLX dựng riêng cho đề đó, nên số nút duyệt (nodes_visited) không đổi;
+    giao diện solve(stats) / solve_visual(wrapper, stats) được kế thừa nguyên vẹn.
+    """
+
+    def __init__(self, board_wrapper: SudokuBoard, compact=False, random_tie_break=False):
+        super().__init__(board_wrapper)
+        self.compact = compact
+        # True: các cột cùng kích thước nhỏ nhất được chọn ngẫu nhiên (dùng khi sinh đề);
+        # False: chọn cột đứng trước trong danh sách Header như SudokuDLX (nodes_visited không đổi)
+        self.random_tie_break = random_tie_break
+        self.template = None
+        self.left = self.right = self.up = self.down = None
+        self.col_of = None
+        self.size = None
+        self.buckets = self.col_bit = None
+        self.first_node = 0
+        # True nếu các số đề bài mâu thuẫn nhau (hàng của một số đề bài đã bị loại)
+        self.clue_conflict = False
+        self.solutions_found = 0
+
+    def _row_data(self, row_node):
+        cell, val_index = divmod((row_node - self.first_node) >> 2, self.n)
+        r, c = divmod(cell, self.n)
+        return (r, c, val_index + 1)
+
+    def _build_exact_cover_matrix(self):
+        template = acquire_template(self.n, self.compact)
+        self.template = template
+        self.left, self.right, self.up, self.down = template.left, template.right, template.up, template.down
+        self.col_of = template.col_of
+        self.size = template.size
+        self.buckets, self.col_bit = template.buckets, template.col_bit
+        self.first_node = template.first_node
+        self.solution = []
+        self.clue_conflict = False
+
+    def _initialize_clues(self):
+        n = self.n
+        up, down, right, col_of = self.up, self.down, self.right, self.col_of
+        first_node = self.first_node
+        for r in range(n):
+            for c in range(n):
+                val = self.original_board[r][c]
+                if val == 0:
+                    continue
+                # Nút đầu của hàng (r, c, val) - nằm trong cột "Ô (r,c) phải có số"
+                node = first_node + 4 * ((r * n + c) * n + (val - 1))
+
+                # Hàng đã bị gỡ khỏi cột (do một số đề bài khác cùng Hàng / Cột / Khối) -> Đề mâu thuẫn
+                if down[up[node]] != node:
+                    self.clue_conflict = True
+                    continue
+
+                # Cover cột hiện tại và các cột khác mà hàng này thỏa mãn
+                self._cover(col_of[node])
+                j = right[node]
+                while j != node:
+                    self._cover(col_of[j])
+                    j = right[j]
+                self.solution.append(node)
+
+    def count_solutions(self, limit=2, budget=None):
+        """
+        Đếm số lời giải, dừng ngay khi đã thấy `limit` lời giải (limit=2 đủ để kiểm tra tính duy nhất).
+        Bàn cờ không bị thay đổi. Trả về số lời giải tìm được (tối đa `limit`),
+        hoặc None nếu chạm giới hạn của budget trước khi biết kết quả.
+        """
+        self._build_exact_cover_matrix()
+        self._initialize_clues()
+        self.solutions_found = 0
+        done = run_search(self._search(limit=limit, budget=budget))
+        self._release()
+        return None if done is None else self.solutions_found
+
+    def _release(self):
+        """
+        Khôi phục template về ma trận đầy đủ và trả về kho.
+        Mỗi hàng trong solution (số đề bài lẫn các bước tìm kiếm) đã cover cột của nút đầu
+        rồi tới các cột bên phải -> uncover theo thứ tự ngược lại.
+        """
+        if self.template is None:
+            return
+        left, col_of = self.left, self.col_of
+        uncover = self._uncover
+        for node in reversed(self.solution):
+            j = left[node]
+            while j != node:
+                uncover(col_of[j])
+                j = left[j]
+            uncover(col_of[node])
+        release_template(self.template)
+        self.template = None
+
+    def _search(self, emit=False, limit=1, budget=None):
+        """
+        Algorithm X dạng vòng lặp trên mảng (cùng cấu trúc khung với SudokuDLX._search).
+        Cover / uncover được viết thẳng trong vòng lặp với các mảng giữ ở biến cục bộ
+        để tránh chi phí gọi phương thức ở mỗi bước.
+        limit > 1: chế độ đếm - tiếp tục tìm sau mỗi lời giải (cộng vào self.solutions_found)
+        cho tới khi đủ `limit` lời giải (trả về True) hoặc hết không gian tìm kiếm (False).
+        budget: SearchBudget - chạm giới hạn thì dừng ở đầu nút (trước khi cover cột mới, nên _release()
+        vẫn khôi phục đúng template) và trả về None.
+        """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        col_of, size = self.col_of, self.size
+        buckets, col_bit = self.buckets, self.col_bit
+        choose_column = self._choose_column
+        solution = self.solution
+        frames = []
+        enter_node = True
+        check_at = budget.begin(self.nodes_visited) if budget is not None else NO_LIMIT
+
+        # Các số đề bài mâu thuẫn -> Không có lời giải
+        if self.clue_conflict:
+            return False
+
+        while True:
+            if enter_node:
+                enter_node = False
+                # Hết cột -> Ma trận đã phủ kín -> Tìm được một lời giải
+                if right[0] == 0:
+                    self.solutions_found += 1
+                    if self.solutions_found >= limit:
+                        if emit: yield ("solved",)
+                        return True
+                    # Chế độ đếm: coi như nhánh này đã xong, quay lui tìm lời giải khác
+                    if not frames:
+                        return False
+                else:
+                    self.nodes_visited += 1
+                    if self.nodes_visited >= check_at:
+                        check_at = budget.check(self.nodes_visited, len(frames))
+                        if check_at is None:
+                            return None
+                    col = choose_column()
+                    # cover(col)
+                    left[right[col]] = left[col]
+                    right[left[col]] = right[col]
+                    buckets[size[col]] ^= col_bit[col]
+                    i = down[col]
+                    while i != col:
+                        j = right[i]
+                        while j != i:
+                            u = up[j]
+                            d = down[j]
+                            down[u] = d
+                            up[d] = u
+                            cj = col_of[j]
+                            s = size[cj]
+                            size[cj] = s - 1
+                            bit = col_bit[cj]
+                            buckets[s] ^= bit
+                            buckets[s - 1] |= bit
+                            j = right[j]
+                        i = down[i]
+                    frames.append([col, col])
+
+            frame = frames[-1]
+            col, curr_row = frame
+
+            if curr_row != col:
+                # Quay lui: uncover các cột của hàng theo thứ tự ngược lại
+                solution.pop()
+                k = left[curr_row]
+                while k != curr_row:
+                    c = col_of[k]
+                    i = up[c]
+                    while i != c:
+                        j = left[i]
+                        while j != i:
+                            cj = col_of[j]
+                            s = size[cj]
+                            size[cj] = s + 1
+                            bit = col_bit[cj]
+                            buckets[s] ^= bit
+                            buckets[s + 1] |= bit
+                            up[down[j]] = j
+                            down[up[j]] = j
+                            j = left[j]
+                        i = up[i]
+                    left[right[c]] = c
+                    right[left[c]] = c
+                    buckets[size[c]] |= col_bit[c]
+                    k = left[k]
+                if emit: yield ("backtrack", curr_row)
+
+            curr_row = down[curr_row]
+            if curr_row == col:
+                # uncover(col)
+                i = up[col]
+                while i != col:
+                    j = left[i]
+                    while j != i:
+                        cj = col_of[j]
+                        s = size[cj]
+                        size[cj] = s + 1
+                        bit = col_bit[cj]
+                        buckets[s] ^= bit
+                        buckets[s + 1] |= bit
+                        up[down[j]] = j
+                        down[up[j]] = j
+                        j = left[j]
+                    i = up[i]
+                left[right[col]] = col
+                right[left[col]] = col
+                buckets[size[col]] |= col_bit[col]
+                frames.pop()
+                if not frames:
+                    return False
+                continue
+
+            frame[1] = curr_row
+            solution.append(curr_row)
+            k = right[curr_row]
+            while k != curr_row:
+                c = col_of[k]
+                left[right[c]] = left[c]
+                right[left[c]] = right[c]
+                buckets[size[c]] ^= col_bit[c]
+                i = down[c]
+                while i != c:
+                    j = right[i]
+                    while j != i:
+                        u = up[j]
+                        d = down[j]
+                        down[u] = d
+                        up[d] = u
+                        cj = col_of[j]
+                        s = size[cj]
+                        size[cj] = s - 1
+                        bit = col_bit[cj]
+                        buckets[s] ^= bit
+                        buckets[s - 1] |= bit
+                        j = right[j]
+                    i = down[i]
+                k = right[k]
+            if emit: yield ("try", curr_row)
+
+            enter_node = True
+
+    def _cover(self, col):
+        left, right, up, down = self.left, self.right, self.up, self.down
+        col_of, size = self.col_of, self.size
+        buckets, col_bit = self.buckets, self.col_bit
+
+        # Gỡ cột ra khỏi danh sách Header ngang
+        left[right[col]] = left[col]
+        right[left[col]] = right[col]
+        buckets[size[col]] ^= col_bit[col]
+
+        # Gỡ từng hàng của cột ra khỏi các cột khác
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                u = up[j]
+                d = down[j]
+                down[u] = d
+                up[d] = u
+                cj = col_of[j]
+                s = size[cj]
+                size[cj] = s - 1
+                bit = col_bit[cj]
+                buckets[s] ^= bit
+                buckets[s - 1] |= bit
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, col):
+        left, right, up, down = self.left, self.right, self.up, self.down
+        col_of, size = self.col_of, self.size
+        buckets, col_bit = self.buckets, self.col_bit
+
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                cj = col_of[j]
+                s = size[cj]
+                size[cj] = s + 1
+                bit = col_bit[cj]
+                buckets[s] ^= bit
+                buckets[s + 1] |= bit
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+
+        # Nối lại cột vào danh sách Header
+        left[right[col]] = col
+        right[left[col]] = col
+        buckets[size[col]] |= col_bit[col]
+
+    def _choose_column(self):
+        """
+        Cột có ít nút nhất, lấy từ bucket nhỏ nhất còn phần tử.
+        Các Header luôn nằm theo thứ tự chỉ số (uncover trả cột về đúng chỗ cũ), nên bit thấp nhất
+        chính là cột mà phép duyệt danh sách Header của SudokuDLX sẽ chọn.
+        """
+        for cols in self.buckets:
+            if not cols:
+                continue
+            if self.random_tie_break and cols & (cols - 1):
+                # Chọn ngẫu nhiên 1 trong các cột cùng kích thước nhỏ nhất
+                for _ in range(random.randrange(cols.bit_count())):
+                    cols &= cols - 1
+            return (cols & -cols).bit_length() - 1
+        return 0
+
+
+def count_solutions(grid, limit=2, max_nodes=None):
+    """
+    Đếm lời giải của đề `grid` (ma trận NxN) bằng DLX, dừng sớm khi đủ `limit` lời giải.
+    max_nodes: giới hạn số nút duyệt; vượt quá thì bỏ dở và trả về số lời giải là None (chưa xác định).
+    Trả về (số lời giải, số nút đã duyệt, thời gian chạy tính bằng giây).
+    """
+    start = time.perf_counter()
+    solver = SudokuDLXArray(SudokuBoard(grid))
+    budget = SearchBudget(max_nodes=max_nodes) if max_nodes is not None else None
+    count = solver.count_solutions(limit, budget)
+    return (count, solver.nodes_visited, time.perf_counter() - start)
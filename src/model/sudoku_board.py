@@ -1,5 +1,6 @@
 import time 
 import math
+from .board_geometry import get_geometry
 
 class SudokuBoard:
 
@@ -11,6 +12,7 @@ class SudokuBoard:
         self.board = [row[:] for row in initial_board]
         self.n = len(initial_board) # Kích thước lưới (9, 16, 25...)
         self.box_size = int(math.isqrt(self.n)) # Kích thước khối (3, 4, 5...)
+        self.geometry = get_geometry(self.n) # Bảng hàng xóm / đơn vị dùng chung theo N
         
         self.start_time = 0
         self.execution_time = 0
@@ -30,27 +32,13 @@ class SudokuBoard:
         return None 
 
     def is_valid(self, num, row, col):
-        """Kiểm tra hợp lệ tổng quát cho NxN."""
-        # 1. Ràng buộc Hàng
-        for c in range(self.n):
-            if self.board[row][c] == num:
+        """Kiểm tra hợp lệ tổng quát cho NxN (Hàng, Cột, Khối) dựa trên bảng hàng xóm dựng sẵn."""
+        board = self.board
+        if board[row][col] == num:
+            return False
+        for (r, c) in self.geometry.peer_rc[row * self.n + col]:
+            if board[r][c] == num:
                 return False
-
-        # 2. Ràng buộc Cột
-        for r in range(self.n):
-            if self.board[r][col] == num:
-                return False
-
-        # 3. Ràng buộc Khối (Box)
-        # Công thức tổng quát: (r // box_size) * box_size
-        box_start_row = (row // self.box_size) * self.box_size
-        box_start_col = (col // self.box_size) * self.box_size
-
-        for r in range(box_start_row, box_start_row + self.box_size):
-            for c in range(box_start_col, box_start_col + self.box_size):
-                if self.board[r][c] == num:
-                    return False
-
         return True
 
     def start_timer(self):
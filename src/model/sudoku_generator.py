@@ -1,52 +1,180 @@
 import random
 import copy
+import time
 from .sudoku_board import SudokuBoard
-from .algorithms_mrv import solve_forward_checking_mrv 
+from .algorithms_mrv import solve_forward_checking_mrv, count_solutions
+from .candidate_engine import BitmaskDomains
+from .propagation import make_propagator
+from .search_budget import SearchBudget
+
+# Cách tạo lời giải đầy đủ:
+# - 'solver': điền ngẫu nhiên các khối chéo rồi giải bằng FC + MRV.
+# - 'transform': biến đổi một lưới hạt giống (seed) bằng các phép giữ tính hợp lệ - O(N^2).
+MODES = ('solver', 'transform')
+
+# Số lưới hạt giống tối đa giữ cho mỗi kích thước
+SEEDS_PER_SIZE = 8
+
+# Thư viện lưới hạt giống theo kích thước: {n: [grid, ...]}
+_seed_library = {}
+
+# Kiểu đối xứng khi đục lỗ: các ô cùng "quỹ đạo" được xóa / giữ lại cùng nhau
+SYMMETRIES = ('none', 'rotational', 'horizontal', 'vertical', 'diagonal')
+
+# Thời gian tối đa (giây) cho bước đục lỗ của một đề, theo kích thước
+DEFAULT_TIME_BUDGET = {4: 0.5, 9: 1.5, 16: 3.0, 25: 6.0}
+
+# Giới hạn số nút cho mỗi lần kiểm tra duy nhất bằng bộ giải (None = không giới hạn).
+# Vượt giới hạn thì coi như không chứng minh được -> trả số lại (an toàn, chỉ làm đề nhiều số hơn).
+# Bộ đếm là FC + MRV có lan truyền chứ không phải DLX (solver_dlx_array.count_solutions): các đề dễ đã được
+# chứng minh duy nhất bằng logic trước (xem _remove_digits), phần còn lại phần lớn có 2 lời giải và DLX
+# (không lan truyền) tốn hàng chục đến hàng trăm lần số nút để tìm ra lời giải thứ hai.
+DEFAULT_CHECK_NODES = {4: None, 9: 2000, 16: 200, 25: 40}
+
+# Tạo lời giải đầy đủ bằng bộ giải: số lần thử tối đa và thời gian tối đa (giây) cho mỗi lần
+# (25x25 thường mất ~0.3 s; khối chéo ngẫu nhiên hiếm khi dẫn vào nhánh xấu)
+FULL_GRID_ATTEMPTS = 20
+FULL_GRID_ATTEMPT_SEC = 5.0
+
+# Lượt lan truyền của bước đục lỗ: cỡ lô nhóm ban đầu / tối đa được kiểm tra cùng một lần
+PROPAGATION_BATCH = 8
+PROPAGATION_BATCH_MAX = 64
+
+# Kiểm tra duy nhất chạm giới hạn nút được thử lại một lần với giới hạn gấp RETRY_NODES_FACTOR lần
+RETRY_NODES_FACTOR = 8
+
+# Các mức độ khó (tăng dần) và tỷ lệ số ô cần xóa của từng mức theo kích thước.
+# 16x16 / 25x25 có thang riêng: đục lỗ tham lam giữ tính duy nhất dừng ở khoảng 63 - 66% số ô (16x16)
+# và 58 - 59% (25x25) kể cả khi không giới hạn thời gian, nên tỷ lệ 0.6 / 0.7 của 9x9 không đạt được
+# và hai mức Khó / Rất khó cho ra cùng một đề.
+DIFFICULTIES = ('easy', 'medium', 'hard', 'extreme')
+DEFAULT_REMOVE_RATIOS = (0.4, 0.5, 0.6, 0.7)
+REMOVE_RATIOS = {16: (0.4, 0.5, 0.57, 0.63), 25: (0.4, 0.46, 0.51, 0.56)}
+
+
+def removal_target(n, difficulty):
+    """Số ô cần xóa của đề NxN ở độ khó `difficulty` (độ khó lạ được xem như 'extreme')."""
+    ratios = REMOVE_RATIOS.get(n, DEFAULT_REMOVE_RATIOS)
+    level = DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else len(DIFFICULTIES) - 1
+    return int(n * n * ratios[level])
+
+
+def reached_difficulty(n, removed):
+    """Độ khó cao nhất mà số ô đã xóa đạt tới (tối thiểu 'easy')."""
+    reached = DIFFICULTIES[0]
+    for difficulty in DIFFICULTIES:
+        if removed >= removal_target(n, difficulty):
+            reached = difficulty
+    return reached
+
 
 class SudokuGenerator:
-    def __init__(self, size=9):
+    def __init__(self, size=9, symmetry='none', time_budget=None, check_nodes=-1, mode='solver'):
+        """
+        mode: một trong MODES - cách tạo lời giải đầy đủ trước khi đục lỗ.
+        symmetry: một trong SYMMETRIES ('rotational' = đối xứng tâm 180 độ,
+                  'horizontal' / 'vertical' = đối xứng gương, 'diagonal' = qua đường chéo chính).
+        time_budget: số giây tối đa cho bước đục lỗ (None = theo DEFAULT_TIME_BUDGET).
+        check_nodes: giới hạn số nút của mỗi lần kiểm tra duy nhất (-1 = theo DEFAULT_CHECK_NODES,
+                     None = không giới hạn).
+        """
+        if symmetry not in SYMMETRIES:
+            raise ValueError(f"Kiểu đối xứng không hợp lệ: {symmetry}")
+        if mode not in MODES:
+            raise ValueError(f"Chế độ sinh đề không hợp lệ: {mode}")
         self.n = size
         self.box_size = int(size ** 0.5)
+        self.symmetry = symmetry
+        self.mode = mode
+        self.time_budget = time_budget if time_budget is not None else DEFAULT_TIME_BUDGET.get(size, 10.0)
+        self.check_nodes = check_nodes if check_nodes != -1 else DEFAULT_CHECK_NODES.get(size)
+        # Thống kê của lần đục lỗ gần nhất (số ô đã xóa, số lần kiểm tra, thời gian)
+        self.last_stats = {}
 
     def generate_puzzle(self, difficulty='easy'):
         """
         Quy trình tạo đề Sudoku (Tối ưu hóa):
-        1. Tạo bảng trống.
-        2. Điền ngẫu nhiên các khối chéo.
-        3. Dùng FC + MRV để điền đầy bảng (nhanh gấp bội so với Backtracking thường).
-        4. Đục lỗ theo độ khó.
-        """
-        # 1. Tạo bảng trống
-        board = [[0] * self.n for _ in range(self.n)]
-        board_wrapper = SudokuBoard(board)
-
-        # 2. Điền các khối chéo (Diagonal Boxes)
-        for i in range(0, self.n, self.box_size):
-            self._fill_box(board_wrapper, i, i)
-
-        # 3. Giải để có Full Solution (Dùng MRV để chạy nhanh với size 25x25)
-        stats = {"backtracks": 0}
-        
-        # Nếu dùng Backtracking thường ở đây với 25x25 sẽ bị treo máy
-        success = solve_forward_checking_mrv(board_wrapper, stats)
-        
-        if not success:
-            # Trường hợp hiếm hoi random khối chéo gây mâu thuẫn -> Thử lại
-            return self.generate_puzzle(difficulty)
-
-        full_solution = copy.deepcopy(board_wrapper.get_board())
-
-        # 4. Đục lỗ (Xóa số)
+        1. Tạo lời giải đầy đủ (xem generate_solution).
+        2. Đục lỗ theo độ khó, luôn giữ đề có DUY NHẤT một lời giải.
+        Độ khó thực đạt được nằm ở last_stats["difficulty"] (thấp hơn yêu cầu nếu hết time_budget).
+        """
+        full_solution = self.generate_solution()
+
+        # Đục lỗ (Xóa số)
         puzzle = copy.deepcopy(full_solution)
         self._remove_digits(puzzle, difficulty)
 
         return puzzle, full_solution
 
+    def generate_solution(self):
+        """Tạo một lưới lời giải đầy đủ NxN theo self.mode."""
+        if self.mode == 'transform':
+            seeds = seed_grids(self.n)
+            return self._transform_grid(random.choice(seeds))
+        solution = self._solve_full_grid()
+        # Lời giải từ bộ giải được thêm vào thư viện hạt giống để chế độ 'transform' đa dạng hơn
+        add_seed_grid(solution)
+        return solution
+
+    def _solve_full_grid(self):
+        """
+        1. Tạo bảng trống.
+        2. Điền ngẫu nhiên các khối chéo.
+        3. Dùng FC + MRV (có lan truyền ràng buộc) để điền đầy bảng.
+        Thử lại tối đa FULL_GRID_ATTEMPTS lần (mỗi lần giới hạn FULL_GRID_ATTEMPT_SEC giây), sau đó báo lỗi.
+        """
+        for _ in range(FULL_GRID_ATTEMPTS):
+            # 1. Tạo bảng trống
+            board = [[0] * self.n for _ in range(self.n)]
+            board_wrapper = SudokuBoard(board)
+
+            # 2. Điền các khối chéo (Diagonal Boxes)
+            for i in range(0, self.n, self.box_size):
+                self._fill_box(board_wrapper, i, i)
+
+            # 3. Giải để có Full Solution (lan truyền ràng buộc giúp 25x25 không bị kẹt ở nhánh xấu)
+            stats = {"backtracks": 0}
+            budget = SearchBudget(timeout=FULL_GRID_ATTEMPT_SEC)
+            if solve_forward_checking_mrv(board_wrapper, stats, propagate=True, budget=budget):
+                return copy.deepcopy(board_wrapper.get_board())
+            # Trường hợp hiếm hoi random khối chéo gây mâu thuẫn / kẹt ở nhánh xấu -> Thử lại
+        raise RuntimeError(f"Không tạo được lời giải đầy đủ {self.n}x{self.n} sau {FULL_GRID_ATTEMPTS} lần thử.")
+
+    def _transform_grid(self, seed):
+        """
+        Biến đổi ngẫu nhiên lưới hợp lệ `seed` thành lưới hợp lệ khác, O(N^2):
+        - Đổi nhãn các chữ số (hoán vị 1..N).
+        - Hoán vị các hàng trong mỗi dải (band) và hoán vị các dải; tương tự với cột / chồng (stack).
+        - Chuyển vị (transpose) với xác suất 1/2.
+        """
+        n = self.n
+        relabel = list(range(1, n + 1))
+        random.shuffle(relabel)
+        relabel.insert(0, 0)
+        rows = self._line_permutation()
+        cols = self._line_permutation()
+
+        if random.random() < 0.5:
+            return [[relabel[seed[cols[c]][rows[r]]] for c in range(n)] for r in range(n)]
+        return [[relabel[seed[rows[r]][cols[c]]] for c in range(n)] for r in range(n)]
+
+    def _line_permutation(self):
+        """Hoán vị chỉ số hàng (hoặc cột) giữ nguyên cấu trúc khối: trộn các dải rồi trộn trong từng dải."""
+        bs = self.box_size
+        bands = list(range(bs))
+        random.shuffle(bands)
+        order = []
+        for band in bands:
+            lines = list(range(band * bs, (band + 1) * bs))
+            random.shuffle(lines)
+            order.extend(lines)
+        return order
+
     def _fill_box(self, board_wrapper, row_start, col_start):
         # Trộn ngẫu nhiên dãy số từ 1 đến N
         num_pool = list(range(1, self.n + 1))
         random.shuffle(num_pool)
-        
+
         idx = 0
         for r in range(row_start, row_start + self.box_size):
             for c in range(col_start, col_start + self.box_size):
@@ -54,22 +182,206 @@ class SudokuGenerator:
                 idx += 1
 
     def _remove_digits(self, grid, difficulty):
+        """
+        Đục lỗ giữ tính duy nhất: duyệt các ô theo thứ tự ngẫu nhiên, xóa cả nhóm đối xứng của ô,
+        nếu đề không còn duy nhất thì trả lại các số vừa xóa. Các lượt từ rẻ tới đắt (xóa thêm số chỉ làm mất
+        thông tin, nên nhóm không qua được một kiểm tra logic ở lượt trước cũng không qua được ở lượt sau):
+        1. Ép trực tiếp: mọi số vừa xóa vẫn bị ép bởi các số đề còn lại (Naked / Hidden Single).
+        2. Lan truyền: các luật của propagation.py (singles, locked candidates) giải trọn đề -> duy nhất.
+        3. Bộ giải: với các nhóm còn lại, đếm lời giải bằng FC + MRV với limit=2 (giới hạn check_nodes nút).
+           Chạm giới hạn (chưa chứng minh được) thì thử lại một lần với giới hạn gấp RETRY_NODES_FACTOR lần;
+           vẫn chưa chứng minh được hoặc có 2 lời giải thì trả số lại.
+        Dừng khi đủ số ô cần xóa theo độ khó, hết ô để thử, hoặc hết time_budget.
+        last_stats["difficulty"] là độ khó thực đạt được (mức cao nhất có số ô cần xóa <= số ô đã xóa),
+        có thể thấp hơn độ khó yêu cầu nếu không đủ thời gian.
+        Trả về số ô đã xóa.
+        """
         total_cells = self.n * self.n
-        
-        # Tỷ lệ giữ lại số (càng khó càng ít số)
-        if difficulty == 'easy': remove_ratio = 0.4     
-        elif difficulty == 'medium': remove_ratio = 0.5 
-        elif difficulty == 'hard': remove_ratio = 0.6   
-        else: remove_ratio = 0.7                        
-
-        remove_count = int(total_cells * remove_ratio)
-        attempts = remove_count
-        
-        while attempts > 0:
-            r = random.randint(0, self.n - 1)
-            c = random.randint(0, self.n - 1)
-            
-            # Nếu ô chưa bị xóa thì xóa nó
-            if grid[r][c] != 0:
-                grid[r][c] = 0
-                attempts -= 1
\ No newline at end of file
+        remove_count = removal_target(self.n, difficulty)
+        start = time.perf_counter()
+        deadline = start + self.time_budget
+        removed = 0
+        logic_checks = solver_checks = retries = 0
+
+        cells = list(range(total_cells))
+        random.shuffle(cells)
+
+        # Lượt 1: các nhóm bị ép trực tiếp
+        unresolved = []
+        for idx in cells:
+            if removed >= remove_count or time.perf_counter() > deadline:
+                break
+            saved = self._clear_group(grid, idx)
+            if not saved:
+                continue
+            if self._group_forced(grid, saved):
+                logic_checks += 1
+                removed += len(saved)
+            else:
+                self._restore(grid, saved)
+                unresolved.append(idx)
+
+        # Lượt 2: lan truyền, thử xóa cả lô nhóm với một lần kiểm tra (lô thất bại được chia đôi);
+        # cỡ lô tăng gấp đôi khi cả lô qua được, giảm một nửa khi có nhóm bị loại
+        pending, unresolved = unresolved, []
+        batch_size = PROPAGATION_BATCH
+        while pending and removed < remove_count and time.perf_counter() <= deadline:
+            batch, size = [], 0
+            while pending and len(batch) < batch_size and removed + size < remove_count:
+                idx = pending.pop(0)
+                batch.append(idx)
+                size += len(self._group_cells(grid, idx))
+            accepted, failed = self._remove_batch(grid, batch)
+            logic_checks += len(accepted)
+            removed += sum(len(saved) for saved in accepted)
+            unresolved.extend(failed)
+            batch_size = max(1, batch_size // 2) if failed else min(PROPAGATION_BATCH_MAX, batch_size * 2)
+        cells = unresolved + pending
+
+        # Lượt 3: các nhóm còn lại cần bộ giải
+        for idx in cells:
+            if removed >= remove_count or time.perf_counter() > deadline:
+                break
+            saved = self._clear_group(grid, idx)
+            if not saved:
+                continue
+            solver_checks += 1
+            count = count_solutions(grid, limit=2, max_nodes=self.check_nodes)[0]
+            if count is None:
+                retries += 1
+                count = count_solutions(grid, limit=2, max_nodes=self.check_nodes * RETRY_NODES_FACTOR)[0]
+            if count == 1:
+                removed += len(saved)
+            else:
+                self._restore(grid, saved)
+
+        self.last_stats = {
+            "removed": removed, "target": remove_count,
+            "requested": difficulty, "difficulty": reached_difficulty(self.n, removed),
+            "logic_checks": logic_checks, "solver_checks": solver_checks, "solver_retries": retries,
+            "elapsed_sec": time.perf_counter() - start,
+        }
+        return removed
+
+    def _group_cells(self, grid, idx):
+        """Các ô còn số trong nhóm đối xứng của ô idx."""
+        return [(r, c) for (r, c) in self._symmetric_group(idx // self.n, idx % self.n) if grid[r][c] != 0]
+
+    def _clear_group(self, grid, idx):
+        """Xóa nhóm đối xứng của ô idx; trả về [(r, c, giá trị cũ)] của các ô vừa xóa (rỗng nếu đã trống hết)."""
+        saved = [(r, c, grid[r][c]) for (r, c) in self._group_cells(grid, idx)]
+        for r, c, _ in saved:
+            grid[r][c] = 0
+        return saved
+
+    def _restore(self, grid, saved):
+        for r, c, val in saved:
+            grid[r][c] = val
+
+    def _remove_batch(self, grid, batch):
+        """
+        Xóa mọi nhóm của lô nếu các luật lan truyền vẫn giải trọn đề; nếu không thì trả số lại và chia đôi lô.
+        Trả về (danh sách [(r, c, giá trị cũ)] của các nhóm đã xóa, các ô idx không xóa được).
+        """
+        cleared = [saved for saved in (self._clear_group(grid, idx) for idx in batch) if saved]
+        if _solved_by_propagation(grid):
+            return cleared, []
+        for saved in cleared:
+            self._restore(grid, saved)
+        if len(batch) == 1:
+            return [], batch
+        mid = len(batch) // 2
+        accepted_left, failed_left = self._remove_batch(grid, batch[:mid])
+        accepted_right, failed_right = self._remove_batch(grid, batch[mid:])
+        return accepted_left + accepted_right, failed_left + failed_right
+
+    def _group_forced(self, grid, saved):
+        """
+        Nhóm vừa xóa suy ra được lần lượt bằng logic: ô cuối bị ép khi cả nhóm đã trống, ô trước đó bị ép
+        khi các ô sau đã được điền lại, ... Các ô được điền lại tạm thời trong lúc kiểm tra, xong thì trống lại.
+        """
+        forced = True
+        for r, c, val in reversed(saved):
+            if not self._is_forced(grid, r, c, val):
+                forced = False
+                break
+            grid[r][c] = val
+        for r, c, _ in saved:
+            grid[r][c] = 0
+        return forced
+
+    def _symmetric_group(self, r, c):
+        """Các ô cùng nhóm đối xứng với (r, c) (gồm cả chính nó, không trùng lặp)."""
+        last = self.n - 1
+        if self.symmetry == 'rotational': partner = (last - r, last - c)
+        elif self.symmetry == 'horizontal': partner = (last - r, c)
+        elif self.symmetry == 'vertical': partner = (r, last - c)
+        elif self.symmetry == 'diagonal': partner = (c, r)
+        else: return [(r, c)]
+        return [(r, c)] if partner == (r, c) else [(r, c), partner]
+
+    def _is_forced(self, grid, row, col, val):
+        """
+        True nếu ô trống (row, col) chắc chắn phải là val chỉ dựa vào các số đề còn lại:
+        - Naked Single: hàng xóm của ô đã chứa đủ N - 1 số khác val; hoặc
+        - Hidden Single: trong Hàng / Cột / Khối của ô, mọi ô trống khác đều không thể nhận val.
+        """
+        n = self.n
+        bs = self.box_size
+        bit = 1 << (val - 1)
+        row_used = [0] * n
+        col_used = [0] * n
+        box_used = [0] * n
+        for r in range(n):
+            for c in range(n):
+                v = grid[r][c]
+                if v:
+                    m = 1 << (v - 1)
+                    row_used[r] |= m
+                    col_used[c] |= m
+                    box_used[(r // bs) * bs + c // bs] |= m
+
+        box = (row // bs) * bs + col // bs
+        seen = row_used[row] | col_used[col] | box_used[box]
+        if seen | bit == (1 << n) - 1:
+            return True
+
+        def can_take(r, c):
+            return grid[r][c] == 0 and (r, c) != (row, col) and \
+                not (row_used[r] | col_used[c] | box_used[(r // bs) * bs + c // bs]) & bit
+
+        if not any(can_take(row, c) for c in range(n)):
+            return True
+        if not any(can_take(r, col) for r in range(n)):
+            return True
+        br, bc = (row // bs) * bs, (col // bs) * bs
+        return not any(can_take(r, c) for r in range(br, br + bs) for c in range(bc, bc + bs))
+
+
+def _solved_by_propagation(grid):
+    """True nếu các luật lan truyền (không đoán) điền kín đề -> đề có đúng một lời giải."""
+    domains = BitmaskDomains(SudokuBoard(grid))
+    if not domains.initialize():
+        return False
+    is_consistent, _ = make_propagator(domains, {}, True).propagate()
+    return is_consistent and all(domains.values)
+
+
+def _pattern_grid(n):
+    """Lưới hợp lệ dựng sẵn theo công thức dịch vòng (không cần giải)."""
+    bs = int(n ** 0.5)
+    return [[(bs * (r % bs) + r // bs + c) % n + 1 for c in range(n)] for r in range(n)]
+
+
+def seed_grids(n):
+    """Các lưới hạt giống hiện có cho kích thước n (luôn có ít nhất lưới dựng sẵn)."""
+    if n not in _seed_library:
+        _seed_library[n] = [_pattern_grid(n)]
+    return _seed_library[n]
+
+
+def add_seed_grid(grid):
+    """Thêm một lời giải đầy đủ vào thư viện hạt giống (tối đa SEEDS_PER_SIZE lưới mỗi kích thước)."""
+    seeds = seed_grids(len(grid))
+    if len(seeds) < SEEDS_PER_SIZE:
+        seeds.append([row[:] for row in grid])
@@ -0,0 +1,113 @@
+"""
+Bộ lan truyền vector hóa cho một lô đề 9x9 (NumPy) - dùng cho giải hàng loạt.
+
+Miền giá trị của cả lô B đề được giữ trong một mảng (B, 81) uint16 (bit v-1 = giá trị v).
+Mỗi vòng lặp áp dụng đồng thời cho mọi đề còn dở:
+- Loại trừ: miền của ô trống = 9 bit trừ đi các chữ số đã đặt trong Hàng, Cột, Khối chứa nó.
+- Naked single: ô trống chỉ còn 1 ứng viên.
+- Hidden single: chữ số chỉ còn 1 ô đặt được trong một Hàng / Cột / Khối.
+Đề mâu thuẫn (ô trống hết ứng viên, chữ số không còn chỗ, hai ô hàng xóm trùng giá trị) bị tách ra;
+đề không còn tiến triển được trả về ở trạng thái đã điền dở để bộ giải tìm kiếm từng đề xử lý tiếp.
+"""
+import numpy as np
+
+from .board_geometry import get_geometry
+
+N = 9
+CELLS = N * N
+FULL = (1 << N) - 1
+
+_GEO = get_geometry(N)
+UNITS = np.array(_GEO.units, dtype=np.intp)        # (27, 9)
+UNITS_OF = np.array(_GEO.units_of, dtype=np.intp)  # (81, 3)
+
+# Bảng tra theo miền 9 bit: số ứng viên, giá trị nếu chỉ còn 1 ứng viên
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(FULL + 1)], dtype=np.uint8)
+SINGLE_VALUE = np.array([mask.bit_length() if POPCOUNT[mask] == 1 else 0 for mask in range(FULL + 1)], dtype=np.uint8)
+# Giá trị ô -> bit (0 = ô trống -> 0)
+VALUE_BIT = np.array([0] + [1 << (v - 1) for v in range(1, N + 1)], dtype=np.uint16)
+
+
+def propagate_batch(quizzes, max_rounds=81):
+    """
+    quizzes: ma trận (B, 81) chữ số (0 = ô trống).
+    Trả về (grids, solved, contradiction, stats):
+    - grids: (B, 81) uint8 sau lan truyền (đề giải xong là lời giải đầy đủ, đã kiểm tra hợp lệ).
+    - solved / contradiction: mảng bool (B,).
+    - stats: {"rounds", "naked_singles", "hidden_singles"} cộng trên cả lô.
+    """
+    grids = np.array(quizzes, dtype=np.uint8).reshape(-1, CELLS)
+    batch = len(grids)
+    contradiction = np.zeros(batch, dtype=bool)
+    stats = {"rounds": 0, "naked_singles": 0, "hidden_singles": 0}
+    if grids.max(initial=0) > N:
+        raise ValueError("Giá trị ô vượt quá 9.")
+
+    active = np.arange(batch)
+    for _ in range(max_rounds):
+        if not len(active):
+            break
+        stats["rounds"] += 1
+        values = grids[active]
+        fixed = VALUE_BIT[values]                                    # (A, 81)
+        empty = values == 0
+
+        # Chữ số đã đặt trong từng đơn vị (placed) và chữ số bị đặt trùng (duplicate)
+        placed, duplicate = _once_twice(fixed[:, UNITS])             # (A, 27)
+        domains = np.where(empty, FULL & ~np.bitwise_or.reduce(placed[:, UNITS_OF], axis=2), fixed)
+
+        # Ứng viên của các ô trống trong đơn vị: chữ số xuất hiện ở đúng 1 ô -> Hidden single
+        unit_domains = np.where(empty[:, UNITS], domains[:, UNITS], 0)   # (A, 27, 9)
+        once, twice = _once_twice(unit_domains)
+        hidden = once & ~twice & ~placed
+
+        bad = (empty & (domains == 0)).any(axis=1)
+        bad |= (duplicate != 0).any(axis=1)
+        bad |= ((once | placed) != FULL).any(axis=1)                 # Chữ số không còn chỗ đặt
+
+        # Naked singles
+        new_values = np.where(empty, SINGLE_VALUE[domains], 0)
+        stats["naked_singles"] += int(np.count_nonzero(new_values[~bad]))
+
+        # Hidden singles (một ô là chỗ duy nhất của 2 chữ số -> Mâu thuẫn)
+        hits = unit_domains & hidden[..., None]
+        rows, units, slots = np.nonzero(hits)
+        masks = hits[rows, units, slots]
+        bad[rows[POPCOUNT[masks] > 1]] = True
+        cells = UNITS[units, slots]
+        is_new = new_values[rows, cells] == 0
+        new_values[rows, cells] = SINGLE_VALUE[masks]
+        stats["hidden_singles"] += int(np.count_nonzero(is_new & ~bad[rows]))
+
+        contradiction[active[bad]] = True
+        progress = (new_values != 0).any(axis=1) & ~bad
+        values = np.where(new_values != 0, new_values, values)
+        grids[active[progress]] = values[progress]
+
+        # Đề vừa điền đủ vẫn qua thêm một vòng để kiểm tra mâu thuẫn; đề hết tiến triển hoặc mâu thuẫn thì dừng
+        active = active[progress]
+
+    # Chỉ coi là đã giải khi lưới đầy đủ và hợp lệ (mỗi đơn vị đủ 9 chữ số)
+    filled = (grids != 0).all(axis=1) & ~contradiction
+    units_ok = np.bitwise_or.reduce(VALUE_BIT[grids][:, UNITS], axis=2) == FULL
+    solved = filled & units_ok.all(axis=1)
+    return grids, solved, contradiction, stats
+
+
+def _once_twice(unit_masks):
+    """OR theo 9 ô của từng đơn vị: (bit có ở ít nhất 1 ô, bit có ở ít nhất 2 ô)."""
+    once = np.zeros(unit_masks.shape[:-1], dtype=np.uint16)
+    twice = np.zeros_like(once)
+    for k in range(unit_masks.shape[-1]):
+        mask = unit_masks[..., k]
+        twice |= once & mask
+        once |= mask
+    return once, twice
+
+
+def grids_from_strings(puzzles):
+    """Chuỗi 81 ký tự ('0' / '.' là ô trống) -> ma trận (B, 81) uint8."""
+    chars = np.frombuffer("".join(puzzles).encode("ascii"), dtype=np.uint8).reshape(len(puzzles), CELLS)
+    grids = chars - np.uint8(ord("0"))
+    grids[chars == ord(".")] = 0
+    return grids
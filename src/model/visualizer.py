@@ -0,0 +1,100 @@
+from .sudoku_board import SudokuBoard
+from .candidate_engine import BitmaskDomains, BucketedDomains
+from .algorithms import search_backtracking, search_forward_checking
+from .algorithms_mrv import search_forward_checking_mrv
+from .sinks import EventSink
+
+# Visualizer dùng chung engine với giải nhanh / đo hiệu năng: engine chạy với EventSink
+# (phát sự kiện ở mỗi bước) và các hàm dưới đây đổi mỗi sự kiện thành trạng thái để giao diện vẽ.
+# DLX có generator riêng (SudokuDLX.solve_visual).
+
+def solve_visual(algo_key: str, board_wrapper: SudokuBoard, stats: dict, sink=None):
+    """
+    Generator trạng thái cho Demo của thuật toán `algo_key` ('bt', 'fc', 'fc_mrv').
+    sink: EventSink dùng cho engine (mặc định EventSink() - chỉ đếm số bước quay lui).
+    """
+    sink = sink or EventSink()
+    if algo_key == 'bt':
+        return _backtracking_visual(search_backtracking(board_wrapper, stats, sink), stats)
+
+    if algo_key == 'fc':
+        domains = BitmaskDomains(board_wrapper)
+        search = search_forward_checking(domains, stats, sink)
+        show_restored_neighbors = True
+    elif algo_key == 'fc_mrv':
+        domains = BucketedDomains(board_wrapper)
+        # Chọn ô MRV, bằng kích thước domain thì ưu tiên ô có bậc lớn nhất (Degree Heuristic)
+        search = search_forward_checking_mrv(domains, stats, sink, degree_tie_break=True)
+        show_restored_neighbors = False
+    else:
+        raise ValueError(f"Thuật toán '{algo_key}' không có chế độ Demo.")
+    return _domains_visual(domains, search, board_wrapper, stats, show_restored_neighbors)
+
+def _domains_visual(domains, search, board_wrapper, stats, show_restored_neighbors):
+    # Generator tìm kiếm chỉ bắt đầu chạy ở lần next() đầu tiên, tức là sau khi domain đã khởi tạo
+    if not domains.initialize():
+        yield {"status": "failed", "message": "Đề bài gốc không hợp lệ", "stats": stats}
+        return False
+    return (yield from _events_to_visual(search, board_wrapper, stats, show_restored_neighbors))
+
+def _backtracking_visual(search, stats):
+    """Đổi sự kiện của vòng lặp Backtracking thành trạng thái cho giao diện."""
+    for event in search:
+        action = event[0]
+
+        if action == "try":
+            # Báo hiệu: Đang thử điền số (Tô xanh)
+            yield {
+                "action": "try",
+                "cell": event[1],
+                "num": event[2],
+                "status": "running"
+            }
+        elif action == "backtrack":
+            # Báo hiệu: Đang quay lui (Tô đỏ)
+            yield {
+                "action": "backtrack",
+                "cell": event[1],
+                "stats": stats,
+                "status": "running"
+            }
+        elif action == "solved":
+            yield {"status": "solved"}
+            return True
+
+    return False
+
+def _events_to_visual(search, board_wrapper, stats, show_restored_neighbors):
+    """Đổi sự kiện của vòng lặp FC / FC + MRV thành trạng thái cho giao diện."""
+    n = board_wrapper.n
+    peer_rc = board_wrapper.geometry.peer_rc
+
+    for event in search:
+        action = event[0]
+
+        if action == "try":
+            idx, num = event[1], event[2]
+            row, col = divmod(idx, n)
+            board_wrapper.set_cell(row, col, num)
+            yield {"action": "try", "cell": (row, col), "num": num, "status": "running", "stats": stats}
+
+        elif action == "prune":
+            idx, is_consistent, pruned_log = event[1], event[2], event[3]
+            yield {"action": "prune_start", "neighbors": list(peer_rc[idx]), "status": "running", "stats": stats}
+            if not is_consistent:
+                # Ô cuối cùng trong nhật ký là ô vừa bị rỗng domain
+                yield {"action": "prune_fail", "cell": divmod(pruned_log[-1], n), "status": "running", "stats": stats}
+
+        elif action == "backtrack":
+            idx = event[1]
+            row, col = divmod(idx, n)
+            neighbors = list(peer_rc[idx]) if show_restored_neighbors else []
+            yield {"action": "restore_start", "neighbors": neighbors, "status": "running", "stats": stats}
+            board_wrapper.set_cell(row, col, 0)
+            yield {"action": "backtrack", "cell": (row, col), "stats": stats, "status": "running"}
+
+        elif action == "solved":
+            yield {"status": "solved", "stats": stats}
+            return True
+
+    return False
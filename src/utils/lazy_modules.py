@@ -0,0 +1,32 @@
+import importlib
+from collections.abc import Mapping
+
+
+class LazyModules(Mapping):
+    """
+    Bảng tên -> module Model, chỉ import khi được truy cập lần đầu (kết quả được giữ lại).
+    Giá trị khai báo là "package.module" hoặc "package.module:Thuộc_tính".
+    Kiểm tra `in` / len() / duyệt khóa không import gì, nên cửa sổ chính hiện ra trước khi
+    các bộ giải, visualizer được nạp.
+    """
+
+    def __init__(self, targets: dict):
+        self._targets = dict(targets)
+        self._loaded = {}
+
+    def __getitem__(self, name):
+        if name not in self._loaded:
+            target = self._targets[name]
+            module_name, _, attr = target.partition(':')
+            module = importlib.import_module(module_name)
+            self._loaded[name] = getattr(module, attr) if attr else module
+        return self._loaded[name]
+
+    def __contains__(self, name):
+        return name in self._targets
+
+    def __iter__(self):
+        return iter(self._targets)
+
+    def __len__(self):
+        return len(self._targets)
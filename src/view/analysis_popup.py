@@ -2,22 +2,41 @@ import tkinter as tk
 import customtkinter as ctk
 from typing import TYPE_CHECKING
 
+from src.model.search_budget import budget_label
+
 if TYPE_CHECKING:
     from src.controller.app_controller import AppController
 
 class AnalysisPopup(ctk.CTkToplevel):
 
-    def __init__(self, parent_view, controller: 'AppController', stats_bt: dict, stats_fc: dict, stats_mrv: dict, stats_dlx: dict):
+    # algo_key -> (hàng, cột, tiêu đề, màu, nhóm số liệu, viền nổi bật, số hàng chiếm)
+    CARDS = {
+        'bt': (0, 0, "1. Backtracking", "#E74C3C", "backtracks", False, 1),
+        'fc': (0, 1, "2. Forward Checking", "#3498DB", "prunes_made", False, 1),
+        'fc_mrv': (1, 0, "3. FC + MRV (Heuristic)", "#28a745", "prunes_made", False, 1),
+        'dlx': (1, 1, "4. Dancing Links (DLX)", "#F1C40F", "nodes_visited", True, 1),
+        # Cột thứ 3 (chiếm cả 2 hàng): FC + MRV có duy trì nhất quán cung
+        'fc_mrv_ac': (0, 2, "5. FC + MRV + AC (GAC)", "#9B59B6", "arc_consistency", False, 2),
+    }
+
+    def __init__(self, parent_view, controller: 'AppController', stats_bt: dict = None, stats_fc: dict = None,
+                 stats_mrv: dict = None, stats_dlx: dict = None, stats_ac: dict = None, algo_keys=None):
+        """
+        Truyền sẵn stats của từng thuật toán, hoặc chỉ truyền algo_keys để mở cửa sổ ngay với các thẻ
+        "Đang chạy..." rồi điền từng thẻ bằng set_result() khi kết quả về (so sánh song song).
+        """
         super().__init__(parent_view)
         
         self.controller = controller
-        self.stats_bt = stats_bt
-        self.stats_fc = stats_fc
-        self.stats_mrv = stats_mrv
-        self.stats_dlx = stats_dlx 
+        given = {'bt': stats_bt, 'fc': stats_fc, 'fc_mrv': stats_mrv, 'dlx': stats_dlx, 'fc_mrv_ac': stats_ac}
+        if algo_keys is None:
+            algo_keys = [key for key, stats in given.items() if stats is not None]
+        self.algo_keys = list(algo_keys)
+        self.cards = {}
         
-        self.title("Phân tích So sánh Hiệu năng (4 Thuật toán)")
-        self.geometry("1100x650") 
+        so_thuat_toan = len(self.algo_keys)
+        self.title(f"Phân tích So sánh Hiệu năng ({so_thuat_toan} Thuật toán)")
+        self.geometry("1400x720" if 'fc_mrv_ac' in self.algo_keys else "1100x720") 
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1) 
@@ -25,34 +44,64 @@ class AnalysisPopup(ctk.CTkToplevel):
         self.main_frame = ctk.CTkFrame(self)
         self.main_frame.grid(row=0, column=0, sticky="nsew", padx=15, pady=15)
         
-        self._draw_content()        
+        self._draw_content(given)        
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
         self.after(100, self._safe_grab_set)
 
+    def _on_close(self):
+        # Đóng cửa sổ khi so sánh còn chạy -> dừng các tiến trình còn lại
+        self.controller.handle_compare_closed()
+        self.destroy()
+
     def _safe_grab_set(self):
         try:
             if self.winfo_exists(): self.grab_set()
         except tk.TclError: pass
 
-    def _draw_content(self):
-        self.main_frame.grid_columnconfigure((0, 1), weight=1)
+    def _draw_content(self, given: dict):
         self.main_frame.grid_rowconfigure((0, 1), weight=1)
-        
-        self._create_card(0, 0, "1. Backtracking", "#E74C3C", self.stats_bt, "backtracks")
-        self._create_card(0, 1, "2. Forward Checking", "#3498DB", self.stats_fc, "prunes_made")
-        self._create_card(1, 0, "3. FC + MRV (Heuristic)", "#28a745", self.stats_mrv, "prunes_made")
-        
-        self._create_card(1, 1, "4. Dancing Links (DLX)", "#F1C40F", self.stats_dlx, "nodes_visited", highlight=True)
+        self.main_frame.grid_columnconfigure((0, 1, 2) if 'fc_mrv_ac' in self.algo_keys else (0, 1), weight=1)
+        for key in self.algo_keys:
+            self.set_result(key, given.get(key))
+
+    def set_result(self, algo_key: str, stats: dict = None, error: str = None):
+        """Vẽ (lại) thẻ của một thuật toán: stats None và không có lỗi -> thẻ "Đang chạy..."."""
+        old_frame = self.cards.pop(algo_key, None)
+        if old_frame is not None:
+            old_frame.destroy()
+        r, c, title, color, extra_key, highlight, rowspan = self.CARDS[algo_key]
+        self.cards[algo_key] = self._create_card(r, c, title, color, stats, extra_key, highlight, rowspan, error)
 
-    def _create_card(self, r, c, title, color, stats, extra_key, highlight=False):
+    def _create_card(self, r, c, title, color, stats, extra_key, highlight=False, rowspan=1, error=None):
         border_col = color if highlight else None
         border_w = 2 if highlight else 0
         
         frame = ctk.CTkFrame(self.main_frame, fg_color=("#E9ECEF", "#343A40"), border_color=border_col, border_width=border_w)
-        frame.grid(row=r, column=c, sticky="nsew", padx=8, pady=8)
+        frame.grid(row=r, column=c, rowspan=rowspan, sticky="nsew", padx=8, pady=8)
         
         ctk.CTkLabel(frame, text=title, font=ctk.CTkFont(size=18, weight="bold"), text_color=color).pack(pady=(15, 10))
+
+        if error is not None:
+            self.tao_label(frame, "Kết quả", "Lỗi", value_color="#E74C3C")
+            ctk.CTkLabel(frame, text=error.strip().splitlines()[-1], wraplength=300, text_color="gray").pack(padx=20, pady=5)
+            return frame
+        if stats is None:
+            ctk.CTkLabel(frame, text="Đang chạy...", font=ctk.CTkFont(size=14), text_color="gray").pack(pady=20)
+            return frame
+
+        # Thuật toán bị dừng vì chạm giới hạn: số liệu bên dưới là số liệu đến lúc dừng
+        reason = budget_label(stats)
+        if reason:
+            self.tao_label(frame, "Kết quả", f"{reason} (chưa giải xong)", value_color="#E74C3C")
         
         self.tao_label(frame, "Thời gian", f"{stats.get('execution_time_sec', 0):.6f} s")
+        # Số đo của tiến trình riêng (so sánh song song)
+        if "cpu_time_sec" in stats:
+            self.tao_label(frame, "Thời gian CPU", f"{stats['cpu_time_sec']:.6f} s")
+        if stats.get("peak_memory_bytes") is not None:
+            growth = stats.get("memory_growth_bytes")
+            extra = f" (+{growth / 2**20:.1f} MB)" if growth is not None else ""
+            self.tao_label(frame, "Bộ nhớ đỉnh", f"{stats['peak_memory_bytes'] / 2**20:.1f} MB{extra}")
         
         if extra_key == "backtracks":
             self.tao_label(frame, "Số bước lùi", f"{stats.get('backtracks', 0):,}")
@@ -62,10 +111,20 @@ class AnalysisPopup(ctk.CTkToplevel):
             self.tao_label(frame, "Cắt tỉa", f"{stats.get('prunes_made', 0):,}")
         elif extra_key == "nodes_visited": 
             self.tao_label(frame, "Số lần Cover", f"{stats.get('nodes_visited', 0):,}")
-            self.tao_label(frame, "Trạng thái", "Exact Cover")
+            if not reason:
+                self.tao_label(frame, "Trạng thái", "Exact Cover")
+        elif extra_key == "arc_consistency":
+            self.tao_label(frame, "Số bước lùi", f"{stats.get('backtracks', 0):,}")
+            self.tao_label(frame, "Nút đã duyệt", f"{stats.get('nodes_visited', 0):,}")
+            self.tao_label(frame, "Cắt tỉa", f"{stats.get('prunes_made', 0):,}")
+            self.tao_label(frame, "Loại bởi AC-3", f"{stats.get('ac3_removed', 0):,}")
+            self.tao_label(frame, "Loại bởi AllDifferent", f"{stats.get('alldiff_removed', 0):,}")
+            self.tao_label(frame, "Domain (trước → sau)", f"{stats.get('ac_domain_before', 0):,} → {stats.get('ac_domain_after', 0):,}")
+            self.tao_label(frame, "Thời gian lọc AC", f"{stats.get('ac_time_sec', 0):.6f} s")
+        return frame
 
-    def tao_label(self, parent, ten, gia_tri):
+    def tao_label(self, parent, ten, gia_tri, value_color="#F59E0B"):
         khung = ctk.CTkFrame(parent, fg_color="transparent")
         khung.pack(fill="x", padx=20, pady=5)
         ctk.CTkLabel(khung, text=f"{ten}:", font=ctk.CTkFont(size=14), text_color="gray").pack(side="left")
-        ctk.CTkLabel(khung, text=gia_tri, font=ctk.CTkFont(size=14, weight="bold"), text_color="#F59E0B").pack(side="right")
\ No newline at end of file
+        ctk.CTkLabel(khung, text=gia_tri, font=ctk.CTkFont(size=14, weight="bold"), text_color=value_color).pack(side="right")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import tkinter as tk
+import customtkinter as ctk
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.controller.app_controller import AppController
+
+class BatchAnalysisPopup(ctk.CTkToplevel):
+    """
+    Cửa sổ giải hàng loạt: chọn số đề N và các thuật toán, bấm Chạy; tiến độ và số liệu của từng
+    thuật toán được Controller cập nhật dần (update_progress / show_finished) mà không khóa giao diện.
+    """
+
+    # (algo_key, tên hiển thị, màu) - cùng màu với AnalysisPopup
+    ALGORITHMS = [
+        ('bt', "Backtracking", "#E74C3C"),
+        ('fc', "Forward Checking", "#3498DB"),
+        ('fc_mrv', "FC + MRV", "#28a745"),
+        ('dlx', "Dancing Links (DLX)", "#F1C40F"),
+        ('fc_mrv_ac', "FC + MRV + AC", "#9B59B6"),
+        ('np_fc_mrv', "NumPy + FC + MRV", "#1ABC9C"),
+        ('np_dlx', "NumPy + DLX", "#E67E22"),
+    ]
+    COLUMNS = ["Đã giải", "Đúng đáp án", "TB (ms)", "Chậm nhất (ms)", "Đề/giây", "Số bước lùi", "Xong ở bước vector"]
+
+    def __init__(self, parent_view, controller: 'AppController', total_rows: int):
+        super().__init__(parent_view)
+
+        self.controller = controller
+        self.total_rows = total_rows
+        self.is_running = False
+
+        self.title("Giải Hàng Loạt (Batch)")
+        self.geometry("1150x560")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self._draw_controls()
+        self._draw_table()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _draw_controls(self):
+        khung = ctk.CTkFrame(self)
+        khung.grid(row=0, column=0, sticky="ew", padx=15, pady=(15, 5))
+
+        ctk.CTkLabel(khung, text=f"Số đề (tối đa {self.total_rows:,}):", font=ctk.CTkFont(size=14)).pack(side="left", padx=(10, 5), pady=10)
+        self.entry_n = ctk.CTkEntry(khung, width=110)
+        self.entry_n.insert(0, str(min(1000, self.total_rows)))
+        self.entry_n.pack(side="left", padx=5)
+
+        self.algo_vars = {}
+        for key, name, _ in self.ALGORITHMS:
+            var = tk.BooleanVar(value=key != 'bt')
+            self.algo_vars[key] = var
+            ctk.CTkCheckBox(khung, text=name, variable=var, width=20).pack(side="left", padx=5)
+
+        self.btn_run = ctk.CTkButton(khung, text="▶ CHẠY", font=ctk.CTkFont(weight="bold"), fg_color="#28a745", hover_color="#32CD32", width=100, command=self._on_run_click)
+        self.btn_run.pack(side="right", padx=10)
+
+    def _draw_table(self):
+        khung = ctk.CTkFrame(self)
+        khung.grid(row=1, column=0, sticky="nsew", padx=15, pady=5)
+        khung.grid_columnconfigure(tuple(range(len(self.COLUMNS) + 1)), weight=1)
+
+        ctk.CTkLabel(khung, text="Thuật toán", font=ctk.CTkFont(size=14, weight="bold")).grid(row=0, column=0, padx=8, pady=8, sticky="w")
+        for c, ten in enumerate(self.COLUMNS, start=1):
+            ctk.CTkLabel(khung, text=ten, font=ctk.CTkFont(size=14, weight="bold"), text_color="gray").grid(row=0, column=c, padx=8, pady=8)
+
+        self.cells = {}
+        for r, (key, name, color) in enumerate(self.ALGORITHMS, start=1):
+            ctk.CTkLabel(khung, text=name, font=ctk.CTkFont(size=14, weight="bold"), text_color=color).grid(row=r, column=0, padx=8, pady=6, sticky="w")
+            row_cells = []
+            for c in range(1, len(self.COLUMNS) + 1):
+                lbl = ctk.CTkLabel(khung, text="-", font=ctk.CTkFont(size=14, weight="bold"), text_color="#F59E0B")
+                lbl.grid(row=r, column=c, padx=8, pady=6)
+                row_cells.append(lbl)
+            self.cells[key] = row_cells
+
+        self.progress_bar = ctk.CTkProgressBar(self)
+        self.progress_bar.set(0)
+        self.progress_bar.grid(row=2, column=0, sticky="ew", padx=20, pady=(5, 0))
+        self.lbl_status = ctk.CTkLabel(self, text="Chọn số đề và thuật toán rồi bấm CHẠY.", font=ctk.CTkFont(size=13, slant="italic"), text_color="#94a3b8")
+        self.lbl_status.grid(row=3, column=0, sticky="w", padx=20, pady=(2, 12))
+
+    def get_selected_algorithms(self):
+        return [key for key, _, _ in self.ALGORITHMS if self.algo_vars[key].get()]
+
+    def _on_run_click(self):
+        if self.is_running:
+            self.controller.handle_stop_batch_analysis()
+            return
+        try:
+            n_value = int(self.entry_n.get())
+            if n_value <= 0: raise ValueError
+        except ValueError:
+            self.lbl_status.configure(text="Số đề phải là số nguyên dương.", text_color="#E74C3C")
+            return
+        self.controller.handle_run_batch_analysis(min(n_value, self.total_rows), self)
+
+    def set_running(self, is_running: bool):
+        self.is_running = is_running
+        if is_running:
+            self.btn_run.configure(text="■ DỪNG", fg_color="#E74C3C", hover_color="#EC7063")
+            self.progress_bar.set(0)
+            for row_cells in self.cells.values():
+                for lbl in row_cells: lbl.configure(text="-")
+        else:
+            self.btn_run.configure(text="▶ CHẠY", fg_color="#28a745", hover_color="#32CD32")
+
+    def update_progress(self, algo_key: str, metrics: dict, fraction: float):
+        """Cập nhật một dòng của bảng và thanh tiến độ (gọi trên luồng giao diện)."""
+        row_cells = self.cells.get(algo_key)
+        if row_cells:
+            values = [
+                f"{metrics['solved']:,}/{metrics['count']:,}",
+                f"{metrics['accuracy'] * 100:.2f}%",
+                f"{metrics['avg_ms']:.3f}",
+                f"{metrics['max_time_sec'] * 1000:.1f}",
+                f"{metrics['puzzles_per_sec']:,.1f}",
+                f"{metrics['backtracks']:,}",
+                f"{metrics['vector_rate'] * 100:.1f}%" if algo_key.startswith('np_') else "-",
+            ]
+            for lbl, text in zip(row_cells, values):
+                lbl.configure(text=text)
+        self.progress_bar.set(fraction)
+        self.lbl_status.configure(text=f"Đang chạy... {fraction * 100:.1f}% ({metrics.get('wall_sec', 0):.1f}s)", text_color="#94a3b8")
+
+    def show_finished(self, message: str, is_error=False):
+        self.set_running(False)
+        self.lbl_status.configure(text=message, text_color="#E74C3C" if is_error else "#28a745")
+
+    def _on_close(self):
+        if self.is_running:
+            self.controller.handle_stop_batch_analysis()
+        self.destroy()
@@ -58,6 +58,7 @@ class MainView(ctk.CTkFrame):
         self.btn_csv_medium = None
         self.btn_csv_hard = None
         self.btn_csv_extreme = None
+        self.btn_batch = None
         self.btn_giai = None
         self.btn_sosanh = None
         self.btn_xoa = None
@@ -98,6 +99,7 @@ class MainView(ctk.CTkFrame):
         if self.btn_csv_medium: self.btn_csv_medium.configure(state="disabled")
         if self.btn_csv_hard: self.btn_csv_hard.configure(state="disabled")
         if self.btn_csv_extreme: self.btn_csv_extreme.configure(state="disabled")
+        if self.btn_batch: self.btn_batch.configure(state="disabled")
         if self.btn_giai: self.btn_giai.configure(state="disabled")
         if self.btn_sosanh: self.btn_sosanh.configure(state="disabled")
         if self.btn_xoa: self.btn_xoa.configure(state="disabled")
@@ -110,6 +112,7 @@ class MainView(ctk.CTkFrame):
         self.btn_csv_medium.configure(state="normal")
         self.btn_csv_hard.configure(state="normal")
         self.btn_csv_extreme.configure(state="normal")
+        self.btn_batch.configure(state="normal")
         self.btn_giai.configure(state="disabled")
         self.btn_sosanh.configure(state="disabled")
         self.btn_xoa.configure(state="disabled")
@@ -122,6 +125,7 @@ class MainView(ctk.CTkFrame):
         self.btn_csv_medium.configure(state="normal")
         self.btn_csv_hard.configure(state="normal")
         self.btn_csv_extreme.configure(state="normal")
+        self.btn_batch.configure(state="normal" if csv_loaded else "disabled")
         
         is_play = (self.mode_var.get() == "👤 Người Chơi")
         if is_play:
@@ -143,6 +147,22 @@ class MainView(ctk.CTkFrame):
         
         self.btn_xoa.configure(state="normal")
 
+    def set_buttons_state_generating(self, is_generating: bool, csv_loaded: bool):
+        """Đang sinh đề ở luồng nền: khóa các nút lấy đề / giải và ô chọn kích thước cho tới khi có đề."""
+        if is_generating:
+            for btn in (self.btn_load_file, self.btn_csv_easy, self.btn_csv_medium, self.btn_csv_hard, self.btn_csv_extreme,
+                        self.btn_batch, self.btn_giai, self.btn_sosanh, self.btn_xoa, self.btn_check, self.btn_hint):
+                if btn: btn.configure(state="disabled")
+            self.combo_size.configure(state="disabled")
+        else:
+            self.combo_size.configure(state="normal")
+            if self.controller.current_puzzle_data:
+                self.set_buttons_state_puzzle_on_grid(csv_loaded)
+            else:
+                for btn in (self.btn_load_file, self.btn_csv_easy, self.btn_csv_medium, self.btn_csv_hard, self.btn_csv_extreme):
+                    btn.configure(state="normal")
+                self.btn_batch.configure(state="normal" if csv_loaded else "disabled")
+
     def set_buttons_state_visualizing(self, is_running: bool, csv_loaded: bool):
         is_demo_mode = self.switch_demo_mode.get()
         if is_running:
@@ -151,6 +171,7 @@ class MainView(ctk.CTkFrame):
             self.btn_csv_medium.configure(state="disabled")
             self.btn_csv_hard.configure(state="disabled")
             self.btn_csv_extreme.configure(state="disabled")
+            self.btn_batch.configure(state="disabled")
             self.btn_sosanh.configure(state="disabled")
             self.btn_xoa.configure(state="disabled")
             self.switch_demo_mode.configure(state="disabled")
@@ -165,7 +186,8 @@ class MainView(ctk.CTkFrame):
             if is_demo_mode:
                 self.btn_giai.configure(text="❚❚ DỪNG DEMO", state="normal", fg_color="#E74C3C", hover_color="#EC7063")
             else:
-                self.btn_giai.configure(state="disabled")
+                # Giải nhanh / so sánh chạy ở luồng nền -> Nút Giải dùng để hủy
+                self.btn_giai.configure(text="■ DỪNG GIẢI", state="normal", fg_color="#E74C3C", hover_color="#EC7063")
         else:
             self.btn_load_file.configure(state="normal")
             self.switch_demo_mode.configure(state="normal")
@@ -320,6 +342,8 @@ class MainView(ctk.CTkFrame):
         self.btn_csv_hard.grid(row=1, column=0, padx=2, pady=2)
         self.btn_csv_extreme = ctk.CTkButton(khung_kho, text="Siêu Khó", font=ctk.CTkFont(size=12, weight="bold"), fg_color="#8E44AD", hover_color="#A569BD", width=130)
         self.btn_csv_extreme.grid(row=1, column=1, padx=2, pady=2)
+        self.btn_batch = ctk.CTkButton(khung_kho, text="📈 GIẢI HÀNG LOẠT (CSV)", font=ctk.CTkFont(size=12, weight="bold"), fg_color="#0D6EFD", hover_color="#0A58CA", width=264)
+        self.btn_batch.grid(row=2, column=0, columnspan=2, padx=2, pady=2)
 
     def tao_khung_che_do(self, parent):
         khung_mode = ctk.CTkFrame(parent, fg_color="transparent")
@@ -343,6 +367,7 @@ class MainView(ctk.CTkFrame):
             self.btn_giai.grid_remove() 
             self.btn_sosanh.grid_remove()
             self.combo_fast_solve.pack_forget()
+            self.switch_ac_preprocess.pack_forget()
             
             self.btn_check.pack(pady=(5, 2))
             self.btn_hint.pack(pady=(2, 5))
@@ -361,6 +386,7 @@ class MainView(ctk.CTkFrame):
             self.btn_giai.grid()
             self.btn_sosanh.grid()
             self.combo_fast_solve.pack(pady=(5, 5))
+            self.switch_ac_preprocess.pack(pady=(0, 5), after=self.combo_fast_solve)
             
             self.btn_check.pack_forget()
             self.btn_hint.pack_forget()
@@ -381,12 +407,15 @@ class MainView(ctk.CTkFrame):
                 'Backtracking (Baseline)', 
                 'Forward Checking (Cải tiến)', 
                 'FC + MRV (Nâng cao)',
-                'Dancing Links (Trùm)'
+                'Dancing Links (Trùm)',
+                'Danh mục (Chạy đua song song)'
             ], 
             state="readonly", height=30, width=220,
             command=self.on_algo_change 
         )
         self.combo_fast_solve.pack(pady=(5, 5))
+        self.switch_ac_preprocess = ctk.CTkSwitch(khung_hanh_dong, text="Lọc AC-3 trước (BT / FC / DLX)", font=ctk.CTkFont(size=12), onvalue=True, offvalue=False, text_color="#e2e8f0")
+        self.switch_ac_preprocess.pack(pady=(0, 5))
 
         khung_nut_hanh_dong = ctk.CTkFrame(khung_hanh_dong, fg_color="transparent")
         khung_nut_hanh_dong.pack()
@@ -430,7 +459,10 @@ class MainView(ctk.CTkFrame):
         time_val = stats.get('execution_time_sec', 0)
         
         current_algo = self.algo_var.get()
-        if "Dancing Links" in current_algo:
+        if "Danh mục" in current_algo:
+             # Chế độ Danh mục: hiện thuật toán về đích đầu tiên
+             self.lbl_fast_solve_backtracks.configure(text=f"Về đích đầu tiên: {stats.get('portfolio_winner_name', '')}")
+        elif "Dancing Links" in current_algo:
              val = stats.get('nodes_visited', 0)
              self.lbl_fast_solve_backtracks.configure(text=f"Nodes Visited: {val:,}")
         else:
@@ -440,6 +472,15 @@ class MainView(ctk.CTkFrame):
         self.lbl_fast_solve_time.configure(text=f"Thời gian thực thi: {time_val:.6f} s")
         self.khung_ket_qua_nhanh.pack(fill="x", pady=(5,0))
 
+    def show_solve_progress(self, sample: dict):
+        """Tiến độ khi đang giải ở luồng nền (mẫu từ SearchBudget, vài lần mỗi giây)."""
+        self.lbl_fast_solve_time.configure(text=f"Đang giải... {sample.get('elapsed_sec', 0):.1f} s")
+        parts = [f"{sample.get('nodes_per_sec', 0):,.0f} nút/s"]
+        if sample.get('depth') is not None: parts.append(f"độ sâu {sample['depth']}")
+        if sample.get('backtracks') is not None: parts.append(f"lùi {sample['backtracks']:,}")
+        self.lbl_fast_solve_backtracks.configure(text=" | ".join(parts))
+        self.khung_ket_qua_nhanh.pack(fill="x", pady=(5,0))
+
     def clear_fast_solve_stats(self):
         self.khung_ket_qua_nhanh.pack_forget()
 
@@ -462,17 +503,20 @@ class MainView(ctk.CTkFrame):
         self.btn_csv_medium.configure(command=lambda: self.controller.handle_get_csv_puzzle('medium'))
         self.btn_csv_hard.configure(command=lambda: self.controller.handle_get_csv_puzzle('hard'))
         self.btn_csv_extreme.configure(command=lambda: self.controller.handle_get_csv_puzzle('extreme'))
+        self.btn_batch.configure(command=self.controller.handle_batch_compare_setup)
         self.btn_giai.configure(command=self.controller.handle_solve)
         self.btn_sosanh.configure(command=self.controller.handle_compare)
         self.btn_xoa.configure(command=self.controller.handle_clear)
         self.btn_check.configure(command=self.controller.handle_check_solution)
         self.btn_hint.configure(command=self.controller.handle_hint)
+        self.switch_ac_preprocess.configure(command=lambda: self.controller.handle_ac_preprocess_toggle(self.switch_ac_preprocess.get()))
 
     def get_selected_algorithm(self) -> (str, bool):
         selected = self.algo_var.get()
         is_demo = self.switch_demo_mode.get()
         
         algo_key = "bt"
+        if "Danh mục" in selected: return "portfolio", is_demo
         if "Dancing Links" in selected: algo_key = "dlx"
         elif "FC + MRV" in selected: algo_key = "fc_mrv"
         elif "Forward Checking" in selected: algo_key = "fc"